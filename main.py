@@ -1,11 +1,21 @@
+from typing import Any, Dict, Optional
+
 from flask import Flask
 
 from src.routes.collection_routes import collection_bp
 from src.database import init_app as init_db
 
-def create_app():
-    """Create and configure an instance of the Flask application."""
+def create_app(engine_options: Optional[Dict[str, Any]] = None):
+    """
+    Create and configure an instance of the Flask application.
+
+    Args:
+        engine_options: Extra keyword arguments for the SQLAlchemy engine,
+            such as a pool class for single-user tools
+    """
     app = Flask(__name__)
+    if engine_options:
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options
 
     # Initialize the database
     init_db(app)
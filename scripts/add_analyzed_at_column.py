@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the analyzed_at column to the card_info table.
+
+The column records when each card was last analyzed, and a partial index on
+its NULL rows lets unanalyzed cards be found without scanning the table.
+"""
+import os
+import sys
+import sqlite3
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.database import configure_sqlite
+
+def check_column_exists(cursor, table_name: str, column_name: str) -> bool:
+    """Check if a column exists in a table."""
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    columns = cursor.fetchall()
+    return any(col[1] == column_name for col in columns)
+
+def add_analyzed_at_column():
+    """Add the analyzed_at column and its partial index if they don't exist."""
+    print("🔧 DATABASE MIGRATION: Adding analyzed_at column")
+    print("=" * 60)
+
+    # Try to find the existing database
+    possible_paths = [
+        os.path.join(os.getcwd(), 'instance', 'mtg_collection.db'),
+        os.path.join(os.getcwd(), 'mtg_collection.db')
+    ]
+
+    db_path = None
+    for path in possible_paths:
+        if os.path.exists(path):
+            db_path = path
+            break
+
+    if not db_path:
+        print("❌ No existing database found!")
+        print("Please ensure you have cards in your collection first.")
+        print("Run 'python main.py' and import some cards via the API.")
+        return
+
+    print(f"📂 Found database: {db_path}")
+
+    # Connect directly to SQLite to add the column
+    conn = sqlite3.connect(db_path)
+    configure_sqlite(conn)
+    cursor = conn.cursor()
+
+    try:
+        if check_column_exists(cursor, 'card_info', 'analyzed_at'):
+            print("✅ analyzed_at column already exists!")
+        else:
+            print("➕ Adding analyzed_at column to card_info table...")
+            cursor.execute("ALTER TABLE card_info ADD COLUMN analyzed_at DATETIME")
+
+            # Cards analyzed before this migration have keywords set
+            cursor.execute(
+                "UPDATE card_info SET analyzed_at = COALESCE(updated_at, CURRENT_TIMESTAMP) "
+                "WHERE keywords IS NOT NULL"
+            )
+            print(f"🕒 Marked {cursor.rowcount} previously analyzed cards")
+
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_card_unanalyzed "
+            "ON card_info (analyzed_at) WHERE analyzed_at IS NULL"
+        )
+        conn.commit()
+
+        cursor.execute("SELECT COUNT(*) FROM card_info WHERE analyzed_at IS NULL")
+        pending = cursor.fetchone()[0]
+        print(f"✅ Migration applied. {pending} cards are waiting for analysis.")
+
+    except Exception as e:
+        print(f"❌ Error during migration: {str(e)}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def main():
+    """Main function."""
+    try:
+        add_analyzed_at_column()
+        print("\n🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@
 """
 Migration script to add the extracted_data column to the card_info table.
 
-This column is required for the enhanced synergy analysis system.
+This column is required for the enhanced synergy analysis system. A partial
+index over the rows that have it keeps analyzed-card filters off the text.
 """
 import os
 import sys
@@ -13,7 +14,7 @@ from pathlib import Path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from main import create_app
-from src.database import db
+from src.database import configure_sqlite, db
 
 def check_column_exists(cursor, table_name: str, column_name: str) -> bool:
     """Check if a column exists in a table."""
@@ -48,28 +49,35 @@ def add_extracted_data_column():
 
     # Connect directly to SQLite to add the column
     conn = sqlite3.connect(db_path)
+    configure_sqlite(conn)
     cursor = conn.cursor()
 
     try:
         # Check if extracted_data column exists
         if check_column_exists(cursor, 'card_info', 'extracted_data'):
             print("✅ extracted_data column already exists!")
-            return
-
-        print("➕ Adding extracted_data column to card_info table...")
-
-        # Add the column (SQLite doesn't support adding columns with constraints in one statement)
-        cursor.execute("ALTER TABLE card_info ADD COLUMN extracted_data TEXT")
-        conn.commit()
-
-        print("✅ Successfully added extracted_data column!")
-
-        # Verify the column was added
-        if check_column_exists(cursor, 'card_info', 'extracted_data'):
-            print("✅ Column addition verified!")
         else:
-            print("❌ Column addition failed!")
-            return
+            print("➕ Adding extracted_data column to card_info table...")
+
+            # Add the column (SQLite doesn't support adding columns with constraints in one statement)
+            cursor.execute("ALTER TABLE card_info ADD COLUMN extracted_data TEXT")
+            conn.commit()
+
+            print("✅ Successfully added extracted_data column!")
+
+            # Verify the column was added
+            if check_column_exists(cursor, 'card_info', 'extracted_data'):
+                print("✅ Column addition verified!")
+            else:
+                print("❌ Column addition failed!")
+                return
+
+        # Partial index so analyzed-card filters skip unanalyzed rows
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_card_analyzed "
+            "ON card_info (id) WHERE extracted_data IS NOT NULL"
+        )
+        conn.commit()
 
         # Show current table schema
         cursor.execute("PRAGMA table_info(card_info)")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the name_lc column to the card_info table.
+
+The column holds each card's lowercased name, and its index lets
+case-insensitive name lookups seek instead of scanning the table.
+"""
+import os
+import sys
+import sqlite3
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.database import configure_sqlite
+
+def check_column_exists(cursor, table_name: str, column_name: str) -> bool:
+    """Check if a column exists in a table."""
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    columns = cursor.fetchall()
+    return any(col[1] == column_name for col in columns)
+
+def add_name_lc_column():
+    """Add the name_lc column and its index if they don't exist, filling in existing names."""
+    print("🔧 DATABASE MIGRATION: Adding name_lc column")
+    print("=" * 60)
+
+    # Try to find the existing database
+    possible_paths = [
+        os.path.join(os.getcwd(), 'instance', 'mtg_collection.db'),
+        os.path.join(os.getcwd(), 'mtg_collection.db')
+    ]
+
+    db_path = None
+    for path in possible_paths:
+        if os.path.exists(path):
+            db_path = path
+            break
+
+    if not db_path:
+        print("❌ No existing database found!")
+        print("Please ensure you have cards in your collection first.")
+        print("Run 'python main.py' and import some cards via the API.")
+        return
+
+    print(f"📂 Found database: {db_path}")
+
+    # Connect directly to SQLite to add the column. Transactions are managed
+    # explicitly: in the module's default mode the ALTER TABLE would commit on
+    # its own before the backfill started
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    configure_sqlite(conn)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("BEGIN")
+        if check_column_exists(cursor, 'card_info', 'name_lc'):
+            print("✅ name_lc column already exists!")
+        else:
+            print("➕ Adding name_lc column to card_info table...")
+            cursor.execute("ALTER TABLE card_info ADD COLUMN name_lc VARCHAR(255)")
+
+        # Lowercase in Python, as the model does, so non-ASCII names match too.
+        # Rows stream from a second cursor straight into one prepared UPDATE;
+        # NOT INDEXED keeps the scan off the name_lc index being written
+        reader = conn.cursor()
+        reader.execute("SELECT id, name FROM card_info NOT INDEXED WHERE name_lc IS NULL")
+        cursor.executemany(
+            "UPDATE card_info SET name_lc = ? WHERE id = ?",
+            ((name.lower(), card_id) for card_id, name in reader)
+        )
+        print(f"🔡 Filled in name_lc for {cursor.rowcount} cards")
+
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_card_info_name_lc ON card_info (name_lc)"
+        )
+        conn.commit()
+        print("✅ Migration applied.")
+
+    except Exception as e:
+        print(f"❌ Error during migration: {str(e)}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def main():
+    """Main function."""
+    try:
+        add_name_lc_column()
+        print("\n🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
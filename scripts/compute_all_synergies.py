@@ -8,24 +8,240 @@ and stores them in the database for fast querying later.
 import os
 import sys
 import time
-from itertools import combinations
-from typing import List, Dict, Any
+from contextlib import nullcontext
+from multiprocessing import get_context
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.models.card_info import CardInfo
-from src.models.card_synergy import CardSynergy
+from src.models.card_synergy import CardSynergy, SynergyRecord
+from src.models.json_codec import load_json
 from src.services.text_analysis import calculate_synergy_score
+from src.services.synergy_matrix import (
+    SCORE_TOLERANCE,
+    SynergyFeatures,
+    band_pairs,
+    build_synergy_features,
+    feature_cache_key,
+    load_synergy_features,
+    save_synergy_features,
+    score_block,
+    synergy_fingerprint,
+    upper_triangle_bands,
+)
+from src.services.synergy_kernels import NUMBA_AVAILABLE, kernel_arrays, score_upper_triangle
 from src.database import db
 from main import create_app
 
-def get_analyzed_cards() -> List[CardInfo]:
-    """Get all cards that have been analyzed."""
-    return CardInfo.query.filter(CardInfo._extracted_data.isnot(None)).all()
+# SQLite settings for the bulk write phase, on top of the connection pragmas
+# from src.database. The synergy table is derived data that can always be
+# recomputed, so durability is traded for insert throughput.
+BULK_WRITE_PRAGMAS = [
+    "PRAGMA synchronous=OFF",
+    "PRAGMA wal_autocheckpoint=10000",
+]
+
+# Upper-triangle pairs screened per band of rows
+PAIRS_PER_BAND = 1_000_000
+
+# Encoded synergy profiles from the last run, stored in the app instance folder
+FEATURE_CACHE_FILE = "synergy_features.npz"
+
+# Scoring inputs loaded into each worker process by init_worker()
+_worker_state: Dict[str, Any] = {}
+
+class AnalyzedCard(NamedTuple):
+    """The card columns needed for synergy computation."""
+    id: int
+    name: str
+    extracted_data: Dict[str, Any]
+
+def get_analyzed_cards() -> List[AnalyzedCard]:
+    """
+    Get all cards that have been analyzed.
+
+    Streams only the ID, name and extracted data columns instead of loading
+    full ORM objects. Each distinct JSON document is decoded once; cards whose
+    analysis came from the same cache entry share the decoded dictionary,
+    which must therefore be treated as read-only.
+    """
+    rows = db.session.query(
+        CardInfo.id, CardInfo.name, CardInfo._extracted_data
+    ).filter(CardInfo._extracted_data.isnot(None)).yield_per(2000)
+
+    decoded: Dict[str, Dict[str, Any]] = {}
+    cards = []
+    for card_id, name, extracted_data in rows:
+        data = decoded.get(extracted_data)
+        if data is None:
+            data = decoded[extracted_data] = load_json(extracted_data) if extracted_data else {}
+        cards.append(AnalyzedCard(card_id, name, data))
+    return cards
+
+def configure_bulk_writes() -> None:
+    """Apply SQLite pragmas that speed up large batched inserts."""
+    for pragma in BULK_WRITE_PRAGMAS:
+        db.session.execute(text(pragma))
+
+def build_row_tasks(rows: np.ndarray, cols: np.ndarray) -> List[Tuple[int, List[int]]]:
+    """
+    Group candidate pairs by their first card.
+
+    Args:
+        rows: First card index of each candidate pair, in ascending order
+        cols: Second card index of each candidate pair
+
+    Returns:
+        List of (row index, partner indices) tasks for score_row()
+    """
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else []
+    return [
+        (i, row_cols.tolist())
+        for i, row_cols in zip(rows[starts].tolist(), np.split(cols, starts[1:]))
+    ]
+
+def init_worker(analyses: List[Dict[str, Any]], card_rows: List[int], card_ids: List[int],
+                profile_counts: List[int], min_score: float) -> None:
+    """Load the read-only scoring inputs once per worker process."""
+    _worker_state.update(
+        analyses=analyses,
+        card_rows=card_rows,
+        card_ids=card_ids,
+        profile_counts=profile_counts,
+        min_score=min_score,
+        pair_cache={},
+    )
+
+def score_row(task: Tuple[int, List[int]]) -> Tuple[int, List[Dict[str, Any]], int, List[Tuple[int, str]]]:
+    """
+    Build synergy rows for one card against its candidate partners.
+
+    Args:
+        task: (row index, partner indices) from build_row_tasks()
+
+    Returns:
+        Tuple of (row index, synergy rows to store, low-score count, errors)
+    """
+    i, cols = task
+    state = _worker_state
+    analyses, card_rows, card_ids = state["analyses"], state["card_rows"], state["card_ids"]
+    profile_counts, pair_cache = state["profile_counts"], state["pair_cache"]
+
+    row_synergies, skipped, errors = [], 0, []
+    for j in cols:
+        profile1, profile2 = card_rows[i], card_rows[j]
+        try:
+            # Results are only worth caching for profiles shared by several cards
+            record = pair_cache.get((profile1, profile2))
+            if record is None:
+                record = SynergyRecord.from_analysis(calculate_synergy_score(
+                    analyses[profile1], analyses[profile2]
+                ))
+                if profile_counts[profile1] > 1 or profile_counts[profile2] > 1:
+                    pair_cache[(profile1, profile2)] = record
+
+            # Only store if score meets minimum threshold
+            if record.total_score >= state["min_score"]:
+                row_synergies.append(CardSynergy.row_from_record(
+                    card_ids[i], card_ids[j], record
+                ))
+            else:
+                skipped += 1
+        except Exception as e:
+            errors.append((j, str(e)))
+
+    return i, row_synergies, skipped, errors
 
-def compute_synergies_batch(cards: List[CardInfo], batch_size: int = 1000,
-                           min_score: float = 1.0) -> Dict[str, int]:
+def build_profiles(analyses: List[Dict[str, Any]]) -> Tuple[np.ndarray, SynergyFeatures]:
+    """
+    Encode the distinct synergy profiles among card analyses.
+
+    Cards with the same synergy-relevant data score identically, so features
+    are built once per distinct fingerprint and pair results can be memoized.
+    Cards sharing a decoded analysis object are fingerprinted once.
+
+    Args:
+        analyses: Extracted data of each card
+
+    Returns:
+        Tuple of (profile row of each card, features with one row per profile)
+    """
+    fingerprint_cache: Dict[int, bytes] = {}
+    fingerprints = [
+        fingerprint_cache.get(id(analysis))
+        or fingerprint_cache.setdefault(id(analysis), synergy_fingerprint(analysis))
+        for analysis in analyses
+    ]
+    unique_rows: Dict[bytes, int] = {}
+    card_rows = np.array(
+        [unique_rows.setdefault(fp, len(unique_rows)) for fp in fingerprints], dtype=np.intp
+    )
+    unique_analyses = [None] * len(unique_rows)
+    for analysis, row in zip(analyses, card_rows.tolist()):
+        unique_analyses[row] = analysis
+    return card_rows, build_synergy_features(unique_analyses)
+
+def get_feature_cache_key() -> str:
+    """Key the feature cache on the analyzed cards' count, highest ID and last update."""
+    count, max_id, last_update = db.session.query(
+        db.func.count(CardInfo.id), db.func.max(CardInfo.id), db.func.max(CardInfo.updated_at)
+    ).filter(CardInfo._extracted_data.isnot(None)).one()
+    return feature_cache_key(count, max_id, last_update)
+
+def load_or_build_profiles(card_ids: List[int], analyses: List[Dict[str, Any]],
+                           cache_path: Optional[str]) -> Tuple[np.ndarray, SynergyFeatures]:
+    """
+    Get the synergy profiles from the feature cache, rebuilding it on a miss.
+
+    Args:
+        card_ids: Database ID of each card, in card order
+        analyses: Extracted data of each card
+        cache_path: .npz cache file, or None to always build
+
+    Returns:
+        Tuple of (profile row of each card, features with one row per profile)
+    """
+    if cache_path is None:
+        return build_profiles(analyses)
+
+    cache_key = get_feature_cache_key()
+    cached = load_synergy_features(cache_path)
+    if cached is not None:
+        features, extra = cached
+        if (str(extra.get("cache_key")) == cache_key
+                and np.array_equal(extra.get("card_ids"), card_ids)):
+            print(f"♻️  Reusing cached synergy features from {cache_path}")
+            return extra["card_rows"].astype(np.intp), features
+
+    card_rows, features = build_profiles(analyses)
+    try:
+        save_synergy_features(
+            cache_path, features, cache_key=np.array(cache_key),
+            card_ids=np.array(card_ids, dtype=np.int64), card_rows=card_rows
+        )
+    except OSError as e:
+        print(f"⚠️  Could not write feature cache {cache_path}: {str(e)}")
+    return card_rows, features
+
+def store_batch(synergy_batch: List[Dict[str, Any]], stats: Dict[str, int]) -> None:
+    """
+    Insert a batch of synergy rows and count new versus already-stored pairs.
+
+    Pairs already in the table are skipped by the INSERT OR IGNORE in
+    CardSynergy.bulk_insert(), so no stored pairs are fetched beforehand.
+    """
+    inserted = CardSynergy.bulk_insert(synergy_batch)
+    stats["stored"] += inserted
+    stats["already_stored"] += len(synergy_batch) - inserted
+
+def compute_synergies_batch(cards: List[AnalyzedCard], batch_size: int = 1000,
+                           min_score: float = 1.0, workers: Optional[int] = None,
+                           feature_cache: Optional[str] = None) -> Dict[str, int]:
     """
     Compute synergies for all card pairs in batches.
 
@@ -33,6 +249,8 @@ def compute_synergies_batch(cards: List[CardInfo], batch_size: int = 1000,
         cards: List of analyzed cards
         batch_size: Number of synergies to compute before committing to database
         min_score: Minimum synergy score to store (saves space)
+        workers: Processes used to build breakdowns (defaults to CPU count)
+        feature_cache: .npz file to reuse encoded synergy features across runs
 
     Returns:
         Dictionary with computation statistics
@@ -48,6 +266,7 @@ def compute_synergies_batch(cards: List[CardInfo], batch_size: int = 1000,
     stats = {
         "processed": 0,
         "stored": 0,
+        "already_stored": 0,
         "skipped_low_score": 0,
         "errors": 0,
         "batches": 0
@@ -56,60 +275,98 @@ def compute_synergies_batch(cards: List[CardInfo], batch_size: int = 1000,
     synergy_batch = []
     start_time = time.time()
 
-    # Generate all unique pairs
-    for i, (card1, card2) in enumerate(combinations(cards, 2)):
-        try:
-            # Check if synergy already exists
-            existing = CardSynergy.get_synergy(card1.id, card2.id)
-            if existing:
-                stats["processed"] += 1
-                continue
-
-            # Calculate synergy
-            synergy_result = calculate_synergy_score(
-                card1.extracted_data or {},
-                card2.extracted_data or {}
-            )
-
-            total_score = synergy_result.get('total_score', 0)
-            stats["processed"] += 1
-
-            # Only store if score meets minimum threshold
-            if total_score >= min_score:
-                synergy = CardSynergy.create_from_analysis(
-                    card1.id, card2.id, synergy_result
+    configure_bulk_writes()
+
+    # Cards are referenced by position from here on; only their IDs, names
+    # and distinct synergy profiles are kept for the scoring loop
+    card_ids = [card.id for card in cards]
+    card_names = [card.name for card in cards]
+
+    # Score pairs with matrix operations, then only run the
+    # per-pair scorer (for the stored breakdown) on pairs that clear min_score
+    analyses = [card.extracted_data or {} for card in cards]
+    card_rows, features = load_or_build_profiles(card_ids, analyses, feature_cache)
+    unique_analyses = [None] * len(features)
+    for analysis, row in zip(analyses, card_rows.tolist()):
+        unique_analyses[row] = analysis
+    del analyses
+
+    print(f"🧬 {len(features):,} distinct synergy profiles across {total_cards:,} cards")
+
+    workers = workers or os.cpu_count() or 1
+    initargs = (
+        unique_analyses,
+        card_rows.tolist(),
+        card_ids,
+        np.bincount(card_rows).tolist(),
+        min_score,
+    )
+    threshold = min_score - SCORE_TOLERANCE
+    if NUMBA_AVAILABLE:
+        card_features = features.take(card_rows)
+        kernel_inputs = kernel_arrays(card_features)
+
+    print(f"🧵 Building breakdowns with {workers} worker(s)")
+
+    # Spawned workers: forking after the parallel kernel has started its
+    # thread pool can deadlock the children
+    with (get_context("spawn").Pool(workers, initializer=init_worker, initargs=initargs)
+          if workers > 1 else nullcontext()) as pool:
+        if pool is None:
+            init_worker(*initargs)
+
+        # Screen the upper triangle in bands of rows so memory stays bounded
+        for band_start, band_end in upper_triangle_bands(total_cards, PAIRS_PER_BAND):
+            rows, cols = band_pairs(total_cards, band_start, band_end)
+            if NUMBA_AVAILABLE:
+                # Compiled kernel scores only the upper triangle, in parallel
+                pair_scores = score_upper_triangle(
+                    card_features, min_score=threshold, row_start=band_start,
+                    row_end=band_end, arrays=kernel_inputs
                 )
-                synergy_batch.append(synergy)
-                stats["stored"] += 1
             else:
-                stats["skipped_low_score"] += 1
-
-            # Commit batch when it reaches batch_size
-            if len(synergy_batch) >= batch_size:
-                db.session.add_all(synergy_batch)
-                db.session.commit()
-                stats["batches"] += 1
-                synergy_batch = []
-
-                # Progress update
-                elapsed = time.time() - start_time
-                rate = stats["processed"] / elapsed if elapsed > 0 else 0
-                eta = (total_pairs - stats["processed"]) / rate if rate > 0 else 0
-
-                print(f"📈 Progress: {stats['processed']:,}/{total_pairs:,} pairs "
-                      f"({stats['processed']/total_pairs*100:.1f}%) - "
-                      f"Stored: {stats['stored']:,} - "
-                      f"Rate: {rate:.1f} pairs/sec - "
-                      f"ETA: {eta/60:.1f}m")
-
-        except Exception as e:
-            print(f"❌ Error processing {card1.name} + {card2.name}: {str(e)}")
-            stats["errors"] += 1
-            continue
+                # Band cards against distinct profiles, then expand to cards
+                block = score_block(features.take(card_rows[band_start:band_end]), features)
+                pair_scores = block[rows - band_start, card_rows[cols]]
+            candidates = pair_scores >= threshold
+            stats["processed"] += len(rows)
+            stats["skipped_low_score"] += int(len(rows) - candidates.sum())
+
+            tasks = build_row_tasks(rows[candidates], cols[candidates])
+            if pool is None:
+                results = map(score_row, tasks)
+            else:
+                results = pool.imap_unordered(score_row, tasks, chunksize=8)
+
+            for i, row_synergies, skipped, errors in results:
+                stats["skipped_low_score"] += skipped
+                stats["errors"] += len(errors)
+                for j, message in errors:
+                    print(f"❌ Error processing {card_names[i]} + {card_names[j]}: {message}")
+
+                synergy_batch.extend(row_synergies)
+
+                # Write the batch as one executemany and commit at the boundary
+                if len(synergy_batch) >= batch_size:
+                    store_batch(synergy_batch, stats)
+                    db.session.commit()
+                    stats["batches"] += 1
+                    synergy_batch = []
+
+            # Progress update
+            elapsed = time.time() - start_time
+            rate = stats["processed"] / elapsed if elapsed > 0 else 0
+            eta = (total_pairs - stats["processed"]) / rate if rate > 0 else 0
+
+            print(f"📈 Progress: {stats['processed']:,}/{total_pairs:,} pairs "
+                  f"({stats['processed']/total_pairs*100:.1f}%) - "
+                  f"Stored: {stats['stored']:,} - "
+                  f"Rate: {rate:.1f} pairs/sec - "
+                  f"ETA: {eta/60:.1f}m")
 
     # Commit remaining batch
     if synergy_batch:
-        db.session.add_all(synergy_batch)
+        store_batch(synergy_batch, stats)
         db.session.commit()
         stats["batches"] += 1
 
@@ -122,6 +379,7 @@ def show_computation_summary(stats: Dict[str, int], elapsed_time: float):
     print(f"📊 Results:")
     print(f"  Total pairs processed: {stats['processed']:,}")
     print(f"  Synergies stored: {stats['stored']:,}")
+    print(f"  Already stored pairs ignored: {stats['already_stored']:,}")
     print(f"  Low-score pairs skipped: {stats['skipped_low_score']:,}")
     print(f"  Errors encountered: {stats['errors']:,}")
     print(f"  Database batches: {stats['batches']:,}")
@@ -154,35 +412,37 @@ def show_synergy_analytics():
     print(f"\n📈 SYNERGY ANALYTICS:")
     print("-" * 60)
 
-    total_synergies = CardSynergy.query.count()
+    def count_where(condition):
+        return db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+
+    # All counts come from a single scan of the synergy table
+    analytics = db.session.query(
+        db.func.count(CardSynergy.id).label("total"),
+        count_where(CardSynergy.total_score >= 30).label("high"),
+        count_where(db.and_(CardSynergy.total_score >= 15,
+                            CardSynergy.total_score < 30)).label("good"),
+        count_where(db.and_(CardSynergy.total_score >= 5,
+                            CardSynergy.total_score < 15)).label("moderate"),
+        count_where(CardSynergy.tribal_score >= 10).label("tribal"),
+        count_where(CardSynergy.combo_score >= 10).label("combo"),
+        count_where(CardSynergy.archetype_score >= 10).label("archetype"),
+    ).one()
+
+    total_synergies = analytics.total
     print(f"💾 Total synergies stored: {total_synergies:,}")
 
     if total_synergies == 0:
         return
 
     # Score distribution
-    high_synergy = CardSynergy.query.filter(CardSynergy.total_score >= 30).count()
-    good_synergy = CardSynergy.query.filter(
-        CardSynergy.total_score >= 15,
-        CardSynergy.total_score < 30
-    ).count()
-    moderate_synergy = CardSynergy.query.filter(
-        CardSynergy.total_score >= 5,
-        CardSynergy.total_score < 15
-    ).count()
-
-    print(f"🔥 High synergy (30+): {high_synergy:,}")
-    print(f"✨ Good synergy (15-30): {good_synergy:,}")
-    print(f"👍 Moderate synergy (5-15): {moderate_synergy:,}")
+    print(f"🔥 High synergy (30+): {analytics.high:,}")
+    print(f"✨ Good synergy (15-30): {analytics.good:,}")
+    print(f"👍 Moderate synergy (5-15): {analytics.moderate:,}")
 
     # Top synergy types
-    top_tribal = CardSynergy.query.filter(CardSynergy.tribal_score >= 10).count()
-    top_combo = CardSynergy.query.filter(CardSynergy.combo_score >= 10).count()
-    top_archetype = CardSynergy.query.filter(CardSynergy.archetype_score >= 10).count()
-
-    print(f"🏷️  Strong tribal synergies: {top_tribal:,}")
-    print(f"💥 Strong combo synergies: {top_combo:,}")
-    print(f"🎭 Strong archetype synergies: {top_archetype:,}")
+    print(f"🏷️  Strong tribal synergies: {analytics.tribal:,}")
+    print(f"💥 Strong combo synergies: {analytics.combo:,}")
+    print(f"🎭 Strong archetype synergies: {analytics.archetype:,}")
 
 def main():
     """Main function."""
@@ -229,7 +489,10 @@ def main():
         start_time = time.time()
 
         # Compute all synergies
-        stats = compute_synergies_batch(cards, min_score=min_score)
+        stats = compute_synergies_batch(
+            cards, min_score=min_score,
+            feature_cache=os.path.join(app.instance_path, FEATURE_CACHE_FILE)
+        )
 
         elapsed_time = time.time() - start_time
 
@@ -14,7 +14,7 @@ from pathlib import Path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from main import create_app
-from src.database import db
+from src.database import configure_sqlite, db
 from src.models.card_synergy import CardSynergy
 
 def check_table_exists(cursor, table_name: str) -> bool:
@@ -51,6 +51,7 @@ def create_synergy_table():
 
     # Connect directly to SQLite to check and create table
     conn = sqlite3.connect(db_path)
+    configure_sqlite(conn)
     cursor = conn.cursor()
 
     try:
@@ -66,6 +67,9 @@ def create_synergy_table():
 
         print("➕ Creating card_synergy table...")
 
+        # Run all DDL in one explicit transaction instead of one per statement
+        cursor.execute("BEGIN")
+
         # Create the table with all necessary columns and indexes
         cursor.execute("""
             CREATE TABLE card_synergy (
@@ -87,18 +91,28 @@ def create_synergy_table():
                 updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (card1_id) REFERENCES card_info (id),
                 FOREIGN KEY (card2_id) REFERENCES card_info (id),
-                UNIQUE (card1_id, card2_id)
+                UNIQUE (card1_id, card2_id),
+                CHECK (card1_id < card2_id)
             )
         """)
 
         # Create indexes for fast querying
         indexes = [
-            "CREATE INDEX idx_synergy_score ON card_synergy (total_score)",
+            # Covering index: score-filtered pair scans never touch the table
+            "CREATE INDEX idx_synergy_score ON card_synergy (total_score DESC, card1_id, card2_id)",
             "CREATE INDEX idx_tribal_synergy ON card_synergy (tribal_score)",
             "CREATE INDEX idx_combo_synergy ON card_synergy (combo_score)",
             "CREATE INDEX idx_archetype_synergy ON card_synergy (archetype_score)",
-            "CREATE INDEX idx_card1_synergies ON card_synergy (card1_id)",
-            "CREATE INDEX idx_card2_synergies ON card_synergy (card2_id)",
+            # Covering indexes: top synergies for a card are index-only scans
+            "CREATE INDEX idx_card1_top ON card_synergy (card1_id, total_score DESC, card2_id)",
+            "CREATE INDEX idx_card2_top ON card_synergy (card2_id, total_score DESC, card1_id)",
+            # Partial covering indexes: deck cores per archetype are ordered index walks
+            "CREATE INDEX idx_tribal_cores ON card_synergy "
+            "(total_score DESC, card1_id, card2_id, tribal_score) WHERE tribal_score >= 10",
+            "CREATE INDEX idx_combo_cores ON card_synergy "
+            "(total_score DESC, card1_id, card2_id, combo_score) WHERE combo_score >= 10",
+            "CREATE INDEX idx_control_cores ON card_synergy "
+            "(total_score DESC, card1_id, card2_id, archetype_score) WHERE archetype_score >= 8",
         ]
 
         for index_sql in indexes:
@@ -4,6 +4,7 @@ Script to demonstrate card text analysis with data from the actual database.
 """
 import os
 import sys
+import random
 import argparse
 
 # Add the project root to the Python path
@@ -26,6 +27,30 @@ def setup_app():
     db.init_app(app)
     return app
 
+def pick_random_cards(limit=1):
+    """
+    Pick a run of cards with oracle text starting at a random ID.
+
+    Seeks on the primary key from a random starting point, wrapping around to
+    the lowest IDs if needed, instead of ORDER BY random() sorting the table.
+
+    Args:
+        limit: Number of cards to return
+
+    Returns:
+        List of up to limit CardInfo objects
+    """
+    min_id, max_id = db.session.query(db.func.min(CardInfo.id), db.func.max(CardInfo.id)).one()
+    if max_id is None:
+        return []
+
+    start = random.randint(min_id, max_id)
+    with_text = CardInfo.query.filter(CardInfo.oracle_text.isnot(None))
+    cards = with_text.filter(CardInfo.id >= start).order_by(CardInfo.id).limit(limit).all()
+    if len(cards) < limit:
+        cards += with_text.filter(CardInfo.id < start).order_by(CardInfo.id).limit(limit - len(cards)).all()
+    return cards
+
 def demo_analyze_single_card(card_id=None, card_name=None):
     """
     Analyze a single card by ID or name.
@@ -43,7 +68,8 @@ def demo_analyze_single_card(card_id=None, card_name=None):
             card_info = CardInfo.query.filter(CardInfo.name.ilike(f"%{card_name}%")).first()
         else:
             # Get a random card with oracle text
-            card_info = CardInfo.query.filter(CardInfo.oracle_text.isnot(None)).order_by(db.func.random()).first()
+            cards = pick_random_cards()
+            card_info = cards[0] if cards else None
 
         if not card_info:
             print("No card found to analyze.")
@@ -81,17 +107,15 @@ def demo_analyze_batch(limit=10):
     app = setup_app()
 
     with app.app_context():
-        # Get cards that haven't been analyzed yet (no keywords)
+        # Get cards that haven't been analyzed yet (uses the partial index)
         cards = CardInfo.query.filter(
-            CardInfo.oracle_text.isnot(None),
-            CardInfo._keywords.is_(None)
-        ).limit(limit).all()
+            CardInfo.analyzed_at.is_(None),
+            CardInfo.oracle_text.isnot(None)
+        ).order_by(CardInfo.id).limit(limit).all()
 
         if not cards:
             print(f"No cards found that need analysis. Picking random cards instead.")
-            cards = CardInfo.query.filter(
-                CardInfo.oracle_text.isnot(None)
-            ).order_by(db.func.random()).limit(limit).all()
+            cards = pick_random_cards(limit)
 
         print(f"Analyzing {len(cards)} cards...")
 
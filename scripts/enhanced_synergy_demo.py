@@ -18,16 +18,30 @@ The enhanced system provides detailed scoring and explanations for each synergy
 import os
 import sys
 import json
-from typing import Dict, List, Any
+import shelve
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+
+import numpy as np
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from src.models.analysis_cache import AnalysisCache
+from src.models.json_codec import dump_json
 from src.services.text_analysis import (
     analyze_card_text,
-    calculate_synergy_score,
-    find_synergy_candidates
+    calculate_synergy_score
+)
+from src.services.synergy_matrix import (
+    SynergyFeatures,
+    build_synergy_features,
+    feature_cache_key,
+    load_synergy_features,
+    save_synergy_features,
+    top_k_per_row
 )
+from src.services.synergy_kernels import NUMBA_AVAILABLE, kernel_arrays, score_tile
 
 # Enhanced sample cards with comprehensive data
 SAMPLE_CARDS = [
@@ -272,6 +286,38 @@ SAMPLE_CARDS = [
     }
 ]
 
+# Analyses persisted across demo runs, keyed by AnalysisCache.hash_input()
+ANALYSIS_SHELF = "enhanced_synergy_analysis_cache"
+
+# Analyses already looked up in this process
+_analysis_memo: Dict[str, Dict[str, Any]] = {}
+
+def cached_analyze_card_text(oracle_text: str, card_data: Dict[str, Any],
+                             shelf: shelve.Shelf) -> Dict[str, Any]:
+    """
+    Analyze card text, reusing results from this process or earlier runs.
+
+    The key hashes the analysis version with the analyzer input, so bumping
+    ANALYSIS_VERSION invalidates stored results just like the database cache.
+
+    Args:
+        oracle_text: The card's oracle text
+        card_data: Additional card data passed to the analyzer
+        shelf: Open shelf holding analyses from earlier runs
+
+    Returns:
+        Output of analyze_card_text()
+    """
+    key = AnalysisCache.hash_input(oracle_text, card_data)
+    analysis = _analysis_memo.get(key)
+    if analysis is None:
+        analysis = shelf.get(key)
+        if analysis is None:
+            analysis = analyze_card_text(oracle_text, card_data)
+            shelf[key] = analysis
+        _analysis_memo[key] = analysis
+    return analysis
+
 def analyze_enhanced_cards() -> List[Dict[str, Any]]:
     """
     Analyze all sample cards with enhanced analysis including card data.
@@ -281,10 +327,14 @@ def analyze_enhanced_cards() -> List[Dict[str, Any]]:
     print("🔍 ANALYZING CARDS WITH ENHANCED SYSTEM")
     print("=" * 60)
 
-    for card in SAMPLE_CARDS:
-        print(f"\nAnalyzing: {card['name']}")
+    with shelve.open(ANALYSIS_SHELF) as shelf:
+        analyses = [
+            cached_analyze_card_text(card["oracle_text"], card["card_data"], shelf)
+            for card in SAMPLE_CARDS
+        ]
 
-        analysis = analyze_card_text(card["oracle_text"], card["card_data"])
+    for card, analysis in zip(SAMPLE_CARDS, analyses):
+        print(f"\nAnalyzing: {card['name']}")
 
         analyzed_cards.append({
             "name": card["name"],
@@ -302,7 +352,78 @@ def analyze_enhanced_cards() -> List[Dict[str, Any]]:
 
     return analyzed_cards
 
-def demonstrate_synergy_detection(cards: List[Dict[str, Any]]):
+@dataclass
+class CollectionArrays:
+    """Analyzed cards as parallel per-row arrays, built once per run."""
+    names: np.ndarray                  # (N,) card names
+    analyses: List[Dict[str, Any]]     # (N,) analysis of each card
+    features: SynergyFeatures          # encoded synergy fields, one row per card
+    name_to_idx: Dict[str, int]        # card name -> row
+
+# Encoded features and card names, for tools that score without re-reading
+# the JSON results
+FEATURES_EXPORT_FILE = "enhanced_synergy_features.npz"
+NAMES_EXPORT_FILE = "enhanced_synergy_names.json"
+
+def collection_key(cards: List[Dict[str, Any]]) -> str:
+    """Key the exported features on every card's analyzer input hash."""
+    return feature_cache_key(*(
+        AnalysisCache.hash_input(card["oracle_text"], card["card_data"]) for card in cards
+    ))
+
+def load_feature_export(cards: List[Dict[str, Any]]) -> Optional[SynergyFeatures]:
+    """
+    Read the exported features if they were built from exactly these cards.
+
+    Args:
+        cards: Output of analyze_enhanced_cards()
+
+    Returns:
+        The saved features, or None if missing or stale
+    """
+    loaded = load_synergy_features(FEATURES_EXPORT_FILE)
+    if loaded is None:
+        return None
+    features, extra = loaded
+    if "key" not in extra or str(extra["key"]) != collection_key(cards):
+        return None
+    return features
+
+def save_feature_export(cards: List[Dict[str, Any]], collection: CollectionArrays):
+    """
+    Save the encoded features as an uncompressed .npz with the card names as JSON.
+
+    Loading the .npz restores ready-to-score arrays without parsing any JSON
+    or rebuilding per-card dictionaries.
+    """
+    save_synergy_features(FEATURES_EXPORT_FILE, collection.features,
+                          key=np.array(collection_key(cards)))
+    with open(NAMES_EXPORT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(collection.names.tolist(), f, ensure_ascii=False)
+
+    print(f"💾 Synergy features saved to: {FEATURES_EXPORT_FILE} (names in {NAMES_EXPORT_FILE})")
+
+def build_collection_arrays(cards: List[Dict[str, Any]],
+                            features: Optional[SynergyFeatures] = None) -> CollectionArrays:
+    """
+    Convert analyzed cards into parallel arrays with a name -> row index.
+
+    Args:
+        cards: Output of analyze_enhanced_cards()
+        features: Previously encoded features for the cards, if available
+
+    Returns:
+        CollectionArrays for the cards
+    """
+    analyses = [card["analysis"] for card in cards]
+    return CollectionArrays(
+        names=np.array([card["name"] for card in cards]),
+        analyses=analyses,
+        features=build_synergy_features(analyses) if features is None else features,
+        name_to_idx={card["name"]: i for i, card in enumerate(cards)}
+    )
+
+def demonstrate_synergy_detection(collection: CollectionArrays):
     """
     Demonstrate comprehensive synergy detection between cards.
     """
@@ -319,17 +440,17 @@ def demonstrate_synergy_detection(cards: List[Dict[str, Any]]):
         ("Lightning Bolt", "Goblin Guide"),   # Aggro archetype
     ]
 
-    card_lookup = {card["name"]: card for card in cards}
+    name_to_idx = collection.name_to_idx
 
     for card1_name, card2_name in interesting_pairs:
-        if card1_name in card_lookup and card2_name in card_lookup:
-            card1 = card_lookup[card1_name]
-            card2 = card_lookup[card2_name]
-
+        if card1_name in name_to_idx and card2_name in name_to_idx:
             print(f"\n🔗 SYNERGY: {card1_name} + {card2_name}")
             print("-" * 40)
 
-            synergy = calculate_synergy_score(card1["analysis"], card2["analysis"])
+            synergy = calculate_synergy_score(
+                collection.analyses[name_to_idx[card1_name]],
+                collection.analyses[name_to_idx[card2_name]]
+            )
 
             print(f"Total Synergy Score: {synergy['total_score']:.1f}")
             print("\nScore Breakdown:")
@@ -347,39 +468,41 @@ def demonstrate_synergy_detection(cards: List[Dict[str, Any]]):
                 for match in synergy['matches']:
                     print(f"  • {match}")
 
-def demonstrate_collection_synergies(cards: List[Dict[str, Any]]):
+def demonstrate_collection_synergies(collection: CollectionArrays):
     """
     Demonstrate finding synergies for each card against the entire collection.
     """
     print("\n\n📚 COLLECTION-WIDE SYNERGY ANALYSIS")
     print("=" * 60)
 
-    for target_card in cards[:6]:  # Just show first few to keep output manageable
-        print(f"\n🎯 Finding synergies for: {target_card['name']}")
+    names, analyses, features = collection.names, collection.analyses, collection.features
+    threshold = 3.0
+
+    # Score the collection tile by tile instead of one calculate_synergy_score()
+    # per pair, keeping only each card's top 3, with the compiled kernel when
+    # Numba is installed. Cards never pair with a card of the same name.
+    tile_scorer = None
+    if NUMBA_AVAILABLE:
+        arrays = kernel_arrays(features)
+        def tile_scorer(row_start, row_end, col_start, col_end):
+            return score_tile(features, row_start, row_end, col_start, col_end, arrays)
+    counts, top_partners, _ = top_k_per_row(
+        features, 3, threshold, groups=names, score_tile=tile_scorer
+    )
+
+    for i in range(min(6, len(names))):  # Just show first few to keep output manageable
+        print(f"\n🎯 Finding synergies for: {names[i]}")
         print("-" * 40)
 
-        # Add the card name to the analysis for comparison
-        target_analysis = target_card["analysis"].copy()
-        target_analysis["name"] = target_card["name"]
-
-        # Prepare collection analyses with names
-        collection_analyses = []
-        for card in cards:
-            card_analysis = card["analysis"].copy()
-            card_analysis["name"] = card["name"]
-            collection_analyses.append(card_analysis)
+        if counts[i]:
+            print(f"Found {counts[i]} synergistic cards:")
+            top = top_partners[i][top_partners[i] >= 0]  # Show top 3
+            for rank, j in enumerate(top.tolist(), 1):
+                # Full scorer only for the cards shown, to get their matches
+                synergy = calculate_synergy_score(analyses[i], analyses[j])
+                matches = synergy["matches"]
 
-        # Find synergies with other cards in collection
-        synergies = find_synergy_candidates(target_analysis, collection_analyses, threshold=3.0)
-
-        if synergies:
-            print(f"Found {len(synergies)} synergistic cards:")
-            for i, synergy in enumerate(synergies[:3], 1):  # Show top 3
-                other_card_name = synergy["card"].get('name', 'Unknown')
-                score = synergy["score"]
-                matches = synergy["synergy"]["matches"]
-
-                print(f"  {i}. {other_card_name} (Score: {score:.1f})")
+                print(f"  {rank}. {names[j]} (Score: {synergy['total_score']:.1f})")
                 if matches:
                     print(f"     Matches: {', '.join(matches[:3])}")  # Show first 3 matches
                 else:
@@ -393,19 +516,10 @@ def save_analysis_results(cards: List[Dict[str, Any]]):
     """
     output_file = "enhanced_synergy_analysis.json"
 
-    # Create a clean version for JSON output
-    clean_cards = []
-    for card in cards:
-        clean_card = {
-            "name": card["name"],
-            "oracle_text": card["oracle_text"],
-            "card_data": card["card_data"],
-            "analysis": card["analysis"]
-        }
-        clean_cards.append(clean_card)
-
+    # The analyzed cards already have exactly the fields to save, so they are
+    # written as-is rather than copied into a second list first
     with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(clean_cards, f, indent=2, ensure_ascii=False)
+        f.write(dump_json(cards, indent=True))
 
     print(f"\n💾 Detailed analysis saved to: {output_file}")
 
@@ -420,14 +534,21 @@ def main():
         # Analyze all cards with enhanced system
         analyzed_cards = analyze_enhanced_cards()
 
+        # Index the analyses once for both demonstrations, reusing the
+        # exported features when they match these cards
+        features = load_feature_export(analyzed_cards)
+        collection = build_collection_arrays(analyzed_cards, features)
+
         # Demonstrate detailed synergy detection
-        demonstrate_synergy_detection(analyzed_cards)
+        demonstrate_synergy_detection(collection)
 
         # Demonstrate collection-wide synergy finding
-        demonstrate_collection_synergies(analyzed_cards)
+        demonstrate_collection_synergies(collection)
 
         # Save results for detailed inspection
         save_analysis_results(analyzed_cards)
+        if features is None:
+            save_feature_export(analyzed_cards, collection)
 
         print("\n\n✅ DEMO COMPLETED SUCCESSFULLY!")
         print("=" * 60)
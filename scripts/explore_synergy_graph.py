@@ -5,10 +5,12 @@ Query and analyze stored synergy data to find deck building strategies.
 This script provides tools to explore the synergy graph and discover
 optimal card combinations for different strategies.
 """
+import heapq
 import os
 import sys
-from typing import List, Dict, Any, Set
-from collections import defaultdict, Counter
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -18,6 +20,112 @@ from src.models.card_synergy import CardSynergy
 from src.database import db
 from main import create_app
 
+def pair_card_rows(card1_ids: Sequence[int], card2_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Map the cards of synergy pairs to dense rows in order of first appearance.
+
+    Args:
+        card1_ids: First card of each pair
+        card2_ids: Second card of each pair
+
+    Returns:
+        Tuple of (card ID of each row, (M, 2) rows of each pair's cards)
+    """
+    ids = np.column_stack([card1_ids, card2_ids]).astype(np.int64).ravel()
+    unique_ids, first_seen, inverse = np.unique(ids, return_index=True, return_inverse=True)
+    order = np.argsort(first_seen)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return unique_ids[order], rank[inverse.ravel()].reshape(-1, 2)
+
+def csr_adjacency(pair_rows: np.ndarray, scores: np.ndarray,
+                  num_rows: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build compressed sparse row adjacency for undirected scored pairs.
+
+    Args:
+        pair_rows: (M, 2) rows of each pair's cards
+        scores: Score of each pair
+        num_rows: Number of card rows
+
+    Returns:
+        Tuple of (offsets, neighbor rows, edge scores) where the neighbors of
+        row r are neighbor_rows[offsets[r]:offsets[r + 1]]
+    """
+    sources = np.concatenate([pair_rows[:, 0], pair_rows[:, 1]])
+    targets = np.concatenate([pair_rows[:, 1], pair_rows[:, 0]])
+    order = np.argsort(sources, kind="stable")
+    offsets = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_rows), out=offsets[1:])
+    edge_scores = np.concatenate([scores, scores])[order]
+    return offsets, targets[order].astype(np.int32), edge_scores
+
+def load_cards(card_ids: Sequence[int]) -> Dict[int, CardInfo]:
+    """Fetch many cards in one query, keyed by ID."""
+    return {card.id: card for card in CardInfo.query.filter(CardInfo.id.in_(list(card_ids)))}
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the positions of the set bits in an integer bitset."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def disjoint_cliques(neighbors: List[int], min_size: int) -> List[int]:
+    """
+    Partition the graph greedily into disjoint cliques of at least min_size nodes.
+
+    Each clique starts at the remaining node with the most remaining
+    neighbors and repeatedly adds the candidate adjacent to the most other
+    candidates; its nodes are then removed and the next clique is grown.
+    Node sets are Python integers used as bitsets, so set intersections are
+    word-wide AND operations. Unlike enumerating every maximal clique, the
+    work and the number of clusters stay bounded by the number of nodes.
+
+    Args:
+        neighbors: Bitset of each node's neighbors, indexed by node
+        min_size: Smallest clique size to report
+
+    Returns:
+        List of cliques as node bitsets
+    """
+    cliques = []
+    remaining = (1 << len(neighbors)) - 1
+    degrees = {node: bits.bit_count() for node, bits in enumerate(neighbors)}
+
+    def remove(nodes: int) -> None:
+        """Drop nodes from the graph, updating their neighbors' degrees."""
+        nonlocal remaining
+        remaining &= ~nodes
+        for node in iter_bits(nodes):
+            del degrees[node]
+            for neighbor in iter_bits(neighbors[node] & remaining):
+                degrees[neighbor] -= 1
+
+    while degrees:
+        # Nodes with too few remaining neighbors can never join a large enough clique
+        too_small = 0
+        for node, degree in degrees.items():
+            if degree + 1 < min_size:
+                too_small |= 1 << node
+        if too_small:
+            remove(too_small)
+            continue
+
+        start = max(degrees, key=degrees.get)
+        clique = 1 << start
+        candidates = remaining & neighbors[start]
+        while candidates:
+            node = max(iter_bits(candidates),
+                       key=lambda candidate: (candidates & neighbors[candidate]).bit_count())
+            clique |= 1 << node
+            candidates &= neighbors[node]
+
+        remove(clique)
+        if clique.bit_count() >= min_size:
+            cliques.append(clique)
+    return cliques
+
 def find_synergy_clusters(min_score: float = 15.0, min_cluster_size: int = 3) -> List[Dict[str, Any]]:
     """
     Find clusters of cards that all synergize well with each other.
@@ -31,61 +139,56 @@ def find_synergy_clusters(min_score: float = 15.0, min_cluster_size: int = 3) ->
     """
     print(f"🔍 Finding synergy clusters (min_score: {min_score}, min_size: {min_cluster_size})")
 
-    # Get all high-synergy pairs
-    high_synergies = CardSynergy.query.filter(CardSynergy.total_score >= min_score).all()
-
-    # Build adjacency list
-    adjacency = defaultdict(set)
-    for synergy in high_synergies:
-        adjacency[synergy.card1_id].add(synergy.card2_id)
-        adjacency[synergy.card2_id].add(synergy.card1_id)
+    # Get all high-synergy pairs, keeping their scores for the cluster averages
+    high_synergies = db.session.query(
+        CardSynergy.card1_id, CardSynergy.card2_id, CardSynergy.total_score
+    ).filter(CardSynergy.total_score >= min_score).all()
 
     print(f"📊 Found {len(high_synergies)} high-synergy pairs")
-    print(f"📊 {len(adjacency)} cards participate in high synergies")
-
-    # Find clusters using simple connected components
-    visited = set()
-    clusters = []
-
-    def dfs_cluster(card_id: int, current_cluster: Set[int]):
-        """Depth-first search to find connected cluster."""
-        if card_id in visited:
-            return
-        visited.add(card_id)
-        current_cluster.add(card_id)
-
-        # Only include cards that are connected to ALL other cards in cluster
-        # (ensuring it's a complete subgraph)
-        for neighbor in adjacency[card_id]:
-            if neighbor not in visited:
-                # Check if neighbor is connected to all cards in current cluster
-                if all(neighbor in adjacency[cluster_card] or neighbor == cluster_card
-                       for cluster_card in current_cluster):
-                    dfs_cluster(neighbor, current_cluster)
-
-    # Find clusters
-    for card_id in adjacency:
-        if card_id not in visited:
-            cluster = set()
-            dfs_cluster(card_id, cluster)
-            if len(cluster) >= min_cluster_size:
-                clusters.append(cluster)
+    if not high_synergies:
+        print("📊 0 cards participate in high synergies")
+        return []
+
+    card1_ids, card2_ids, scores = zip(*high_synergies)
+    card_ids, pair_rows = pair_card_rows(card1_ids, card2_ids)
+    scores = np.asarray(scores, dtype=np.float64)
+    print(f"📊 {len(card_ids)} cards participate in high synergies")
+
+    # A pair stored in both directions counts once, with its last stored score
+    pair_rows.sort(axis=1)
+    pair_keys = pair_rows[:, 0] * len(card_ids) + pair_rows[:, 1]
+    _, last_seen = np.unique(pair_keys[::-1], return_index=True)
+    keep = np.sort(len(pair_keys) - 1 - last_seen)
+    offsets, adjacent_rows, edge_scores = csr_adjacency(pair_rows[keep], scores[keep], len(card_ids))
+
+    # One neighbor bitset per card row, read off its adjacency slice
+    neighbors = []
+    for row in range(len(card_ids)):
+        bits = 0
+        for neighbor in adjacent_rows[offsets[row]:offsets[row + 1]].tolist():
+            bits |= 1 << neighbor
+        neighbors.append(bits)
+
+    # Clusters are disjoint sets of cards that all synergize with each other
+    cliques = [list(iter_bits(clique)) for clique in disjoint_cliques(neighbors, min_cluster_size)]
+    cards = load_cards(card_ids[np.unique(np.concatenate(cliques))].tolist()) if cliques else {}
 
     # Convert to detailed cluster information
     detailed_clusters = []
-    for i, cluster_card_ids in enumerate(clusters):
-        cluster_cards = CardInfo.query.filter(CardInfo.id.in_(cluster_card_ids)).all()
+    in_cluster = np.zeros(len(card_ids), dtype=bool)
+    for i, rows in enumerate(cliques):
+        cluster_cards = [cards[card_id] for card_id in sorted(card_ids[rows].tolist()) if card_id in cards]
 
-        # Calculate average synergy within cluster
-        total_synergy = 0
+        # Average the edges inside the cluster, each seen from its lower row
+        in_cluster[rows] = True
+        total_synergy = 0.0
         synergy_count = 0
-        for card1_id in cluster_card_ids:
-            for card2_id in cluster_card_ids:
-                if card1_id < card2_id:  # Avoid double counting
-                    synergy = CardSynergy.get_synergy(card1_id, card2_id)
-                    if synergy:
-                        total_synergy += synergy.total_score
-                        synergy_count += 1
+        for row in rows:
+            start, end = offsets[row], offsets[row + 1]
+            inside = in_cluster[adjacent_rows[start:end]] & (adjacent_rows[start:end] > row)
+            total_synergy += float(edge_scores[start:end][inside].sum())
+            synergy_count += int(inside.sum())
+        in_cluster[rows] = False
 
         avg_synergy = total_synergy / synergy_count if synergy_count > 0 else 0
 
@@ -125,114 +228,204 @@ def find_deck_cores(archetype: str = None, min_score: float = 20.0) -> List[Dict
     elif archetype == 'control':
         query = query.filter(CardSynergy.archetype_score >= 8)
 
-    synergies = query.order_by(CardSynergy.total_score.desc()).limit(200).all()
+    synergies = query.with_entities(
+        CardSynergy.card1_id, CardSynergy.card2_id, CardSynergy.total_score
+    ).order_by(CardSynergy.total_score.desc()).limit(200).all()
+    if not synergies:
+        return []
 
-    # Find cards that appear most frequently in high synergies
-    card_synergy_counts = defaultdict(int)
-    card_total_scores = defaultdict(float)
+    # Count each card's appearances in high synergies with per-row arrays
+    card1_ids, card2_ids, scores = zip(*synergies)
+    card_ids, pair_rows = pair_card_rows(card1_ids, card2_ids)
+    rows = pair_rows.ravel()
+    card_synergy_counts = np.bincount(rows, minlength=len(card_ids))
+    card_total_scores = np.bincount(rows, weights=np.repeat(scores, 2), minlength=len(card_ids))
 
-    for synergy in synergies:
-        card_synergy_counts[synergy.card1_id] += 1
-        card_synergy_counts[synergy.card2_id] += 1
-        card_total_scores[synergy.card1_id] += synergy.total_score
-        card_total_scores[synergy.card2_id] += synergy.total_score
+    card_average_scores = card_total_scores / np.maximum(card_synergy_counts, 1)
 
     # Find potential core cards (cards that synergize with many others)
+    core_rows = np.flatnonzero(card_synergy_counts >= 3)  # Must synergize with at least 3 other cards
+
+    # Keep the top 20 by synergy count and average score before loading any cards
+    top_rows = heapq.nlargest(
+        20, core_rows.tolist(),
+        key=lambda row: (card_synergy_counts[row], card_average_scores[row])
+    )
+    cards = load_cards(card_ids[top_rows].tolist())
+
     potential_cores = []
-    for card_id, count in card_synergy_counts.items():
-        if count >= 3:  # Must synergize with at least 3 other cards
-            card = CardInfo.query.get(card_id)
-            if card:
-                avg_score = card_total_scores[card_id] / count
-                potential_cores.append({
-                    "card": card,
-                    "synergy_count": count,
-                    "average_score": avg_score,
-                    "total_score": card_total_scores[card_id]
-                })
-
-    # Sort by synergy count and average score
-    potential_cores.sort(key=lambda x: (x["synergy_count"], x["average_score"]), reverse=True)
-
-    return potential_cores[:20]  # Top 20 potential cores
+    for row in top_rows:
+        card = cards.get(int(card_ids[row]))
+        if card:
+            count = int(card_synergy_counts[row])
+            potential_cores.append({
+                "card": card,
+                "synergy_count": count,
+                "average_score": float(card_total_scores[row]) / count,
+                "total_score": float(card_total_scores[row])
+            })
+
+    return potential_cores
 
 def analyze_archetype_synergies() -> Dict[str, Any]:
     """Analyze synergies by archetype."""
     print("🎭 Analyzing archetype synergies...")
 
-    results = {
-        "tribal": CardSynergy.query.filter(CardSynergy.tribal_score >= 10).count(),
-        "combo": CardSynergy.query.filter(CardSynergy.combo_score >= 10).count(),
-        "archetype": CardSynergy.query.filter(CardSynergy.archetype_score >= 10).count(),
-        "keyword": CardSynergy.query.filter(CardSynergy.keyword_score >= 5).count(),
-        "type": CardSynergy.query.filter(CardSynergy.type_score >= 5).count(),
-    }
+    # All five counts come from a single scan of the synergy table
+    results = CardSynergy.count_matching({
+        "tribal": CardSynergy.tribal_score >= 10,
+        "combo": CardSynergy.combo_score >= 10,
+        "archetype": CardSynergy.archetype_score >= 10,
+        "keyword": CardSynergy.keyword_score >= 5,
+        "type": CardSynergy.type_score >= 5,
+    })
 
     # Find top archetype synergies
-    top_tribal = CardSynergy.get_tribal_synergies(min_score=15.0)[:10]
-    top_combo = CardSynergy.get_combo_synergies(min_score=15.0)[:10]
+    top_tribal = CardSynergy.get_tribal_synergies(min_score=15.0, limit=10)
+    top_combo = CardSynergy.get_combo_synergies(min_score=15.0, limit=10)
 
     results["top_tribal"] = top_tribal
     results["top_combo"] = top_combo
 
     return results
 
-def find_hub_cards(min_synergies: int = 10) -> List[Dict[str, Any]]:
+def find_hub_cards(min_synergies: int = 10, limit: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Find "hub" cards that synergize with many other cards.
 
     Args:
         min_synergies: Minimum number of synergies to be considered a hub
+        limit: Maximum number of hubs to return (defaults to all)
 
     Returns:
         List of hub cards with their synergy statistics
     """
     print(f"🌟 Finding hub cards (min_synergies: {min_synergies})")
 
-    # Query all cards and count their synergies
-    card_synergy_data = defaultdict(lambda: {
-        "count": 0,
-        "total_score": 0,
-        "max_score": 0,
-        "tribal_synergies": 0,
-        "combo_synergies": 0
-    })
-
-    # Count synergies where each card appears
-    synergies = CardSynergy.query.filter(CardSynergy.total_score >= 5.0).all()
+    # One row per appearance of a card in a synergy, from either side of the pair
+    columns = (CardSynergy.id, CardSynergy.total_score, CardSynergy.tribal_score, CardSynergy.combo_score)
+    appearances = db.union_all(
+        db.select(CardSynergy.card1_id.label("card_id"), *columns).where(CardSynergy.total_score >= 5.0),
+        db.select(CardSynergy.card2_id.label("card_id"), *columns).where(CardSynergy.total_score >= 5.0)
+    ).subquery()
+
+    # Aggregate per card in SQL, returning only the hubs, most synergies first
+    # and ties by each card's best synergy
+    synergy_count = db.func.count()
+    max_score = db.func.max(appearances.c.total_score)
+    hub_query = db.session.query(
+        appearances.c.card_id,
+        synergy_count,
+        db.func.sum(appearances.c.total_score),
+        max_score,
+        db.func.sum(db.case((appearances.c.tribal_score >= 5, 1), else_=0)),
+        db.func.sum(db.case((appearances.c.combo_score >= 5, 1), else_=0))
+    ).group_by(appearances.c.card_id).having(
+        synergy_count >= min_synergies
+    ).order_by(synergy_count.desc(), max_score.desc(), db.func.min(appearances.c.id)).limit(limit)
+    hubs = hub_query.all()
+    cards = load_cards([hub[0] for hub in hubs])
 
-    for synergy in synergies:
-        for card_id in [synergy.card1_id, synergy.card2_id]:
-            data = card_synergy_data[card_id]
-            data["count"] += 1
-            data["total_score"] += synergy.total_score
-            data["max_score"] = max(data["max_score"], synergy.total_score)
-
-            if synergy.tribal_score >= 5:
-                data["tribal_synergies"] += 1
-            if synergy.combo_score >= 5:
-                data["combo_synergies"] += 1
-
-    # Find hub cards
     hub_cards = []
-    for card_id, data in card_synergy_data.items():
-        if data["count"] >= min_synergies:
-            card = CardInfo.query.get(card_id)
-            if card:
-                hub_cards.append({
-                    "card": card,
-                    "synergy_count": data["count"],
-                    "average_score": data["total_score"] / data["count"],
-                    "max_score": data["max_score"],
-                    "tribal_synergies": data["tribal_synergies"],
-                    "combo_synergies": data["combo_synergies"]
-                })
-
-    # Sort by synergy count
-    hub_cards.sort(key=lambda x: x["synergy_count"], reverse=True)
+    for card_id, count, total_score, best_score, tribal_synergies, combo_synergies in hubs:
+        card = cards.get(card_id)
+        if card:
+            hub_cards.append({
+                "card": card,
+                "synergy_count": count,
+                "average_score": total_score / count,
+                "max_score": best_score,
+                "tribal_synergies": tribal_synergies,
+                "combo_synergies": combo_synergies
+            })
 
     return hub_cards
 
+def show_clusters(args: str) -> None:
+    """Handle 'clusters [min_score] [min_size]'."""
+    parts = args.split()
+    min_score = float(parts[0]) if len(parts) > 0 else 15.0
+    min_size = int(parts[1]) if len(parts) > 1 else 3
+
+    clusters = find_synergy_clusters(min_score, min_size)
+    print(f"\n🔗 Found {len(clusters)} synergy clusters:")
+    for cluster in clusters[:10]:
+        print(f"  Cluster {cluster['id']}: {cluster['size']} cards, "
+              f"avg score: {cluster['average_synergy']:.1f}")
+        print(f"    Cards: {', '.join(cluster['card_names'][:5])}")
+        if len(cluster['card_names']) > 5:
+            print(f"    ... and {len(cluster['card_names']) - 5} more")
+
+def show_cores(args: str) -> None:
+    """Handle 'cores [archetype] [min_score]'."""
+    parts = args.split()
+    archetype = parts[0] if parts and not parts[0].replace('.', '').isdigit() else None
+    score_parts = parts[1:] if archetype else parts
+    min_score = float(score_parts[0]) if score_parts else 20.0
+
+    cores = find_deck_cores(archetype, min_score)
+    print(f"\n🎯 Found {len(cores)} potential deck cores:")
+    for core in cores[:10]:
+        print(f"  {core['card'].name}: {core['synergy_count']} synergies, "
+              f"avg score: {core['average_score']:.1f}")
+
+def show_hubs(args: str) -> None:
+    """Handle 'hubs [min_synergies]'."""
+    parts = args.split()
+    min_synergies = int(parts[0]) if parts else 10
+
+    # Only the displayed hubs are ranked and loaded
+    hubs = find_hub_cards(min_synergies, limit=10)
+    print(f"\n🌟 Top {len(hubs)} hub cards:")
+    for hub in hubs:
+        print(f"  {hub['card'].name}: {hub['synergy_count']} synergies, "
+              f"max score: {hub['max_score']:.1f}")
+
+def show_top(args: str) -> None:
+    """Handle 'top [limit]'."""
+    parts = args.split()
+    limit = int(parts[0]) if parts else 10
+
+    top_synergies = CardSynergy.get_top_synergies(limit=limit)
+    print(f"\n🔥 Top {limit} synergies:")
+    for i, synergy in enumerate(top_synergies, 1):
+        print(f"  {i}. {synergy.card1.name} + {synergy.card2.name}: "
+              f"{synergy.total_score:.1f}")
+
+def show_stats(args: str) -> None:
+    """Handle 'stats'."""
+    archetype_stats = analyze_archetype_synergies()
+    print(f"\n📊 Synergy Statistics:")
+    print(f"  Tribal synergies: {archetype_stats['tribal']}")
+    print(f"  Combo synergies: {archetype_stats['combo']}")
+    print(f"  Archetype synergies: {archetype_stats['archetype']}")
+    print(f"  Keyword synergies: {archetype_stats['keyword']}")
+    print(f"  Type synergies: {archetype_stats['type']}")
+
+def show_card(args: str) -> None:
+    """Handle 'card <name>'."""
+    card_name = args.strip()
+    card = CardInfo.find_by_name(card_name)
+    if card:
+        synergies = CardSynergy.get_synergies_for_card(card.id, min_score=5.0, limit=10)
+        print(f"\n🃏 Top synergies for {card.name}:")
+        for synergy in synergies:
+            partner = synergy.get_partner_card(card.id)
+            if partner:
+                print(f"  {partner.name}: {synergy.total_score:.1f}")
+    else:
+        print(f"❌ Card not found: {card_name}")
+
+# Interactive command name -> handler taking the rest of the command line
+COMMANDS = {
+    'clusters': show_clusters,
+    'cores': show_cores,
+    'hubs': show_hubs,
+    'top': show_top,
+    'stats': show_stats,
+    'card': show_card,
+}
+
 def interactive_mode():
     """Interactive mode for exploring synergy data."""
     print("🎮 INTERACTIVE SYNERGY EXPLORER")
@@ -254,73 +447,11 @@ def interactive_mode():
             if command.lower() == 'quit':
                 break
 
-            elif command.startswith('clusters'):
-                parts = command.split()
-                min_score = float(parts[1]) if len(parts) > 1 else 15.0
-                min_size = int(parts[2]) if len(parts) > 2 else 3
-
-                clusters = find_synergy_clusters(min_score, min_size)
-                print(f"\n🔗 Found {len(clusters)} synergy clusters:")
-                for cluster in clusters[:10]:
-                    print(f"  Cluster {cluster['id']}: {cluster['size']} cards, "
-                          f"avg score: {cluster['average_synergy']:.1f}")
-                    print(f"    Cards: {', '.join(cluster['card_names'][:5])}")
-                    if len(cluster['card_names']) > 5:
-                        print(f"    ... and {len(cluster['card_names']) - 5} more")
-
-            elif command.startswith('cores'):
-                parts = command.split()
-                archetype = parts[1] if len(parts) > 1 and not parts[1].replace('.','').isdigit() else None
-                min_score = float(parts[2] if archetype else parts[1]) if len(parts) > (2 if archetype else 1) else 20.0
-
-                cores = find_deck_cores(archetype, min_score)
-                print(f"\n🎯 Found {len(cores)} potential deck cores:")
-                for core in cores[:10]:
-                    print(f"  {core['card'].name}: {core['synergy_count']} synergies, "
-                          f"avg score: {core['average_score']:.1f}")
-
-            elif command.startswith('hubs'):
-                parts = command.split()
-                min_synergies = int(parts[1]) if len(parts) > 1 else 10
-
-                hubs = find_hub_cards(min_synergies)
-                print(f"\n🌟 Found {len(hubs)} hub cards:")
-                for hub in hubs[:10]:
-                    print(f"  {hub['card'].name}: {hub['synergy_count']} synergies, "
-                          f"max score: {hub['max_score']:.1f}")
-
-            elif command.startswith('top'):
-                parts = command.split()
-                limit = int(parts[1]) if len(parts) > 1 else 10
-
-                top_synergies = CardSynergy.get_top_synergies(limit=limit)
-                print(f"\n🔥 Top {limit} synergies:")
-                for i, synergy in enumerate(top_synergies, 1):
-                    print(f"  {i}. {synergy.card1.name} + {synergy.card2.name}: "
-                          f"{synergy.total_score:.1f}")
-
-            elif command == 'stats':
-                archetype_stats = analyze_archetype_synergies()
-                print(f"\n📊 Synergy Statistics:")
-                print(f"  Tribal synergies: {archetype_stats['tribal']}")
-                print(f"  Combo synergies: {archetype_stats['combo']}")
-                print(f"  Archetype synergies: {archetype_stats['archetype']}")
-                print(f"  Keyword synergies: {archetype_stats['keyword']}")
-                print(f"  Type synergies: {archetype_stats['type']}")
-
-            elif command.startswith('card '):
-                card_name = command[5:].strip()
-                card = CardInfo.query.filter(CardInfo.name.ilike(f'%{card_name}%')).first()
-                if card:
-                    synergies = CardSynergy.get_synergies_for_card(card.id, min_score=5.0, limit=10)
-                    print(f"\n🃏 Top synergies for {card.name}:")
-                    for synergy in synergies:
-                        partner = synergy.get_partner_card(card.id)
-                        if partner:
-                            print(f"  {partner.name}: {synergy.total_score:.1f}")
-                else:
-                    print(f"❌ Card not found: {card_name}")
-
+            # Look the first word up directly instead of testing each prefix
+            name, _, args = command.partition(' ')
+            handler = COMMANDS.get(name)
+            if handler:
+                handler(args)
             else:
                 print("❌ Unknown command. Type 'quit' to exit.")
 
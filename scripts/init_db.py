@@ -10,12 +10,6 @@ import argparse
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from flask import Flask
-from sqlalchemy import inspect
-from src.database import db
-from src.models.card_info import CardInfo
-from src.models.card_printing import CardPrinting
-
 def init_db(drop_all=False):
     """
     Create a Flask app and initialize the database.
@@ -23,6 +17,14 @@ def init_db(drop_all=False):
     Args:
         drop_all: If True, drops all tables before creating them
     """
+    # Imported here so --help does not pay for Flask, SQLAlchemy and the models
+    from flask import Flask
+    from sqlalchemy import inspect, text
+    from src.database import db
+    from src.models.card_info import CardInfo, create_name_search_index
+    from src.models.card_printing import CardPrinting
+    from src.models.analysis_cache import AnalysisCache  # registers its table for create_all()
+
     # Create the instance directory if it doesn't exist
     instance_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../instance"))
     os.makedirs(instance_dir, exist_ok=True)
@@ -35,30 +37,43 @@ def init_db(drop_all=False):
     # Initialize the database
     db.init_app(app)
 
-    # Create all tables
-    with app.app_context():
+    # Create the schema and run the checks on one connection, in one transaction
+    with app.app_context(), db.engine.begin() as connection:
+        # pysqlite runs DDL in autocommit mode unless a transaction is open
+        if not connection.connection.dbapi_connection.in_transaction:
+            connection.exec_driver_sql("BEGIN")
+
         if drop_all:
             print("Dropping all tables...")
-            db.drop_all()
+            db.metadata.drop_all(connection)
 
-        db.create_all()
+        db.metadata.create_all(connection)
         print(f"Database initialized at {app.config['SQLALCHEMY_DATABASE_URI']}")
 
+        # Databases created before the name index existed get it here
+        if create_name_search_index(connection):
+            print("Card name search index ready")
+        else:
+            print("SQLite has no FTS5 trigram support; name searches will scan card_info")
+
+        # Connections get the pragmas from src.database.configure_sqlite()
+        journal_mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+        print(f"Journal mode: {journal_mode}")
+
         # Check table counts for new schema
-        card_info_count = db.session.query(db.func.count(CardInfo.id)).scalar()
-        card_printing_count = db.session.query(db.func.count(CardPrinting.id)).scalar()
+        card_info_count = connection.execute(db.select(db.func.count(CardInfo.id))).scalar()
+        card_printing_count = connection.execute(db.select(db.func.count(CardPrinting.id))).scalar()
 
         print(f"Database contains:")
         print(f"  - {card_info_count} card infos (unique cards)")
         print(f"  - {card_printing_count} card printings (collection items)")
 
         # Check if the old cards table exists
-        inspector = inspect(db.engine)
+        inspector = inspect(connection)
         if inspector.has_table('cards'):
             # The old table exists, but we don't import the model anymore
             try:
-                from sqlalchemy import text
-                result = db.session.execute(text("SELECT count(*) FROM cards")).scalar()
+                result = connection.execute(text("SELECT count(*) FROM cards")).scalar()
                 if result is not None:
                     print(f"  - {result} cards (old schema)")
                     print("  - To migrate from old to new schema, run migrate_card_data.py")
@@ -15,6 +15,7 @@ from src.database import db
 from src.models.card import Card
 from src.models.card_info import CardInfo
 from src.models.card_printing import CardPrinting
+from src.models.json_codec import dump_json
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -32,72 +33,113 @@ def create_app() -> Flask:
     db.init_app(app)
     return app
 
+# Old cards read, and rows inserted, per batch
+MIGRATION_BATCH_SIZE = 2000
+
+def card_info_row(old_card: Card) -> Dict[str, Any]:
+    """
+    Build the CardInfo row for an old card.
+
+    Rows are inserted with executemany rather than as ORM objects, so the
+    name listener does not run and name_lc is filled in here.
+    """
+    return {
+        "name": old_card.Name,
+        "name_lc": old_card.Name.lower(),
+        "oracle_text": old_card.oracle_text,
+        "mana_cost": old_card.mana_cost,
+        "cmc": old_card.cmc,
+        "type_line": old_card.type_line,
+    }
+
+def card_printing_row(old_card: Card, card_info_id: int) -> Dict[str, Any]:
+    """Build the CardPrinting row for an old card, linked to its CardInfo by ID."""
+    return {
+        "card_info_id": card_info_id,
+        "Count": old_card.Count,
+        "Tradelist_Count": old_card.Tradelist_Count,
+        "Edition": old_card.Edition,
+        "Edition_Code": old_card.Edition_Code,
+        "Card_Number": old_card.Card_Number,
+        "Condition": old_card.Condition,
+        "Language": old_card.Language,
+        "Foil": old_card.Foil,
+        "Signed": old_card.Signed,
+        "Artist_Proof": old_card.Artist_Proof,
+        "Altered_Art": old_card.Altered_Art,
+        "Misprint": old_card.Misprint,
+        "Promo": old_card.Promo,
+        "Textless": old_card.Textless,
+        "Printing_Id": old_card.Printing_Id,
+        "Printing_Note": old_card.Printing_Note,
+        "Tags": old_card.Tags,
+        "My_Price": old_card.My_Price,
+        "scryfall_id": old_card.scryfall_id,
+        # Serialized the same way as the CardPrinting.image_uris setter
+        "_image_uris": dump_json(old_card.image_uris) if old_card.image_uris else None,
+    }
+
 def migrate_data() -> Tuple[int, int]:
     """
     Migrate data from the old Card model to CardInfo and CardPrinting models.
 
+    Old cards are streamed in batches of MIGRATION_BATCH_SIZE and each batch
+    is written with two executemany inserts, so memory stays bounded by the
+    batch rather than the collection. The whole migration commits once, and
+    is rolled back entirely if any batch fails.
+
     Returns:
         A tuple with:
         - The number of unique cards migrated to CardInfo
         - The number of printings migrated to CardPrinting
     """
-    # Track unique cards by name to avoid duplicates
-    unique_cards: Dict[str, CardInfo] = {}
-
-    # Get all existing cards from the old model
-    old_cards = Card.query.all()
-    logger.info(f"Found {len(old_cards)} cards to migrate")
-
-    for old_card in old_cards:
-        # First, see if we already have a CardInfo for this card name
-        if old_card.Name in unique_cards:
-            card_info = unique_cards[old_card.Name]
-        else:
-            # Create a new CardInfo instance
-            card_info = CardInfo(
-                name=old_card.Name,
-                oracle_text=old_card.oracle_text,
-                mana_cost=old_card.mana_cost,
-                cmc=old_card.cmc,
-                type_line=old_card.type_line
-            )
-            db.session.add(card_info)
-            unique_cards[old_card.Name] = card_info
-
-        # Create a CardPrinting instance linked to the CardInfo
-        card_printing = CardPrinting(
-            card_info=card_info,
-            Count=old_card.Count,
-            Tradelist_Count=old_card.Tradelist_Count,
-            Edition=old_card.Edition,
-            Edition_Code=old_card.Edition_Code,
-            Card_Number=old_card.Card_Number,
-            Condition=old_card.Condition,
-            Language=old_card.Language,
-            Foil=old_card.Foil,
-            Signed=old_card.Signed,
-            Artist_Proof=old_card.Artist_Proof,
-            Altered_Art=old_card.Altered_Art,
-            Misprint=old_card.Misprint,
-            Promo=old_card.Promo,
-            Textless=old_card.Textless,
-            Printing_Id=old_card.Printing_Id,
-            Printing_Note=old_card.Printing_Note,
-            Tags=old_card.Tags,
-            My_Price=old_card.My_Price,
-            scryfall_id=old_card.scryfall_id,
-        )
-
-        # Set image_uris if available
-        if old_card.image_uris:
-            card_printing.image_uris = old_card.image_uris
-
-        db.session.add(card_printing)
-
-    # Commit all changes
-    db.session.commit()
-    logger.info(f"Migration completed: {len(unique_cards)} unique cards and {len(old_cards)} printings")
-    return len(unique_cards), len(old_cards)
+    total_cards = db.session.query(db.func.count(Card.id)).scalar()
+    logger.info(f"Found {total_cards} cards to migrate")
+
+    # ID of each unique card name migrated so far
+    name_to_id: Dict[str, int] = {}
+    printing_count = 0
+
+    # Everything below is one transaction: nothing is flushed mid-loop, foreign
+    # keys are only checked at the commit, and any error undoes the whole run.
+    # SQLite leaves foreign keys off by default, so they are enabled for this
+    # connection first, before its transaction begins, where the pragma counts
+    try:
+        with db.session.no_autoflush:
+            db.session.execute(db.text("PRAGMA foreign_keys=ON"))
+            db.session.execute(db.text("PRAGMA defer_foreign_keys=ON"))
+
+            old_cards = db.session.execute(
+                db.select(Card).execution_options(yield_per=MIGRATION_BATCH_SIZE)
+            ).scalars()
+            for batch in old_cards.partitions():
+                # One CardInfo row per card name not seen in earlier batches
+                info_rows: Dict[str, Dict[str, Any]] = {}
+                for old_card in batch:
+                    if old_card.Name not in name_to_id and old_card.Name not in info_rows:
+                        info_rows[old_card.Name] = card_info_row(old_card)
+                if info_rows:
+                    db.session.execute(db.insert(CardInfo), list(info_rows.values()))
+                    name_to_id.update(db.session.query(CardInfo.name, CardInfo.id).filter(
+                        CardInfo.name.in_(list(info_rows))
+                    ))
+
+                printing_rows = [card_printing_row(old_card, name_to_id[old_card.Name]) for old_card in batch]
+                db.session.execute(db.insert(CardPrinting), printing_rows)
+                printing_count += len(printing_rows)
+
+                # Release the batch's Card instances before loading the next one
+                # (expunge_all() would invalidate the streaming result)
+                for old_card in batch:
+                    db.session.expunge(old_card)
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    logger.info(f"Migration completed: {len(name_to_id)} unique cards and {printing_count} printings")
+    return len(name_to_id), printing_count
 
 def main():
     """Main entry point for the migration script."""
@@ -10,54 +10,145 @@ This script shows you how to:
 """
 import os
 import sys
-import json
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from itertools import islice
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+from sqlalchemy.pool import StaticPool
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from src.database import db
 from src.models.card_info import CardInfo
+from src.models.json_codec import load_json
+from src.services.synergy_matrix import (
+    SCORE_TOLERANCE,
+    UNSHARED_SCORE_LIMIT,
+    SynergyFeatures,
+    build_synergy_features,
+    overlap_bitmasks,
+    score_block,
+    top_k_indices,
+    unshared_score_limits,
+)
 from src.services.text_analysis import calculate_synergy_score
-from main import create_app
+
+# Analyzed cards considered as partners by find_synergistic_cards()
+CANDIDATE_LIMIT = 500
+
+class CandidateCard(NamedTuple):
+    """An analyzed card read as a plain row, with its analysis decoded once."""
+    id: int
+    name: str
+    type_line: Optional[str]
+    updated_at: Any
+    extracted_data: Dict[str, Any]
+
+# Candidate cards and their encoded features, reused until the analyzed
+# cards change
+_candidate_pool: Dict[str, Any] = {}
+
+# Lowercased (name, ID) of every card in ID order, loaded once per session by
+# load_name_index()
+_name_index: List[Tuple[str, int]] = []
+
+# Analysis of each card scored so far, keyed by (ID, last update)
+_analyses: Dict[Tuple[int, Any], Dict[str, Any]] = {}
+
+@lru_cache(maxsize=200_000)
+def _cached_score(card1_key: Tuple[int, Any], card2_key: Tuple[int, Any]) -> Dict[str, Any]:
+    """Score a pair of cards registered in _analyses."""
+    return calculate_synergy_score(_analyses[card1_key], _analyses[card2_key])
+
+def pair_synergy(card1: Union[CardInfo, CandidateCard],
+                 card2: Union[CardInfo, CandidateCard]) -> Dict[str, Any]:
+    """
+    Get calculate_synergy_score() for two cards, memoized for the session.
+
+    Scores are directional (tribal support and combo patterns depend on which
+    card comes first), so the key is the ordered pair. Each card's last update
+    time is part of its key, so re-analyzed cards are scored afresh.
+    """
+    keys = []
+    for card in (card1, card2):
+        key = (card.id, card.updated_at)
+        if key not in _analyses:
+            _analyses[key] = card.extracted_data or {}
+        keys.append(key)
+    return _cached_score(*keys)
+
+def load_name_index() -> int:
+    """
+    Read every card name once so name searches can run in memory.
+
+    Card names don't change while the tool runs, so after this call the
+    find, synergy and matches commands only query the database to load the
+    cards that matched.
+
+    Returns:
+        Number of names indexed
+    """
+    rows = db.session.execute(
+        db.select(CardInfo.id, CardInfo.name).order_by(CardInfo.id)
+    ).all()
+    _name_index[:] = [(name.lower(), card_id) for card_id, name in rows]
+    return len(_name_index)
 
 def find_cards_by_name(search_term: str, limit: int = 10) -> List[CardInfo]:
     """Find cards by partial name match."""
-    return CardInfo.query.filter(
-        CardInfo.name.ilike(f'%{search_term}%')
-    ).limit(limit).all()
+    if not _name_index:
+        return CardInfo.search_by_name(search_term, limit)
+
+    term = search_term.lower()
+    ids = list(islice((card_id for name, card_id in _name_index if term in name), limit))
+    if not ids:
+        return []
+    return CardInfo.query.filter(CardInfo.id.in_(ids)).order_by(CardInfo.id).all()
+
+def find_card_by_name(search_term: str) -> Optional[CardInfo]:
+    """Find the first card whose name contains the search term."""
+    cards = find_cards_by_name(search_term, limit=1)
+    return cards[0] if cards else None
 
 def display_card_info(card: CardInfo):
     """Display detailed information about a card."""
-    print(f"\n📋 {card.name}")
-    print("-" * 50)
-    print(f"🏷️  Type: {card.type_line or 'Unknown'}")
-    print(f"💎 Mana Cost: {card.mana_cost or 'N/A'}")
-    print(f"📖 Oracle Text: {(card.oracle_text[:100] + '...') if card.oracle_text and len(card.oracle_text) > 100 else card.oracle_text or 'N/A'}")
-
-    if card.extracted_data:
-        data = card.extracted_data
+    # Lines are collected and written with one print call
+    lines = [
+        f"\n📋 {card.name}",
+        "-" * 50,
+        f"🏷️  Type: {card.type_line or 'Unknown'}",
+        f"💎 Mana Cost: {card.mana_cost or 'N/A'}",
+        f"📖 Oracle Text: {(card.oracle_text[:100] + '...') if card.oracle_text and len(card.oracle_text) > 100 else card.oracle_text or 'N/A'}",
+    ]
+
+    data = card.extracted_data
+    if data:
         if data.get('creature_types'):
-            print(f"🦄 Creature Types: {', '.join(data['creature_types'][:3])}")
+            lines.append(f"🦄 Creature Types: {', '.join(data['creature_types'][:3])}")
         if data.get('keywords'):
-            print(f"⚡ Keywords: {', '.join(data['keywords'][:5])}")
+            lines.append(f"⚡ Keywords: {', '.join(data['keywords'][:5])}")
         if data.get('synergy_vectors', {}).get('archetype'):
             archetypes = data['synergy_vectors']['archetype'][:3]
-            print(f"🎭 Archetypes: {', '.join(archetypes)}")
+            lines.append(f"🎭 Archetypes: {', '.join(archetypes)}")
+    print("\n".join(lines))
 
 def analyze_synergy_between_cards(card1: CardInfo, card2: CardInfo):
     """Analyze and display synergy between two cards."""
-    print(f"\n🔗 SYNERGY ANALYSIS")
-    print("=" * 60)
-    print(f"Card 1: {card1.name}")
-    print(f"Card 2: {card2.name}")
-    print("-" * 60)    # Calculate synergy score
-    synergy_result = calculate_synergy_score(
-        card1.extracted_data or {},
-        card2.extracted_data or {}
-    )
+    lines = [
+        f"\n🔗 SYNERGY ANALYSIS",
+        "=" * 60,
+        f"Card 1: {card1.name}",
+        f"Card 2: {card2.name}",
+        "-" * 60,
+    ]
 
-    print(f"🎯 Total Synergy Score: {synergy_result['total_score']:.1f}/100")
-    print("\n📊 Detailed Breakdown:")
+    # Calculate synergy score
+    synergy_result = pair_synergy(card1, card2)
+
+    lines.append(f"🎯 Total Synergy Score: {synergy_result['total_score']:.1f}/100")
+    lines.append("\n📊 Detailed Breakdown:")
 
     # Show breakdown of different synergy types
     synergy_types = [
@@ -74,65 +165,135 @@ def analyze_synergy_between_cards(card1: CardInfo, card2: CardInfo):
     for score_key, display_name in synergy_types:
         score = synergy_result.get(score_key, 0)
         if score > 0:
-            print(f"  • {display_name}: {score:.1f}")
+            lines.append(f"  • {display_name}: {score:.1f}")
 
     # Show matching elements
     matches = synergy_result.get("matches", [])
     if matches:
-        print(f"\n🔗 Synergy Matches:")
+        lines.append(f"\n🔗 Synergy Matches:")
         for match in matches[:10]:  # Show first 10 matches
-            print(f"  • {match}")
+            lines.append(f"  • {match}")
         if len(matches) > 10:
-            print(f"  ... and {len(matches) - 10} more matches")
+            lines.append(f"  ... and {len(matches) - 10} more matches")
 
     # Provide interpretation
     total_score = synergy_result.get('total_score', 0)
     if total_score >= 30:
-        print(f"\n🔥 HIGH SYNERGY! These cards work very well together.")
+        lines.append(f"\n🔥 HIGH SYNERGY! These cards work very well together.")
     elif total_score >= 15:
-        print(f"\n✨ GOOD SYNERGY! These cards complement each other nicely.")
+        lines.append(f"\n✨ GOOD SYNERGY! These cards complement each other nicely.")
     elif total_score >= 5:
-        print(f"\n👍 MODERATE SYNERGY! Some shared elements or compatibility.")
+        lines.append(f"\n👍 MODERATE SYNERGY! Some shared elements or compatibility.")
     else:
-        print(f"\n🤷 LOW SYNERGY! These cards don't have strong connections.")
+        lines.append(f"\n🤷 LOW SYNERGY! These cards don't have strong connections.")
+    print("\n".join(lines))
+
+def load_candidate_pool() -> Tuple[List[CandidateCard], SynergyFeatures]:
+    """
+    Get the candidate partner cards and their encoded synergy features.
+
+    The pool is built once per session and rebuilt only when the analyzed
+    cards' count, highest ID or last update change. Cards are read as plain
+    rows and each analysis is parsed once, as CardInfo.extracted_data parses it.
+
+    Returns:
+        Tuple of (candidate cards, features with one row per candidate)
+    """
+    state = tuple(db.session.query(
+        db.func.count(CardInfo.id), db.func.max(CardInfo.id), db.func.max(CardInfo.updated_at)
+    ).filter(CardInfo._extracted_data.isnot(None)).one())
+
+    if _candidate_pool.get("state") != state:
+        rows = db.session.execute(
+            db.select(CardInfo.id, CardInfo.name, CardInfo.type_line, CardInfo.updated_at,
+                      CardInfo._extracted_data)
+            .where(CardInfo._extracted_data.isnot(None))
+            .limit(CANDIDATE_LIMIT)
+        ).all()
+        cards = [
+            CandidateCard(card_id, name, type_line, updated_at, (load_json(data) if data else None) or {})
+            for card_id, name, type_line, updated_at, data in rows
+        ]
+        features = build_synergy_features([card.extracted_data for card in cards])
+        _candidate_pool.update(
+            state=state,
+            cards=cards,
+            features=features,
+            masks=overlap_bitmasks(features),
+            limits=unshared_score_limits(features)
+        )
+    return _candidate_pool["cards"], _candidate_pool["features"]
 
 def find_synergistic_cards(target_card: CardInfo, min_score: float = 10.0, limit: int = 10) -> List[tuple]:
-    """Find cards that synergize well with the target card."""
-    if not target_card.extracted_data:
+    """
+    Find cards that synergize well with the target card.
+
+    Candidates whose overlap masks show they cannot reach min_score are
+    skipped, the rest are scored at once with score_block(), and only the
+    cards shown, and any within rounding of the threshold, are re-scored
+    with pair_synergy().
+    """
+    target_data = target_card.extracted_data
+    if not target_data:
         print(f"❌ {target_card.name} hasn't been analyzed yet.")
         return []
 
     print(f"\n🔍 Finding cards that synergize with '{target_card.name}'...")
     print(f"Minimum synergy score: {min_score}")
 
-    # Get all analyzed cards
-    all_cards = CardInfo.query.filter(CardInfo._extracted_data.isnot(None)).limit(500).all()
-    synergistic_cards = []
-
-    for card in all_cards:
-        if card.id == target_card.id:
-            continue
-
-        score_result = calculate_synergy_score(
-            target_card.extracted_data,
-            card.extracted_data or {}
+    all_cards, features = load_candidate_pool()
+    masks, limits = _candidate_pool["masks"], _candidate_pool["limits"]
+    card_ids = [card.id for card in all_cards]
+    if target_card.id in card_ids:
+        target_row = card_ids.index(target_card.id)
+        target_features = features.take(np.array([target_row]))
+        target_mask, target_limit = masks[target_row], limits[target_row]
+    else:
+        # Encode the target together with the pool so the columns line up
+        features = build_synergy_features(
+            [card.extracted_data for card in all_cards] + [target_data]
         )
-
-        score = score_result.get('total_score', 0)
-
-        if score >= min_score:
-            synergistic_cards.append((card, score))
+        target_features = features.take(np.array([len(all_cards)]))
+        features = features.take(np.arange(len(all_cards)))
+        target_mask = overlap_bitmasks(target_features)[0]
+        target_limit = unshared_score_limits(target_features)[0]
+        masks, limits = overlap_bitmasks(features), unshared_score_limits(features)
+
+    # Cards sharing no scoring feature with the target can score at most the
+    # unshared bound, so only the others need scoring
+    unshared = (masks & target_mask) == 0
+    bounds = UNSHARED_SCORE_LIMIT + np.minimum(limits, target_limit)
+    candidates = np.flatnonzero(~(unshared & (bounds < min_score - SCORE_TOLERANCE)))
+
+    scores = np.full(len(all_cards), -np.inf)
+    if len(candidates):
+        scores[candidates] = score_block(target_features, features.take(candidates))[0]
+    scores[np.array(card_ids) == target_card.id] = -np.inf
+
+    def exact_score(row: int) -> float:
+        return pair_synergy(target_card, all_cards[row]).get('total_score', 0)
+
+    # Settle the cards within rounding of the threshold exactly
+    rows = np.flatnonzero(scores >= min_score - SCORE_TOLERANCE)
+    for row in rows[scores[rows] < min_score + SCORE_TOLERANCE].tolist():
+        scores[row] = exact_score(row)
+    rows = rows[scores[rows] >= min_score]
 
     # Sort by synergy score (highest first)
-    synergistic_cards.sort(key=lambda x: x[1], reverse=True)
+    top_rows = rows[top_k_indices(scores[rows], limit)].tolist()
+    synergistic_cards = sorted(
+        ((all_cards[row], exact_score(row)) for row in top_rows),
+        key=lambda x: x[1], reverse=True
+    )
 
-    print(f"\n📋 Found {len(synergistic_cards)} synergistic cards:")
-    for i, (card, score) in enumerate(synergistic_cards[:limit], 1):
-        print(f"  {i}. {card.name} - Score: {score:.1f}")
+    lines = [f"\n📋 Found {len(rows)} synergistic cards:"]
+    for i, (card, score) in enumerate(synergistic_cards, 1):
+        lines.append(f"  {i}. {card.name} - Score: {score:.1f}")
         if card.type_line:
-            print(f"     └─ {card.type_line}")
+            lines.append(f"     └─ {card.type_line}")
+    print("\n".join(lines))
 
-    return synergistic_cards[:limit]
+    return synergistic_cards
 
 def interactive_mode():
     """Interactive mode for exploring synergies."""
@@ -166,8 +327,8 @@ def interactive_mode():
                 card_names = command[8:].split(' | ')
                 if len(card_names) == 2:
                     card1_name, card2_name = [name.strip() for name in card_names]
-                    card1 = CardInfo.query.filter(CardInfo.name.ilike(f'%{card1_name}%')).first()
-                    card2 = CardInfo.query.filter(CardInfo.name.ilike(f'%{card2_name}%')).first()
+                    card1 = find_card_by_name(card1_name)
+                    card2 = find_card_by_name(card2_name)
 
                     if card1 and card2:
                         analyze_synergy_between_cards(card1, card2)
@@ -181,7 +342,7 @@ def interactive_mode():
 
             elif command.startswith('matches '):
                 card_name = command[8:].strip()
-                card = CardInfo.query.filter(CardInfo.name.ilike(f'%{card_name}%')).first()
+                card = find_card_by_name(card_name)
                 if card:
                     find_synergistic_cards(card)
                 else:
@@ -209,8 +370,8 @@ def demo_examples():
     ]
 
     for search1, search2 in examples:
-        card1 = CardInfo.query.filter(CardInfo.name.ilike(f'%{search1}%')).first()
-        card2 = CardInfo.query.filter(CardInfo.name.ilike(f'%{search2}%')).first()
+        card1 = find_card_by_name(search1)
+        card2 = find_card_by_name(search2)
 
         if card1 and card2:
             analyze_synergy_between_cards(card1, card2)
@@ -218,7 +379,17 @@ def demo_examples():
 
 def main():
     """Main function."""
-    app = create_app()
+    # The full app pulls in every route and service; only the tool needs it
+    from main import create_app
+
+    # One user, one thread: keep a single connection open for the whole
+    # session instead of checking one out of the pool for every command
+    app = create_app(engine_options={"poolclass": StaticPool})
+
+    # Block-buffer stdout: input() flushes it before each prompt, so output
+    # still appears in order without a write per line
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False)
 
     with app.app_context():
         print("🎯 MTG SYNERGY QUERY TOOL")
@@ -226,8 +397,8 @@ def main():
         print("This tool helps you explore synergies between cards in your collection.")
         print()
 
-        # Check how many cards have analysis data
-        total_cards = CardInfo.query.count()
+        # Check how many cards have analysis data; indexing the names counts them
+        total_cards = load_name_index()
         analyzed_cards = CardInfo.query.filter(CardInfo._extracted_data.isnot(None)).count()
 
         print(f"📊 Collection Status:")
@@ -4,58 +4,90 @@ Demonstrates synergy detection between MTG cards using text analysis.
 """
 import os
 import sys
-from typing import List, Dict, Any, Set
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Dict, Any, NamedTuple, Optional, Sequence, Set
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.services.text_analysis import analyze_card_text, find_synergy_candidates
 
+# Cards sent to a worker process at a time by analyze_cards()
+ANALYSIS_CHUNK_SIZE = 64
+
+class Card(NamedTuple):
+    """A card's name and rules text."""
+    name: str
+    oracle_text: str
+
+class AnalyzedCard(NamedTuple):
+    """A card together with its text analysis."""
+    name: str
+    oracle_text: str
+    analysis: Dict[str, Any]
+
 # Sample cards for synergy detection
-SAMPLE_CARDS = [
-    {
-        "name": "Reanimate",
-        "oracle_text": "Put target creature card from a graveyard onto the battlefield under your control. You lose life equal to its converted mana cost."
-    },
-    {
-        "name": "Entomb",
-        "oracle_text": "Search your library for a card and put that card into your graveyard. Then shuffle your library."
-    },
-    {
-        "name": "Griselbrand",
-        "oracle_text": "Flying, lifelink\nPay 7 life: Draw seven cards. Activate only once each turn."
-    },
-    {
-        "name": "Exhume",
-        "oracle_text": "Each player puts a creature card from their graveyard onto the battlefield."
-    },
-    {
-        "name": "Animate Dead",
-        "oracle_text": "Enchant creature card in a graveyard\nWhen Animate Dead enters the battlefield, if it's on the battlefield, it loses \"enchant creature card in a graveyard\" and gains \"enchant creature put onto the battlefield with Animate Dead.\" Return enchanted creature card to the battlefield under your control and attach Animate Dead to it. When Animate Dead leaves the battlefield, that creature's controller sacrifices it."
-    },
-    {
-        "name": "Grafdigger's Cage",
-        "oracle_text": "Creature cards in graveyards and libraries can't enter the battlefield.\nPlayers can't cast spells from graveyards or libraries."
-    }
-]
-
-def analyze_cards() -> List[Dict[str, Any]]:
+SAMPLE_CARDS = (
+    Card(
+        "Reanimate",
+        "Put target creature card from a graveyard onto the battlefield under your control. You lose life equal to its converted mana cost."
+    ),
+    Card(
+        "Entomb",
+        "Search your library for a card and put that card into your graveyard. Then shuffle your library."
+    ),
+    Card(
+        "Griselbrand",
+        "Flying, lifelink\nPay 7 life: Draw seven cards. Activate only once each turn."
+    ),
+    Card(
+        "Exhume",
+        "Each player puts a creature card from their graveyard onto the battlefield."
+    ),
+    Card(
+        "Animate Dead",
+        "Enchant creature card in a graveyard\nWhen Animate Dead enters the battlefield, if it's on the battlefield, it loses \"enchant creature card in a graveyard\" and gains \"enchant creature put onto the battlefield with Animate Dead.\" Return enchanted creature card to the battlefield under your control and attach Animate Dead to it. When Animate Dead leaves the battlefield, that creature's controller sacrifices it."
+    ),
+    Card(
+        "Grafdigger's Cage",
+        "Creature cards in graveyards and libraries can't enter the battlefield.\nPlayers can't cast spells from graveyards or libraries."
+    )
+)
+
+def analyze_cards(cards: Optional[Sequence[Card]] = None,
+                  workers: Optional[int] = None) -> List[AnalyzedCard]:
     """
-    Analyze all sample cards and return their analyzed data.
-    """
-    analyzed_cards = []
+    Analyze cards and return their analyzed data.
 
-    for card in SAMPLE_CARDS:
-        analysis = analyze_card_text(card["oracle_text"])
-        analyzed_cards.append({
-            "name": card["name"],
-            "oracle_text": card["oracle_text"],
-            "analysis": analysis
-        })
+    Each card is analyzed independently, so larger collections are split
+    across a pool of worker processes; a handful of cards is analyzed in this
+    process, where starting workers would cost more than it saves.
 
-    return analyzed_cards
+    Args:
+        cards: Cards with name and oracle_text (defaults to SAMPLE_CARDS)
+        workers: Worker processes to use (defaults to CPU count)
 
-def detect_synergies(cards: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    Returns:
+        List of AnalyzedCard records in the order of the input cards
+    """
+    cards = SAMPLE_CARDS if cards is None else cards
+    workers = workers or os.cpu_count() or 1
+    texts = [card.oracle_text for card in cards]
+
+    if workers > 1 and len(texts) > ANALYSIS_CHUNK_SIZE:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+            analyses = list(executor.map(analyze_card_text, texts, chunksize=ANALYSIS_CHUNK_SIZE))
+    else:
+        analyses = [analyze_card_text(text) for text in texts]
+
+    return [
+        AnalyzedCard(card.name, card.oracle_text, analysis)
+        for card, analysis in zip(cards, analyses)
+    ]
+
+def detect_synergies(cards: Sequence[AnalyzedCard]) -> Dict[str, List[str]]:
     """
     Detect potential synergies between cards.
 
@@ -71,30 +103,37 @@ def detect_synergies(cards: List[Dict[str, Any]]) -> Dict[str, List[str]]:
     collection_keywords: Set[str] = set()
     for card in cards:
         # Add all card names as keywords
-        collection_keywords.add(card["name"].lower())
+        collection_keywords.add(card.name.lower())
 
         # Add zones, actions, and explicit keywords
-        analysis = card["analysis"]
+        analysis = card.analysis
         for category in ["zones", "actions", "keywords"]:
             collection_keywords.update(analysis.get(category, []))
 
-    # Find synergies for each card
-    for card in cards:
-        synergy_matches = []
-
-        # Find cards that synergize with this card's text
-        for other_card in cards:
-            if other_card["name"] == card["name"]:
-                continue
-
-            # Check if this card's text mentions zones/actions that other cards use
-            for category in ["zones", "actions", "keywords"]:
-                for keyword in other_card["analysis"].get(category, []):
-                    if keyword in card["oracle_text"].lower():
-                        if other_card["name"] not in synergy_matches:
-                            synergy_matches.append(other_card["name"])
-
-        synergies[card["name"]] = synergy_matches
+    # Inverted index: each zone, action or keyword -> positions of the cards using it
+    term_cards: Dict[str, Set[int]] = defaultdict(set)
+    for position, card in enumerate(cards):
+        for category in ["zones", "actions", "keywords"]:
+            for term in card.analysis.get(category, []):
+                term_cards[term].add(position)
+
+    # Positions of the cards whose terms each card's text mentions; terms are
+    # substrings (multi-word keywords, inflected verbs), so each distinct term
+    # is looked up once in every lowered text rather than tokenizing
+    lower_texts = [card.oracle_text.lower() for card in cards]
+    mentioned: List[Set[int]] = [set() for _ in cards]
+    for term, positions in term_cards.items():
+        for position, text in enumerate(lower_texts):
+            if term in text:
+                mentioned[position] |= positions
+
+    # Find synergies for each card, in collection order without repeats
+    for card, positions in zip(cards, mentioned):
+        synergy_matches = dict.fromkeys(
+            cards[other].name for other in sorted(positions)
+            if cards[other].name != card.name
+        )
+        synergies[card.name] = list(synergy_matches)
 
     return synergies
 
@@ -108,10 +147,10 @@ def main():
 
     # Display card analyses
     for card in analyzed_cards:
-        print(f"CARD: {card['name']}")
-        print(f"TEXT: {card['oracle_text'][:100]}..." if len(card['oracle_text']) > 100 else card['oracle_text'])
+        print(f"CARD: {card.name}")
+        print(f"TEXT: {card.oracle_text[:100]}..." if len(card.oracle_text) > 100 else card.oracle_text)
 
-        analysis = card["analysis"]
+        analysis = card.analysis
         print("ANALYSIS:")
         for category, items in analysis.items():
             if items and category in ["keywords", "actions", "zones", "mana_references"]:
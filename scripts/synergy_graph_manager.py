@@ -11,50 +11,160 @@ This script provides a comprehensive interface for managing the synergy graph:
 import os
 import sys
 import time
-from typing import Dict, Any, List
-from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import lru_cache
+from itertools import chain
+from multiprocessing import get_context
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+import numpy as np
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.models.card_info import CardInfo
-from src.models.card_synergy import CardSynergy
+from src.models.card_synergy import CardSynergy, SynergyRecord
+from src.models.json_codec import load_json
 from src.services.text_analysis import calculate_synergy_score
+from src.store.card_info_store import NAME_LOOKUP_CHUNK_SIZE
+from src.services.synergy_matrix import (
+    SCORE_TOLERANCE,
+    UNSHARED_SCORE_LIMIT,
+    band_pairs,
+    build_synergy_features,
+    overlap_bitmasks,
+    score_block,
+    synergy_fingerprint,
+    unshared_score_limits,
+    upper_triangle_bands,
+)
+from src.services.synergy_kernels import NUMBA_AVAILABLE, kernel_arrays, score_pairs
 from src.database import db
 from main import create_app
 
+# Upper-triangle pairs screened per band of rows
+PAIRS_PER_BAND = 1_000_000
+
+# Synergy records kept for repeated pairs of card profiles
+PAIR_CACHE_SIZE = 2 ** 16
+
+# Seconds a get_status() result is reused
+STATUS_CACHE_TTL = 30
+
+# Distinct profile pairs sent to a worker process at a time
+SCORE_CHUNK_SIZE = 256
+
+# Card profiles loaded into each worker process by init_worker()
+_worker_analyses: Dict[bytes, Dict[str, Any]] = {}
+
+def init_worker(profile_analyses: Dict[bytes, Dict[str, Any]]) -> None:
+    """Load the read-only card profiles once per worker process."""
+    _worker_analyses.clear()
+    _worker_analyses.update(profile_analyses)
+
+def score_profile_pairs(keys: List[Tuple[bytes, bytes]]) -> List[Union[SynergyRecord, Exception]]:
+    """
+    Build the synergy record of each (card1, card2) profile fingerprint pair.
+
+    Runs in a worker process; a pair that fails to score yields its exception
+    so the caller can report it like a local failure.
+    """
+    results = []
+    for fingerprint1, fingerprint2 in keys:
+        try:
+            results.append(SynergyRecord.from_analysis(calculate_synergy_score(
+                _worker_analyses[fingerprint1], _worker_analyses[fingerprint2]
+            )))
+        except Exception as e:
+            results.append(e)
+    return results
+
+def component_labels(node_count: int, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    Label the connected components of an undirected graph given as edge arrays.
+
+    Every edge pulls both of its ends down to the smaller of their labels and
+    labels then jump to their label's label, until nothing changes.
+
+    Args:
+        node_count: Number of nodes, numbered 0 .. node_count - 1
+        first: First node of each edge
+        second: Second node of each edge
+
+    Returns:
+        Array giving each node the lowest node number in its component
+    """
+    labels = np.arange(node_count)
+    while True:
+        updated = labels.copy()
+        lowest = np.minimum(labels[first], labels[second])
+        np.minimum.at(updated, first, lowest)
+        np.minimum.at(updated, second, lowest)
+        while True:
+            jumped = updated[updated]
+            if np.array_equal(jumped, updated):
+                break
+            updated = jumped
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
 class SynergyGraphManager:
     """Manages the synergy graph computation and queries."""
 
     def __init__(self, app=None):
         self.app = app or create_app()
+        # (time computed, status) from the last get_status() call
+        self._status_cache: Optional[Tuple[float, Dict[str, Any]]] = None
 
     def get_status(self) -> Dict[str, Any]:
-        """Get current status of the synergy graph."""
+        """
+        Get current status of the synergy graph.
+
+        The result is reused for STATUS_CACHE_TTL seconds; computing missing
+        synergies through this manager clears it.
+        """
+        if self._status_cache and time.monotonic() - self._status_cache[0] < STATUS_CACHE_TTL:
+            return self._status_cache[1]
+
         with self.app.app_context():
-            total_cards = CardInfo.query.count()
-            analyzed_cards = CardInfo.query.filter(CardInfo._extracted_data.isnot(None)).count()
-            total_synergies = CardSynergy.query.count()
+            # COUNT(column) skips NULLs, so one scan counts both
+            total_cards, analyzed_cards = db.session.query(
+                db.func.count(CardInfo.id), db.func.count(CardInfo._extracted_data)
+            ).one()
+
+            # Count the synergies and their score distribution in one scan
+            score = CardSynergy.total_score
+            total_synergies, high_synergy, good_synergy, moderate_synergy = db.session.query(
+                db.func.count(),
+                *[
+                    db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+                    for condition in (
+                        score >= 30,
+                        db.and_(score >= 15, score < 30),
+                        db.and_(score >= 5, score < 15),
+                    )
+                ]
+            ).select_from(CardSynergy).one()
 
             # Calculate expected synergies for analyzed cards
             expected_synergies = (analyzed_cards * (analyzed_cards - 1)) // 2 if analyzed_cards > 1 else 0
             completion_rate = (total_synergies / expected_synergies * 100) if expected_synergies > 0 else 0
 
-            # Get score distribution
-            high_synergy = CardSynergy.query.filter(CardSynergy.total_score >= 30).count()
-            good_synergy = CardSynergy.query.filter(
-                CardSynergy.total_score >= 15,
-                CardSynergy.total_score < 30
-            ).count()
-            moderate_synergy = CardSynergy.query.filter(
-                CardSynergy.total_score >= 5,
-                CardSynergy.total_score < 15
-            ).count()
-
-            # Get top synergy
-            top_synergy = CardSynergy.query.order_by(CardSynergy.total_score.desc()).first()
-
-            return {
+            # Get top synergy: an index-only seek on idx_synergy_score, then the
+            # two names, skipped when there is nothing stored
+            top_synergy = None
+            if total_synergies:
+                top_score, card1_id, card2_id = db.session.query(
+                    score, CardSynergy.card1_id, CardSynergy.card2_id
+                ).order_by(score.desc()).first()
+                names = dict(db.session.query(CardInfo.id, CardInfo.name).filter(
+                    CardInfo.id.in_((card1_id, card2_id))
+                ))
+                top_synergy = {"score": top_score, "cards": f"{names[card1_id]} + {names[card2_id]}"}
+
+            status = {
                 "total_cards": total_cards,
                 "analyzed_cards": analyzed_cards,
                 "total_synergies": total_synergies,
@@ -65,21 +175,46 @@ class SynergyGraphManager:
                     "good_15_to_30": good_synergy,
                     "moderate_5_to_15": moderate_synergy
                 },
-                "top_synergy": {
-                    "score": top_synergy.total_score,
-                    "cards": f"{top_synergy.card1.name} + {top_synergy.card2.name}"
-                } if top_synergy else None
+                "top_synergy": top_synergy
             }
 
-    def compute_missing_synergies(self, batch_size: int = 1000, min_score: float = 1.0) -> Dict[str, int]:
-        """Compute only missing synergies."""
-        with self.app.app_context():
-            analyzed_cards = CardInfo.query.filter(CardInfo._extracted_data.isnot(None)).all()
+        self._status_cache = (time.monotonic(), status)
+        return status
 
-            if len(analyzed_cards) < 2:
+    def compute_missing_synergies(self, batch_size: int = 10000, min_score: float = 1.0,
+                                  workers: Optional[int] = None) -> Dict[str, int]:
+        """
+        Compute only missing synergies.
+
+        Every pair is first scored on encoded feature arrays, with the compiled
+        kernel when Numba is available and NumPy matrix operations otherwise.
+        The full per-pair scorer only runs for missing pairs that can reach
+        min_score, to build their stored breakdown; bands with many such pairs
+        are spread over `workers` processes (defaults to CPU count).
+        """
+        workers = workers or os.cpu_count() or 1
+
+        with self.app.app_context():
+            records = db.session.query(
+                CardInfo.id, CardInfo.name, CardInfo._extracted_data
+            ).filter(CardInfo._extracted_data.isnot(None)).order_by(CardInfo.id).yield_per(1000)
+
+            # One column per field, decoded while the rows stream in so the
+            # raw JSON is never all held at once; the pair loop below only
+            # indexes these columns
+            id_list, card_names, analyses = [], [], []
+            for card_id, name, extracted_data in records:
+                id_list.append(card_id)
+                card_names.append(name)
+                analyses.append((load_json(extracted_data) if extracted_data else None) or {})
+
+            if len(id_list) < 2:
                 return {"error": "Need at least 2 analyzed cards"}
 
-            print(f"🔍 Checking for missing synergies among {len(analyzed_cards)} cards...")
+            total_cards = len(id_list)
+            card_ids = np.array(id_list, dtype=np.int64)
+
+            print(f"🔍 Checking for missing synergies among {total_cards} cards...")
 
             stats = {
                 "checked": 0,
@@ -93,61 +228,150 @@ class SynergyGraphManager:
             synergy_batch = []
             start_time = time.time()
 
-            for card1, card2 in combinations(analyzed_cards, 2):
-                stats["checked"] += 1
-
-                # Check if synergy already exists
-                existing = CardSynergy.get_synergy(card1.id, card2.id)
-                if existing:
-                    continue
-
-                stats["missing"] += 1
-
-                try:
-                    # Calculate synergy
-                    synergy_result = calculate_synergy_score(
-                        card1.extracted_data or {},
-                        card2.extracted_data or {}
-                    )
-
-                    stats["computed"] += 1
-                    total_score = synergy_result.get('total_score', 0)
-
-                    # Only store if score meets minimum threshold
-                    if total_score >= min_score:
-                        synergy = CardSynergy.create_from_analysis(
-                            card1.id, card2.id, synergy_result
+            # Load every stored pair up front instead of querying each one
+            stored_pairs = CardSynergy.get_stored_pairs()
+
+            # Cards are ordered by ID, so each stored (lower, higher) pair is
+            # an (i, j) cell of the upper triangle; keep their flat
+            # np.triu_indices positions
+            positions = {card_id: i for i, card_id in enumerate(id_list)}
+            stored_cells = np.array([
+                (positions[card1_id], positions[card2_id]) for card1_id, card2_id in stored_pairs
+                if card1_id in positions and card2_id in positions
+            ], dtype=np.int64).reshape(-1, 2)
+            stored_flat = np.sort(
+                stored_cells[:, 0] * (2 * total_cards - stored_cells[:, 0] - 1) // 2
+                + stored_cells[:, 1] - stored_cells[:, 0] - 1
+            )
+
+            features = build_synergy_features(analyses)
+
+            # Cards with equal fingerprints score identically against any
+            # partner, so each ordered pair of distinct profiles is scored
+            # and serialized once
+            fingerprints = [synergy_fingerprint(analysis) for analysis in analyses]
+            profile_analyses = dict(zip(fingerprints, analyses))
+
+            @lru_cache(maxsize=PAIR_CACHE_SIZE)
+            def score_profiles(fingerprint1: bytes, fingerprint2: bytes) -> SynergyRecord:
+                return SynergyRecord.from_analysis(calculate_synergy_score(
+                    profile_analyses[fingerprint1], profile_analyses[fingerprint2]
+                ))
+
+            threshold = min_score - SCORE_TOLERANCE
+            if NUMBA_AVAILABLE:
+                kernel_inputs = kernel_arrays(features)
+            else:
+                masks, limits = overlap_bitmasks(features), unshared_score_limits(features)
+
+            # Spawned workers: forking after the parallel kernel has started its
+            # thread pool can deadlock the children
+            pool = None
+            with ExitStack() as stack:
+                for band_start, band_end in upper_triangle_bands(total_cards, PAIRS_PER_BAND):
+                    rows, cols = band_pairs(total_cards, band_start, band_end)
+                    stats["checked"] += len(rows)
+
+                    # Drop the stored pairs before scoring
+                    first = band_start * (2 * total_cards - band_start - 1) // 2
+                    band_stored = stored_flat[
+                        np.searchsorted(stored_flat, first):np.searchsorted(stored_flat, first + len(rows))
+                    ]
+                    missing = np.ones(len(rows), dtype=bool)
+                    missing[band_stored - first] = False
+                    rows, cols = rows[missing], cols[missing]
+                    stats["missing"] += len(rows)
+
+                    if NUMBA_AVAILABLE:
+                        # Parallel over the flat list of missing pairs
+                        pair_scores = score_pairs(
+                            features, rows, cols, min_score=threshold, arrays=kernel_inputs
                         )
-                        synergy_batch.append(synergy)
-                        stats["stored"] += 1
                     else:
-                        stats["skipped_low_score"] += 1
-
-                    # Commit batch
-                    if len(synergy_batch) >= batch_size:
-                        db.session.add_all(synergy_batch)
-                        db.session.commit()
-                        synergy_batch = []
-
-                        # Progress update
-                        elapsed = time.time() - start_time
-                        rate = stats["computed"] / elapsed if elapsed > 0 else 0
-
-                        print(f"📈 Checked: {stats['checked']:,} | "
-                              f"Missing: {stats['missing']:,} | "
-                              f"Computed: {stats['computed']:,} | "
-                              f"Stored: {stats['stored']:,} | "
-                              f"Rate: {rate:.1f}/sec")
-
-                except Exception as e:
-                    print(f"❌ Error: {card1.name} + {card2.name}: {str(e)}")
-                    stats["errors"] += 1
-                    continue
-
-            # Commit remaining batch
+                        # Pairs whose overlap masks do not intersect can only reach
+                        # their unshared bound; score the rest against the
+                        # partner columns that survive
+                        keep = ((masks[rows] & masks[cols]) != 0) | (
+                            UNSHARED_SCORE_LIMIT + np.minimum(limits[rows], limits[cols]) >= threshold
+                        )
+                        partners, partner_index = np.unique(cols[keep], return_inverse=True)
+                        block = score_block(
+                            features.take(np.arange(band_start, band_end)), features.take(partners)
+                        )
+                        pair_scores = np.full(len(rows), -np.inf)
+                        pair_scores[keep] = block[rows[keep] - band_start, partner_index]
+
+                    candidates = np.flatnonzero(pair_scores >= threshold)
+                    candidate_pairs = list(zip(rows[candidates].tolist(), cols[candidates].tolist()))
+                    below_threshold = len(rows) - len(candidate_pairs)
+                    stats["computed"] += below_threshold
+                    stats["skipped_low_score"] += below_threshold
+
+                    # Build the breakdowns of a large band in worker processes,
+                    # started on first use; small bands are scored here
+                    band_records: Dict[Tuple[bytes, bytes], Any] = {}
+                    if workers > 1 and len(candidate_pairs) > SCORE_CHUNK_SIZE:
+                        if pool is None:
+                            pool = stack.enter_context(ProcessPoolExecutor(
+                                workers, mp_context=get_context("spawn"),
+                                initializer=init_worker, initargs=(profile_analyses,)
+                            ))
+                        keys = list(dict.fromkeys(
+                            (fingerprints[i], fingerprints[j]) for i, j in candidate_pairs
+                        ))
+                        chunks = [
+                            keys[offset:offset + SCORE_CHUNK_SIZE]
+                            for offset in range(0, len(keys), SCORE_CHUNK_SIZE)
+                        ]
+                        band_records = dict(zip(
+                            keys, chain.from_iterable(pool.map(score_profile_pairs, chunks))
+                        ))
+
+                    for i, j in candidate_pairs:
+                        try:
+                            # Calculate synergy
+                            key = (fingerprints[i], fingerprints[j])
+                            record = band_records[key] if key in band_records else score_profiles(*key)
+                            if isinstance(record, Exception):
+                                raise record
+
+                            stats["computed"] += 1
+
+                            # Only store if score meets minimum threshold
+                            if record.total_score >= min_score:
+                                synergy_batch.append(CardSynergy.row_from_record(
+                                    int(card_ids[i]), int(card_ids[j]), record
+                                ))
+                                stats["stored"] += 1
+                            else:
+                                stats["skipped_low_score"] += 1
+
+                            # Write the batch as one executemany; every batch shares
+                            # one transaction, committed once after the loop
+                            if len(synergy_batch) >= batch_size:
+                                CardSynergy.bulk_insert(synergy_batch)
+                                synergy_batch = []
+
+                                # Progress update
+                                elapsed = time.time() - start_time
+                                rate = stats["computed"] / elapsed if elapsed > 0 else 0
+
+                                print(f"📈 Checked: {stats['checked']:,} | "
+                                      f"Missing: {stats['missing']:,} | "
+                                      f"Computed: {stats['computed']:,} | "
+                                      f"Stored: {stats['stored']:,} | "
+                                      f"Rate: {rate:.1f}/sec")
+
+                        except Exception as e:
+                            print(f"❌ Error: {card_names[i]} + {card_names[j]}: {str(e)}")
+                            stats["errors"] += 1
+                            continue
+
+            # Write the remaining batch and commit the whole run
             if synergy_batch:
-                db.session.add_all(synergy_batch)
-                db.session.commit()
+                CardSynergy.bulk_insert(synergy_batch)
+            db.session.commit()
+            self._status_cache = None
 
             return stats
 
@@ -177,72 +401,78 @@ class SynergyGraphManager:
             return results
 
     def find_deck_cores(self, min_synergy: float = 20.0, min_cards: int = 3) -> List[Dict[str, Any]]:
-        """Find groups of cards that form strong synergistic cores."""
+        """
+        Find groups of cards that form strong synergistic cores.
+
+        Cores are the connected components of the graph of pairs scoring at
+        least min_synergy. A core's average covers every stored synergy
+        between its cards, which is summed in one pass over the synergy table.
+        """
         with self.app.app_context():
             # Get high-synergy pairs
-            high_synergies = CardSynergy.query.filter(
-                CardSynergy.total_score >= min_synergy
-            ).all()
-
-            # Build card connections
-            card_connections = {}
-            for synergy in high_synergies:
-                card1_id = synergy.card1_id
-                card2_id = synergy.card2_id
-
-                if card1_id not in card_connections:
-                    card_connections[card1_id] = set()
-                if card2_id not in card_connections:
-                    card_connections[card2_id] = set()
-
-                card_connections[card1_id].add(card2_id)
-                card_connections[card2_id].add(card1_id)
-
-            # Find connected components (deck cores)
-            visited = set()
-            cores = []
+            high_synergies = np.array(db.session.query(
+                CardSynergy.card1_id, CardSynergy.card2_id
+            ).filter(CardSynergy.total_score >= min_synergy).all(), dtype=np.int64).reshape(-1, 2)
+            if not len(high_synergies):
+                return []
+
+            # Number the cards in order of first appearance and find connected
+            # components (deck cores) on the edge arrays
+            card_ids, first_seen, inverse = np.unique(
+                high_synergies.ravel(), return_index=True, return_inverse=True
+            )
+            order = np.argsort(first_seen)
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+            card_ids = card_ids[order]
+            edges = rank[inverse].reshape(-1, 2)
+            labels = component_labels(len(card_ids), edges[:, 0], edges[:, 1])
+
+            # Components are labelled by their first-seen card; drop small ones
+            sizes = np.bincount(labels, minlength=len(card_ids))
+            labels[sizes[labels] < min_cards] = -1
+            core_labels = np.unique(labels[labels >= 0])
+            if not len(core_labels):
+                return []
+
+            # Total the stored synergies whose cards share a core label
+            label_of = np.full(int(card_ids.max()) + 1, -1, dtype=np.int64)
+            label_of[card_ids] = labels
+            total_synergy = np.zeros(len(card_ids))
+            synergy_count = np.zeros(len(card_ids), dtype=np.int64)
+            synergies = db.session.execute(db.select(
+                CardSynergy.card1_id, CardSynergy.card2_id, CardSynergy.total_score
+            )).yield_per(10000)
+            for partition in synergies.partitions():
+                rows = np.array(partition, dtype=np.float64)
+                card1_ids, card2_ids = rows[:, 0].astype(np.int64), rows[:, 1].astype(np.int64)
+                known = (card1_ids < len(label_of)) & (card2_ids < len(label_of))
+                label1 = label_of[card1_ids[known]]
+                same = (label1 >= 0) & (label1 == label_of[card2_ids[known]])
+                total_synergy += np.bincount(label1[same], weights=rows[known, 2][same],
+                                             minlength=len(card_ids))
+                synergy_count += np.bincount(label1[same], minlength=len(card_ids))
+
+            # Get the names of every core card up front, in chunked IN queries
+            core_ids = card_ids[labels >= 0].tolist()
+            names: Dict[int, str] = {}
+            for start in range(0, len(core_ids), NAME_LOOKUP_CHUNK_SIZE):
+                names.update(db.session.query(CardInfo.id, CardInfo.name).filter(
+                    CardInfo.id.in_(core_ids[start:start + NAME_LOOKUP_CHUNK_SIZE])
+                ).tuples().all())
 
-            def dfs(card_id, component):
-                if card_id in visited:
-                    return
-                visited.add(card_id)
-                component.add(card_id)
-
-                for connected_card in card_connections.get(card_id, set()):
-                    dfs(connected_card, component)
-
-            for card_id in card_connections:
-                if card_id not in visited:
-                    component = set()
-                    dfs(card_id, component)
-
-                    if len(component) >= min_cards:
-                        # Get card names and calculate average synergy
-                        card_names = []
-                        total_synergy = 0
-                        synergy_count = 0
-
-                        for cid in component:
-                            card = CardInfo.query.get(cid)
-                            if card:
-                                card_names.append(card.name)
-
-                        for c1 in component:
-                            for c2 in component:
-                                if c1 < c2:  # Avoid duplicates
-                                    synergy = CardSynergy.get_synergy(c1, c2)
-                                    if synergy:
-                                        total_synergy += synergy.total_score
-                                        synergy_count += 1
-
-                        avg_synergy = total_synergy / synergy_count if synergy_count > 0 else 0
-
-                        cores.append({
-                            "cards": card_names,
-                            "card_count": len(component),
-                            "average_synergy": avg_synergy,
-                            "total_connections": synergy_count
-                        })
+            cores = []
+            for label in core_labels.tolist():
+                component = card_ids[labels == label].tolist()
+                card_names = [names[cid] for cid in component if cid in names]
+
+                count = int(synergy_count[label])
+                cores.append({
+                    "cards": card_names,
+                    "card_count": len(component),
+                    "average_synergy": float(total_synergy[label]) / count if count > 0 else 0,
+                    "total_connections": count
+                })
 
             # Sort by average synergy
             cores.sort(key=lambda x: x["average_synergy"], reverse=True)
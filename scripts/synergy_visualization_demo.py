@@ -4,6 +4,7 @@ Demonstrates synergy detection and visualization using NetworkX.
 """
 import os
 import sys
+from collections import Counter, defaultdict
 import matplotlib.pyplot as plt
 import networkx as nx
 from typing import Dict, List, Set, Any
@@ -53,6 +54,14 @@ SAMPLE_CARDS = [
     }
 ]
 
+# Label and score of each analysis category mentioned in another card's
+# text, in the order matches are reported
+MATCH_WEIGHTS = {
+    "zones": ("zone", 2),
+    "actions": ("action", 1),
+    "keywords": ("keyword", 3),
+}
+
 def analyze_cards() -> List[Dict[str, Any]]:
     """
     Analyze all sample cards and return their analyzed data.
@@ -75,44 +84,42 @@ def detect_synergies(cards: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, An
     """
     synergies = {}
 
+    # Lowercase every text once rather than once per check
+    lower_texts = [card["oracle_text"].lower() for card in cards]
+
+    # Positions of the texts containing each distinct zone, action or keyword,
+    # so each term is searched for once per text instead of once per pair
+    term_texts: Dict[str, Set[int]] = {}
+    for card in cards:
+        for category in MATCH_WEIGHTS:
+            for term in card["analysis"].get(category, []):
+                if term not in term_texts:
+                    term_texts[term] = {
+                        position for position, text in enumerate(lower_texts) if term in text
+                    }
+
     # For each card, find synergies with other cards
     for card in cards:
-        card_synergies = []
-
-        # Check each other card
-        for other_card in cards:
-            if other_card["name"] == card["name"]:
-                continue
-
-            # Calculate synergy score based on matching keywords, zones, and actions
-            score = 0
-            matches = []
-
-            # Check if this card's zones are mentioned in other card's text
-            for zone in card["analysis"].get("zones", []):
-                if zone in other_card["oracle_text"].lower():
-                    score += 2
-                    matches.append(f"zone:{zone}")
-
-            # Check if this card's actions are mentioned in other card's text
-            for action in card["analysis"].get("actions", []):
-                if action in other_card["oracle_text"].lower():
-                    score += 1
-                    matches.append(f"action:{action}")
-
-            # Check if this card's keywords are mentioned in other card's text
-            for keyword in card["analysis"].get("keywords", []):
-                if keyword in other_card["oracle_text"].lower():
-                    score += 3
-                    matches.append(f"keyword:{keyword}")
-
-            # Add synergy if score is positive
-            if score > 0:
-                card_synergies.append({
-                    "card": other_card["name"],
-                    "score": score,
-                    "matches": matches
-                })
+        # Score only the cards whose text mentions one of this card's zones,
+        # actions or keywords, rather than checking every other card
+        scores: Dict[int, int] = defaultdict(int)
+        matches: Dict[int, List[str]] = defaultdict(list)
+        for category, (label, weight) in MATCH_WEIGHTS.items():
+            for term in card["analysis"].get(category, []):
+                for position in term_texts[term]:
+                    scores[position] += weight
+                    matches[position].append(f"{label}:{term}")
+
+        # Keep collection order among equal scores
+        card_synergies = [
+            {
+                "card": cards[position]["name"],
+                "score": scores[position],
+                "matches": matches[position]
+            }
+            for position in sorted(scores)
+            if cards[position]["name"] != card["name"]
+        ]
 
         # Sort synergies by score
         card_synergies.sort(key=lambda x: x["score"], reverse=True)
@@ -126,10 +133,17 @@ def build_synergy_graph(cards: List[Dict[str, Any]], synergies: Dict[str, List[D
     """
     G = nx.Graph()
 
+    # Number of cards listing each card as a synergy partner, counted once
+    # rather than rescanning every synergy list for every node
+    partner_counts = Counter(
+        name for card_synergies in synergies.values()
+        for name in {synergy["card"] for synergy in card_synergies}
+    )
+
     # Add nodes (cards)
     for card in cards:
         # Determine node size based on number of synergies
-        size = sum(1 for c in synergies.values() if any(s["card"] == card["name"] for s in c))
+        size = partner_counts[card["name"]]
 
         # Get card type from type line or make a guess
         card_type = "Unknown"
@@ -40,14 +40,16 @@ def test_synergy_computation(limit: int = 50):
         stored_count = 0
         start_time = time.time()
 
+        # Load every stored pair up front instead of querying each one
+        stored_pairs = CardSynergy.get_stored_pairs()
+
         # Compute synergies for all pairs
         for i in range(len(cards)):
             for j in range(i + 1, len(cards)):
                 card1, card2 = cards[i], cards[j]
 
                 # Check if already exists
-                existing = CardSynergy.get_synergy(card1.id, card2.id)
-                if existing:
+                if (min(card1.id, card2.id), max(card1.id, card2.id)) in stored_pairs:
                     print(f"⏭️  Skipping existing: {card1.name} + {card2.name}")
                     continue
 
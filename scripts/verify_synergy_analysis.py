@@ -7,19 +7,24 @@ and demonstrates the enhanced analysis capabilities.
 """
 import os
 import sys
-import json
+from collections import ChainMap
+from typing import Any, Dict, List, Tuple
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from src.database import db
 from src.models.card_info import CardInfo
+from src.models.json_codec import load_json
 from src.services.text_analysis import find_synergy_candidates, calculate_synergy_score
 from main import create_app
 
 def check_analysis_status():
     """Check how many cards have been analyzed."""
-    total_cards = CardInfo.query.count()
-    analyzed_cards = CardInfo.query.filter(CardInfo.extracted_data.isnot(None)).count()
+    # COUNT(column) skips NULLs, so one scan counts both
+    total_cards, analyzed_cards = db.session.query(
+        db.func.count(CardInfo.id), db.func.count(CardInfo._extracted_data)
+    ).one()
 
     print("📊 COLLECTION ANALYSIS STATUS")
     print("=" * 40)
@@ -29,23 +34,34 @@ def check_analysis_status():
 
     return analyzed_cards > 0
 
-def show_sample_analysis():
+def load_analyzed_cards(limit: int) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Get the name and analysis of the first analyzed cards.
+
+    Selects only the two columns and decodes each analysis once, so the
+    checks below share one query instead of loading full rows each.
+    """
+    rows = db.session.query(CardInfo.name, CardInfo._extracted_data).filter(
+        CardInfo._extracted_data.isnot(None)
+    ).limit(limit)
+    return [(name, load_json(extracted_data)) for name, extracted_data in rows]
+
+def show_sample_analysis(cards: List[Tuple[str, Dict[str, Any]]]):
     """Show detailed analysis for a few sample cards."""
     print("\n🔍 SAMPLE CARD ANALYSIS")
     print("=" * 40)
 
     # Get first few analyzed cards
-    sample_cards = CardInfo.query.filter(CardInfo.extracted_data.isnot(None)).limit(3).all()
+    sample_cards = cards[:3]
 
     if not sample_cards:
         print("❌ No analyzed cards found. Run synergy analysis first!")
         return False
 
-    for i, card in enumerate(sample_cards, 1):
-        print(f"\n{i}. {card.name}")
+    for i, (name, data) in enumerate(sample_cards, 1):
+        print(f"\n{i}. {name}")
         print("-" * 30)
 
-        data = card.extracted_data
         if not data:
             print("  No analysis data")
             continue
@@ -80,13 +96,13 @@ def show_sample_analysis():
 
     return True
 
-def test_synergy_detection():
+def test_synergy_detection(cards: List[Tuple[str, Dict[str, Any]]]):
     """Test synergy detection between cards in the collection."""
     print("\n🤝 SYNERGY DETECTION TEST")
     print("=" * 40)
 
     # Get analyzed cards
-    cards = CardInfo.query.filter(CardInfo.extracted_data.isnot(None)).limit(10).all()
+    cards = cards[:10]
 
     if len(cards) < 2:
         print("❌ Need at least 2 analyzed cards for synergy testing")
@@ -95,26 +111,22 @@ def test_synergy_detection():
     print(f"Testing synergies among {len(cards)} cards...")
 
     # Test with first card
-    target_card = cards[0]
-    target_analysis = target_card.extracted_data.copy()
-    target_analysis["name"] = target_card.name
+    target_name, target_data = cards[0]
+    target_analysis = ChainMap({"name": target_name}, target_data)
 
-    # Prepare collection analyses
-    collection_analyses = []
-    for card in cards:
-        analysis = card.extracted_data.copy()
-        analysis["name"] = card.name
-        collection_analyses.append(analysis)
+    # Prepare collection analyses: layer each name over its analysis
+    # instead of copying the analysis to add it
+    collection_analyses = [ChainMap({"name": name}, data) for name, data in cards]
 
     # Find synergies
-    synergies = find_synergy_candidates(target_analysis, collection_analyses, threshold=3.0)
+    synergies = find_synergy_candidates(target_analysis, collection_analyses, threshold=3.0, limit=5)
 
-    print(f"\n🎯 Synergies found for '{target_card.name}':")
+    print(f"\n🎯 Synergies found for '{target_name}':")
 
     if not synergies:
         print("  No significant synergies found (score < 3.0)")
     else:
-        for i, synergy in enumerate(synergies[:5], 1):  # Show top 5
+        for i, synergy in enumerate(synergies, 1):  # Show top 5
             other_name = synergy["card"].get('name', 'Unknown')
             score = synergy["score"]
             breakdown = synergy["synergy"]
@@ -130,26 +142,24 @@ def test_synergy_detection():
 
     return True
 
-def test_detailed_synergy_scoring():
+def test_detailed_synergy_scoring(cards: List[Tuple[str, Dict[str, Any]]]):
     """Test detailed synergy scoring between two specific cards."""
     print("\n📊 DETAILED SYNERGY SCORING TEST")
     print("=" * 40)
 
     # Get two analyzed cards
-    cards = CardInfo.query.filter(CardInfo.extracted_data.isnot(None)).limit(2).all()
-
     if len(cards) < 2:
         print("❌ Need at least 2 analyzed cards for detailed scoring test")
         return False
 
-    card1, card2 = cards[0], cards[1]
+    (name1, data1), (name2, data2) = cards[0], cards[1]
 
     print(f"Analyzing synergy between:")
-    print(f"  Card 1: {card1.name}")
-    print(f"  Card 2: {card2.name}")
+    print(f"  Card 1: {name1}")
+    print(f"  Card 2: {name2}")
 
     # Calculate detailed synergy score
-    synergy_result = calculate_synergy_score(card1.extracted_data, card2.extracted_data)
+    synergy_result = calculate_synergy_score(data1, data2)
 
     print(f"\n🎯 Synergy Analysis Results:")
     print(f"  Total Score: {synergy_result['total_score']:.2f}")
@@ -192,14 +202,17 @@ def main():
             print("  curl -X POST http://localhost:5000/collection/analyze-all")
             return
 
+        # Every check below reads from the same first analyzed cards
+        cards = load_analyzed_cards(limit=10)
+
         # Show sample analysis
-        show_sample_analysis()
+        show_sample_analysis(cards)
 
         # Test synergy detection
-        test_synergy_detection()
+        test_synergy_detection(cards)
 
         # Test detailed scoring
-        test_detailed_synergy_scoring()
+        test_detailed_synergy_scoring(cards)
 
         print(f"\n✅ VERIFICATION COMPLETE!")
         print("=" * 60)
@@ -1,12 +1,48 @@
 """
 Database configuration module.
 """
+import sqlite3
+
 from flask_sqlalchemy import SQLAlchemy
 from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 # Create a SQLAlchemy instance
 db = SQLAlchemy()
 
+# Connection settings for SQLite: WAL journaling with NORMAL sync avoids an
+# fsync per commit, and a larger page cache plus mmap speed up reads
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-262144",
+    "PRAGMA mmap_size=268435456",
+]
+
+
+def configure_sqlite(connection: sqlite3.Connection) -> None:
+    """
+    Apply the standard SQLite pragmas to a raw DB-API connection.
+
+    Args:
+        connection: A sqlite3 connection, from SQLAlchemy or sqlite3.connect()
+    """
+    cursor = connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, "connect")
+def _configure_sqlite_on_connect(dbapi_connection, connection_record) -> None:
+    """Configure every new SQLite connection opened by SQLAlchemy."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        configure_sqlite(dbapi_connection)
+
 
 def init_app(app: Flask) -> None:
     """
@@ -0,0 +1,82 @@
+"""
+Model for caching text analysis results by analyzer input.
+
+Cards with identical oracle text and card data (reprints, basic lands,
+functional duplicates) produce identical analyses, so the stored JSON can be
+reused instead of running the NLP pipeline again.
+"""
+from typing import Dict, Any, Optional
+import hashlib
+import json
+
+from ..database import db
+
+# Bump when analyze_card_text() output changes so stale entries stop matching
+ANALYSIS_VERSION = "1.0"
+
+class AnalysisCache(db.Model):
+    """Text analysis output keyed by a hash of the analyzer input."""
+
+    __tablename__ = "analysis_cache"
+
+    # SHA-1 of the analysis version, oracle text and card data
+    input_hash = db.Column(db.String(40), primary_key=True)
+
+    # Analysis output stored as the same JSON strings CardInfo uses
+    _keywords = db.Column("keywords", db.Text, nullable=True)
+    _extracted_data = db.Column("extracted_data", db.Text, nullable=False)
+
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    @staticmethod
+    def hash_input(oracle_text: str, card_data: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Hash everything analyze_card_text() reads for a card.
+
+        Args:
+            oracle_text: The card's oracle text
+            card_data: Additional card data passed to the analyzer
+
+        Returns:
+            Hex SHA-1 digest
+        """
+        payload = json.dumps(
+            [ANALYSIS_VERSION, oracle_text, card_data or {}], sort_keys=True, default=str
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def lookup(cls, input_hash: str) -> Optional['AnalysisCache']:
+        """Get the cached analysis for an input hash, if any."""
+        return db.session.get(cls, input_hash)
+
+    @classmethod
+    def store(cls, input_hash: str, card_info) -> 'AnalysisCache':
+        """
+        Add a cache entry holding a freshly analyzed card's output.
+
+        The entry joins the current session, so it is committed together with
+        the card update.
+
+        Args:
+            input_hash: Hash from hash_input()
+            card_info: CardInfo whose keywords and extracted_data were just set
+
+        Returns:
+            The new AnalysisCache instance
+        """
+        entry = cls(
+            input_hash=input_hash,
+            _keywords=card_info._keywords,
+            _extracted_data=card_info._extracted_data
+        )
+        db.session.add(entry)
+        return entry
+
+    def apply_to(self, card_info) -> None:
+        """Copy the cached JSON onto a CardInfo without decoding it."""
+        card_info._keywords = self._keywords
+        card_info._extracted_data = self._extracted_data
+
+    def __repr__(self) -> str:
+        return f"<AnalysisCache(input_hash='{self.input_hash}')>"
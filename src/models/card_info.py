@@ -3,10 +3,33 @@ Model for the card information that is shared across printings.
 This includes Oracle text, mana cost, etc.
 """
 from typing import List, Dict, Any, Optional
-import json
 from datetime import datetime
 
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
 from ..database import db
+from .json_codec import dump_json, load_json
+
+# Trigram full-text index over card names, so substring searches use an index
+# instead of scanning card_info. Triggers keep it in sync with the table.
+NAME_SEARCH_TABLE = "card_info_fts"
+NAME_SEARCH_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {NAME_SEARCH_TABLE} USING fts5("
+    "name, content='card_info', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {NAME_SEARCH_TABLE}_insert AFTER INSERT ON card_info BEGIN "
+    f"INSERT INTO {NAME_SEARCH_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {NAME_SEARCH_TABLE}_delete AFTER DELETE ON card_info BEGIN "
+    f"INSERT INTO {NAME_SEARCH_TABLE}({NAME_SEARCH_TABLE}, rowid, name) "
+    "VALUES ('delete', old.id, old.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {NAME_SEARCH_TABLE}_update AFTER UPDATE OF name ON card_info BEGIN "
+    f"INSERT INTO {NAME_SEARCH_TABLE}({NAME_SEARCH_TABLE}, rowid, name) "
+    "VALUES ('delete', old.id, old.name); "
+    f"INSERT INTO {NAME_SEARCH_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+]
+
+# The trigram index only matches terms at least this long
+MIN_NAME_SEARCH_LENGTH = 3
 
 class CardInfo(db.Model):
     """Represents core Magic card data, shared across all printings of the same card."""
@@ -20,6 +43,9 @@ class CardInfo(db.Model):
     name = db.Column(db.String(255), nullable=False, index=True, unique=True)
     oracle_id = db.Column(db.String(100), nullable=True, unique=True)  # Scryfall's oracle_id
 
+    # Lowercased name, kept in sync with name, for indexed case-insensitive lookups
+    name_lc = db.Column(db.String(255), nullable=True, index=True)
+
     # Oracle fields - shared across all printings
     oracle_text = db.Column(db.Text, nullable=True)
     mana_cost = db.Column(db.String(50), nullable=True)
@@ -30,6 +56,9 @@ class CardInfo(db.Model):
     _keywords = db.Column("keywords", db.Text, nullable=True)
     _extracted_data = db.Column("extracted_data", db.Text, nullable=True)
 
+    # When the card was last analyzed (NULL until the first analysis)
+    analyzed_at = db.Column(db.DateTime, nullable=True)
+
     # Related models - use string for back_populates to avoid circular imports
     printings = db.relationship("CardPrinting", back_populates="card_info", lazy="dynamic",
                                foreign_keys="CardPrinting.card_info_id")
@@ -38,36 +67,116 @@ class CardInfo(db.Model):
     created_at = db.Column(db.DateTime, server_default=db.func.now())
     updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
 
+    __table_args__ = (
+        # Partial index so finding unanalyzed cards is a seek, not a table scan
+        db.Index('idx_card_unanalyzed', 'analyzed_at', sqlite_where=db.text('analyzed_at IS NULL')),
+        # Partial index over analyzed cards, so filtering on extracted_data IS NOT
+        # NULL walks only their IDs instead of reading every row's text
+        db.Index('idx_card_analyzed', 'id', sqlite_where=db.text('extracted_data IS NOT NULL')),
+    )
+
+    def _decoded(self, column: str) -> Any:
+        """
+        Decode a JSON column once per stored string.
+
+        The parsed value is kept on the instance next to the string it came
+        from, so it is reused until the column changes (through a setter, a
+        direct assignment or a refresh). Callers must not mutate it.
+        """
+        raw = getattr(self, column)
+        if not raw:
+            return None
+        cache = self.__dict__.setdefault("_json_cache", {})
+        cached = cache.get(column)
+        if cached is None or cached[0] is not raw:
+            cached = cache[column] = (raw, load_json(raw))
+        return cached[1]
+
     @property
     def keywords(self) -> Optional[List[str]]:
         """Get list of keywords for this card."""
-        if self._keywords:
-            return json.loads(self._keywords)
-        return None
+        return self._decoded("_keywords")
 
     @keywords.setter
     def keywords(self, value: Optional[List[str]]) -> None:
         """Set keywords for this card."""
         if value is not None:
-            self._keywords = json.dumps(value)
+            self._keywords = dump_json(value)
         else:
             self._keywords = None
 
     @property
     def extracted_data(self) -> Optional[Dict[str, Any]]:
         """Get extracted data from text analysis."""
-        if self._extracted_data:
-            return json.loads(self._extracted_data)
-        return None
+        return self._decoded("_extracted_data")
 
     @extracted_data.setter
     def extracted_data(self, value: Optional[Dict[str, Any]]) -> None:
         """Set extracted data from text analysis."""
         if value is not None:
-            self._extracted_data = json.dumps(value)
+            self._extracted_data = dump_json(value)
         else:
             self._extracted_data = None
 
+    @classmethod
+    def find_by_name(cls, name: str) -> Optional['CardInfo']:
+        """
+        Find a card by case-insensitive name, preferring names that start with it.
+
+        Prefix matches are a range seek on the name_lc index; only when none
+        exists does this fall back to a substring match, which scans the table.
+
+        Args:
+            name: Full or partial card name
+
+        Returns:
+            The first matching CardInfo, or None
+        """
+        prefix = name.lower()
+        if not prefix:
+            return None
+        # Every string starting with prefix sorts in [prefix, prefix with its last character bumped)
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        card = cls.query.filter(cls.name_lc >= prefix, cls.name_lc < upper).order_by(cls.name_lc).first()
+        if card is None:
+            matches = cls.search_by_name(name, limit=1)
+            card = matches[0] if matches else None
+        return card
+
+    @classmethod
+    def search_by_name(cls, term: str, limit: Optional[int] = None) -> List['CardInfo']:
+        """
+        Find cards whose name contains a term, case-insensitively, in ID order.
+
+        Terms of MIN_NAME_SEARCH_LENGTH or more characters are looked up in the
+        trigram name index; shorter terms, and databases without the index,
+        fall back to an ILIKE scan.
+
+        Args:
+            term: Part of a card name
+            limit: Maximum number of cards to return, or None for all
+
+        Returns:
+            List of matching CardInfo objects
+        """
+        if len(term) >= MIN_NAME_SEARCH_LENGTH:
+            try:
+                ids = db.session.execute(
+                    db.text(
+                        f"SELECT rowid FROM {NAME_SEARCH_TABLE} WHERE {NAME_SEARCH_TABLE} MATCH :query "
+                        "ORDER BY rowid LIMIT :limit"
+                    ),
+                    # A quoted phrase of trigrams matches the term as a substring
+                    {"query": '"' + term.replace('"', '""') + '"',
+                     "limit": -1 if limit is None else limit}
+                ).scalars().all()
+            except OperationalError:
+                ids = None
+            if ids is not None:
+                return cls.query.filter(cls.id.in_(ids)).order_by(cls.id).all() if ids else []
+
+        return cls.query.filter(cls.name.ilike(f'%{term}%')).order_by(cls.id).limit(limit).all()
+
     def __repr__(self) -> str:
         return f"<CardInfo(id={self.id}, name='{self.name}')>"
 
@@ -83,7 +192,8 @@ class CardInfo(db.Model):
             "type_line": self.type_line,
             "keywords": self.keywords,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "analyzed_at": self.analyzed_at.isoformat() if self.analyzed_at else None
         }
 
         # Add extracted data if available
@@ -91,3 +201,46 @@ class CardInfo(db.Model):
             data["extracted_data"] = self.extracted_data
 
         return {k: v for k, v in data.items() if v is not None}  # Return only non-None values
+
+@event.listens_for(CardInfo.name, "set")
+def _sync_name_lc(target: CardInfo, value: Optional[str], oldvalue: Any, initiator: Any) -> None:
+    """Keep name_lc matching name whenever the name is assigned."""
+    target.name_lc = value.lower() if value is not None else None
+
+def create_name_search_index(connection) -> bool:
+    """
+    Create the trigram name index and its sync triggers if they don't exist.
+
+    A newly created index is filled from the existing card_info rows.
+
+    Args:
+        connection: A SQLAlchemy connection to the SQLite database
+
+    Returns:
+        False if this SQLite build has no FTS5 trigram tokenizer
+    """
+    existing = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (NAME_SEARCH_TABLE,)
+    ).first()
+    try:
+        for statement in NAME_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+    except OperationalError:
+        return False
+    if existing is None:
+        connection.exec_driver_sql(
+            f"INSERT INTO {NAME_SEARCH_TABLE}({NAME_SEARCH_TABLE}) VALUES ('rebuild')"
+        )
+    return True
+
+@event.listens_for(CardInfo.__table__, "after_create")
+def _create_name_search_index(target: Any, connection: Any, **kw: Any) -> None:
+    """Create the name index along with the card_info table."""
+    if connection.dialect.name == "sqlite":
+        create_name_search_index(connection)
+
+@event.listens_for(CardInfo.__table__, "before_drop")
+def _drop_name_search_index(target: Any, connection: Any, **kw: Any) -> None:
+    """Drop the name index with the card_info table so it never outlives its rows."""
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {NAME_SEARCH_TABLE}")
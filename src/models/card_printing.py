@@ -2,9 +2,9 @@
 Model for specific printings of cards in the user's collection.
 """
 from typing import Optional, Dict, Any
-import json
 
 from ..database import db
+from .json_codec import dump_json, load_json
 
 class CardPrinting(db.Model):
     """Represents a specific printing of a card in the user's collection."""
@@ -53,14 +53,14 @@ class CardPrinting(db.Model):
     def image_uris(self) -> Optional[Dict[str, Any]]:
         """Convert stored JSON string to dictionary."""
         if self._image_uris:
-            return json.loads(self._image_uris)
+            return load_json(self._image_uris)
         return None
 
     @image_uris.setter
     def image_uris(self, value: Optional[Dict[str, Any]]) -> None:
         """Convert dictionary to JSON string for storage."""
         if value is not None:
-            self._image_uris = json.dumps(value)
+            self._image_uris = dump_json(value)
         else:
             self._image_uris = None
 
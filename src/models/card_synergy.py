@@ -1,11 +1,40 @@
 """
 Model for storing synergy scores between pairs of cards.
 """
-from typing import Dict, Any, Optional
-import json
+from typing import Dict, Any, NamedTuple, Optional, Set, Tuple
 from datetime import datetime
 
+from sqlalchemy.orm import joinedload
+
 from ..database import db
+from .json_codec import dump_json, load_json
+
+class SynergyRecord(NamedTuple):
+    """Column values of one synergy analysis, in a fixed layout."""
+
+    total_score: float
+    tribal_score: float
+    color_score: float
+    keyword_score: float
+    archetype_score: float
+    combo_score: float
+    type_score: float
+    mana_curve_score: float
+    format_score: float
+    synergy_breakdown: str  # JSON of the full analysis result
+
+    @classmethod
+    def from_analysis(cls, synergy_result: Dict[str, Any]) -> 'SynergyRecord':
+        """
+        Extract the stored columns from a calculate_synergy_score() result.
+
+        The breakdown is serialized here, once, so a record reused for many
+        card pairs is not re-encoded for each of them.
+        """
+        return cls(
+            *(synergy_result.get(name, 0) for name in cls._fields[:-1]),
+            dump_json(synergy_result)
+        )
 
 class CardSynergy(db.Model):
     """Represents synergy relationship between two cards."""
@@ -16,11 +45,11 @@ class CardSynergy(db.Model):
     id = db.Column(db.Integer, primary_key=True)
 
     # Foreign keys to the two cards
-    card1_id = db.Column(db.Integer, db.ForeignKey('card_info.id'), nullable=False, index=True)
-    card2_id = db.Column(db.Integer, db.ForeignKey('card_info.id'), nullable=False, index=True)
+    card1_id = db.Column(db.Integer, db.ForeignKey('card_info.id'), nullable=False)
+    card2_id = db.Column(db.Integer, db.ForeignKey('card_info.id'), nullable=False)
 
     # Synergy score and breakdown
-    total_score = db.Column(db.Float, nullable=False, index=True)
+    total_score = db.Column(db.Float, nullable=False)
 
     # Detailed breakdown stored as JSON
     _synergy_breakdown = db.Column("synergy_breakdown", db.Text, nullable=True)
@@ -47,24 +76,37 @@ class CardSynergy(db.Model):
     # Unique constraint to prevent duplicate pairs
     __table_args__ = (
         db.UniqueConstraint('card1_id', 'card2_id', name='unique_card_pair'),
-        db.Index('idx_synergy_score', 'total_score'),
+        # Pairs are stored (lower ID, higher ID), so one ordered lookup finds any pair
+        db.CheckConstraint('card1_id < card2_id', name='ordered_card_pair'),
+        # Covering index for score-ordered and score-filtered pair scans
+        db.Index('idx_synergy_score', db.desc('total_score'), 'card1_id', 'card2_id'),
         db.Index('idx_tribal_synergy', 'tribal_score'),
         db.Index('idx_combo_synergy', 'combo_score'),
         db.Index('idx_archetype_synergy', 'archetype_score'),
+        # Covering indexes for per-card lookups ordered by score
+        db.Index('idx_card1_top', 'card1_id', db.desc('total_score'), 'card2_id'),
+        db.Index('idx_card2_top', 'card2_id', db.desc('total_score'), 'card1_id'),
+        # Partial covering indexes matching the per-archetype find_deck_cores() filters
+        db.Index('idx_tribal_cores', db.desc('total_score'), 'card1_id', 'card2_id', 'tribal_score',
+                 sqlite_where=db.text('tribal_score >= 10')),
+        db.Index('idx_combo_cores', db.desc('total_score'), 'card1_id', 'card2_id', 'combo_score',
+                 sqlite_where=db.text('combo_score >= 10')),
+        db.Index('idx_control_cores', db.desc('total_score'), 'card1_id', 'card2_id', 'archetype_score',
+                 sqlite_where=db.text('archetype_score >= 8')),
     )
 
     @property
     def synergy_breakdown(self) -> Optional[Dict[str, Any]]:
         """Get detailed synergy breakdown."""
         if self._synergy_breakdown:
-            return json.loads(self._synergy_breakdown)
+            return load_json(self._synergy_breakdown)
         return None
 
     @synergy_breakdown.setter
     def synergy_breakdown(self, value: Optional[Dict[str, Any]]) -> None:
         """Set detailed synergy breakdown."""
         if value is not None:
-            self._synergy_breakdown = json.dumps(value)
+            self._synergy_breakdown = dump_json(value)
         else:
             self._synergy_breakdown = None
 
@@ -102,11 +144,75 @@ class CardSynergy(db.Model):
 
         return synergy
 
+    @classmethod
+    def row_from_analysis(cls, card1_id: int, card2_id: int, synergy_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build a plain column-value row from a synergy analysis result.
+
+        Mirrors create_from_analysis() but skips ORM instance construction so
+        rows can be written in bulk with bulk_insert().
+
+        Args:
+            card1_id: ID of the first card
+            card2_id: ID of the second card
+            synergy_result: Result from calculate_synergy_score()
+
+        Returns:
+            Dictionary keyed by card_synergy column names
+        """
+        return cls.row_from_record(card1_id, card2_id, SynergyRecord.from_analysis(synergy_result))
+
+    @classmethod
+    def row_from_record(cls, card1_id: int, card2_id: int, record: SynergyRecord) -> Dict[str, Any]:
+        """
+        Build a plain column-value row from a precomputed SynergyRecord.
+
+        Args:
+            card1_id: ID of the first card
+            card2_id: ID of the second card
+            record: Record from SynergyRecord.from_analysis()
+
+        Returns:
+            Dictionary keyed by card_synergy column names
+        """
+        # Ensure consistent ordering (lower ID first)
+        if card1_id > card2_id:
+            card1_id, card2_id = card2_id, card1_id
+
+        row = record._asdict()
+        row["card1_id"] = card1_id
+        row["card2_id"] = card2_id
+        return row
+
+    @classmethod
+    def bulk_insert(cls, rows: list[Dict[str, Any]]) -> int:
+        """
+        Insert many synergy rows with a single executemany statement.
+
+        Uses INSERT OR IGNORE so pairs that are already stored are skipped by
+        the unique_card_pair index instead of being checked in Python. Rows
+        must be ordered (lower ID, higher ID), as row_from_analysis() does.
+        The caller is responsible for committing the session.
+
+        Args:
+            rows: Rows built with row_from_analysis()
+
+        Returns:
+            Number of rows actually inserted
+        """
+        if not rows:
+            return 0
+        result = db.session.execute(cls.__table__.insert().prefix_with("OR IGNORE"), rows)
+        return result.rowcount
+
     @classmethod
     def get_synergy(cls, card1_id: int, card2_id: int) -> Optional['CardSynergy']:
         """
         Get synergy between two cards (order independent).
 
+        Pairs are stored with the lower ID first, so this is a single
+        unique_card_pair index lookup.
+
         Args:
             card1_id: ID of the first card
             card2_id: ID of the second card
@@ -120,6 +226,20 @@ class CardSynergy(db.Model):
 
         return cls.query.filter_by(card1_id=card1_id, card2_id=card2_id).first()
 
+    @classmethod
+    def get_stored_pairs(cls) -> Set[Tuple[int, int]]:
+        """
+        Get every stored card pair in one streamed query.
+
+        Lets callers that walk many pairs test membership in memory instead
+        of calling get_synergy() for each one.
+
+        Returns:
+            Set of (lower card ID, higher card ID) tuples
+        """
+        rows = db.session.query(cls.card1_id, cls.card2_id).yield_per(10000)
+        return {(min(card1_id, card2_id), max(card1_id, card2_id)) for card1_id, card2_id in rows}
+
     @classmethod
     def get_top_synergies(cls, limit: int = 100, min_score: float = 10.0) -> list['CardSynergy']:
         """
@@ -130,9 +250,12 @@ class CardSynergy(db.Model):
             min_score: Minimum synergy score to include
 
         Returns:
-            List of CardSynergy instances sorted by total score
+            List of CardSynergy instances sorted by total score, with both
+            cards loaded in the same query
         """
-        return cls.query.filter(
+        return cls.query.options(
+            joinedload(cls.card1), joinedload(cls.card2)
+        ).filter(
             cls.total_score >= min_score
         ).order_by(cls.total_score.desc()).limit(limit).all()
 
@@ -155,18 +278,37 @@ class CardSynergy(db.Model):
         ).order_by(cls.total_score.desc()).limit(limit).all()
 
     @classmethod
-    def get_tribal_synergies(cls, min_score: float = 15.0) -> list['CardSynergy']:
+    def count_matching(cls, conditions: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Count the synergies matching each of several conditions in one table scan.
+
+        Args:
+            conditions: Label -> SQL condition, e.g. {"tribal": cls.tribal_score >= 10}
+
+        Returns:
+            Label -> number of matching synergies
+        """
+        if not conditions:
+            return {}
+        counts = db.session.query(*[
+            db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+            for condition in conditions.values()
+        ]).one()
+        return dict(zip(conditions, counts))
+
+    @classmethod
+    def get_tribal_synergies(cls, min_score: float = 15.0, limit: Optional[int] = None) -> list['CardSynergy']:
         """Get synergies with high tribal scores."""
         return cls.query.filter(
             cls.tribal_score >= min_score
-        ).order_by(cls.tribal_score.desc()).all()
+        ).order_by(cls.tribal_score.desc()).limit(limit).all()
 
     @classmethod
-    def get_combo_synergies(cls, min_score: float = 15.0) -> list['CardSynergy']:
+    def get_combo_synergies(cls, min_score: float = 15.0, limit: Optional[int] = None) -> list['CardSynergy']:
         """Get synergies with high combo potential."""
         return cls.query.filter(
             cls.combo_score >= min_score
-        ).order_by(cls.combo_score.desc()).all()
+        ).order_by(cls.combo_score.desc()).limit(limit).all()
 
     @classmethod
     def get_archetype_synergies(cls, min_score: float = 10.0) -> list['CardSynergy']:
@@ -0,0 +1,34 @@
+"""
+JSON encoding for the models' Text-backed JSON columns.
+
+Uses orjson when it is installed, falling back to the standard library for
+values orjson rejects, so stored strings stay readable by either.
+"""
+from typing import Any
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dump_json(value: Any, indent: bool = False) -> str:
+    """Serialize a JSON column value, indented by two spaces if requested."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(value, option=option).decode("utf-8")
+        except TypeError:
+            # e.g. float subclasses such as NumPy scalars
+            pass
+    return json.dumps(value, indent=2 if indent else None)
+
+def load_json(text: str) -> Any:
+    """Parse a stored JSON column value."""
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except ValueError:
+            # e.g. NaN written by json.dumps
+            pass
+    return json.loads(text)
@@ -1,10 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask.wrappers import Response as FlaskResponse
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from werkzeug.datastructures import FileStorage
 
+from ..database import db
 from ..services.csv_importer import process_csv_data
 from ..services.card_analysis import analyze_card, analyze_all_cards
+from ..services.background_jobs import submit_job, get_job
 from ..store.card_store import (
     add_cards_to_collection, get_all_cards, clear_collection,
     get_card_by_id, update_card, delete_card,
@@ -13,10 +15,30 @@ from ..store.card_store import (
 from ..models.card_printing import CardPrinting
 from ..models.card_info import CardInfo
 from ..models.card_synergy import CardSynergy
+from ..models.json_codec import load_json
 from ..store.card_info_store import get_all_cards_info, get_card_info_by_id
 
 collection_bp = Blueprint('collection_bp', __name__, url_prefix='/collection')
 
+def _run_in_background() -> bool:
+    """Check whether the client asked for a bulk operation to run as a job."""
+    return request.args.get('background', 'false').lower() == 'true'
+
+def _bulk_result(verb: str, successful: int, total: int,
+                 errors: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], int]:
+    """Build the response body and status code for a bulk card operation."""
+    response = {
+        "message": f"{verb} {successful} out of {total} cards.",
+        "success_count": successful,
+        "total_count": total
+    }
+
+    if errors:
+        response["errors"] = errors
+
+    status_code = 200 if successful == total else 207  # 207 Multi-Status
+    return response, status_code
+
 @collection_bp.route('/import_csv', methods=['POST'])
 def import_csv_route() -> FlaskResponse:
     """
@@ -194,19 +216,17 @@ def enrich_card_route(card_id: int) -> FlaskResponse:
 def enrich_all_cards_route() -> FlaskResponse:
     """
     Enriches all cards in the collection with data from the Scryfall API.
-    """
-    successful, total, errors = enrich_all_cards()
 
-    response = {
-        "message": f"Enriched {successful} out of {total} cards.",
-        "success_count": successful,
-        "total_count": total
-    }
+    Pass ?background=true to run as a job and poll /collection/jobs/<job_id>.
+    """
+    def run() -> Dict[str, Any]:
+        return _bulk_result("Enriched", *enrich_all_cards())[0]
 
-    if errors:
-        response["errors"] = errors
+    if _run_in_background():
+        job_id = submit_job(current_app._get_current_object(), "enrich-all", run)
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
 
-    status_code = 200 if successful == total else 207  # 207 Multi-Status
+    response, status_code = _bulk_result("Enriched", *enrich_all_cards())
     return jsonify(response), status_code
 
 @collection_bp.route('/card-infos', methods=['GET'])
@@ -254,21 +274,32 @@ def analyze_card_info_route(card_info_id: int) -> FlaskResponse:
 def analyze_all_card_infos_route() -> FlaskResponse:
     """
     Analyzes all cards in the collection using NLP techniques.
-    """
-    successful, total, errors = analyze_all_cards()
 
-    response = {
-        "message": f"Analyzed {successful} out of {total} cards.",
-        "success_count": successful,
-        "total_count": total
-    }
+    Pass ?background=true to run as a job and poll /collection/jobs/<job_id>.
+    """
+    def run() -> Dict[str, Any]:
+        return _bulk_result("Analyzed", *analyze_all_cards())[0]
 
-    if errors:
-        response["errors"] = errors
+    if _run_in_background():
+        job_id = submit_job(current_app._get_current_object(), "analyze-all", run)
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
 
-    status_code = 200 if successful == total else 207  # 207 Multi-Status
+    response, status_code = _bulk_result("Analyzed", *analyze_all_cards())
     return jsonify(response), status_code
 
+@collection_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job_route(job_id: str) -> FlaskResponse:
+    """
+    Retrieves the status and result of a background job.
+
+    Args:
+        job_id: The ID returned when the job was submitted.
+    """
+    job = get_job(job_id)
+    if job:
+        return jsonify(job), 200
+    return jsonify({"message": f"Job {job_id} not found."}), 404
+
 @collection_bp.route('/cards/<int:card1_id>/synergy/<int:card2_id>', methods=['GET'])
 def get_card_synergy_route(card1_id: int, card2_id: int) -> FlaskResponse:
     """
@@ -371,25 +402,27 @@ def find_synergistic_partners_route(card_id: int) -> FlaskResponse:
 
         from src.services.text_analysis import calculate_synergy_score
 
-        # Get other analyzed cards
-        all_cards = CardInfo.query.filter(
-            CardInfo._extracted_data.isnot(None),
-            CardInfo.id != card_id
-        ).limit(500).all()
+        # Get other analyzed cards, selecting only the columns used below
+        all_cards = db.session.execute(
+            db.select(CardInfo.id, CardInfo.name, CardInfo.type_line, CardInfo._extracted_data)
+            .where(CardInfo._extracted_data.isnot(None), CardInfo.id != card_id)
+            .limit(500)
+        ).yield_per(500)
+        target_data = target_card.extracted_data
 
-        for card in all_cards:
+        for other_id, other_name, other_type_line, extracted_data in all_cards:
             synergy_result = calculate_synergy_score(
-                target_card.extracted_data,
-                card.extracted_data or {}
+                target_data,
+                (load_json(extracted_data) if extracted_data else None) or {}
             )
 
             score = synergy_result.get('total_score', 0)
             if score >= min_score:
                 synergistic_cards.append({
                     "card": {
-                        "id": card.id,
-                        "name": card.name,
-                        "type_line": card.type_line
+                        "id": other_id,
+                        "name": other_name,
+                        "type_line": other_type_line
                     },
                     "synergy_score": score,
                     "synergy_details": synergy_result
@@ -553,9 +586,7 @@ def search_synergies_route() -> FlaskResponse:
         return jsonify({"error": "card_name parameter is required"}), 400
 
     # Find cards matching the name
-    matching_cards = CardInfo.query.filter(
-        CardInfo.name.ilike(f"%{card_name}%")
-    ).all()
+    matching_cards = CardInfo.search_by_name(card_name)
 
     if not matching_cards:
         return jsonify({"error": f"No cards found matching '{card_name}'"}), 404
@@ -0,0 +1,92 @@
+"""
+Background execution of long-running collection jobs.
+
+Flask handles each request synchronously, so bulk operations such as analyzing
+or enriching the whole collection hold a worker for their full duration. Jobs
+submitted here run on a background thread inside an application context, and
+their status and result can be polled by job ID. Only the most recent
+MAX_FINISHED_JOBS finished or failed jobs are kept, so results do not pile up
+for the life of the process.
+"""
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from flask import Flask
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# A single worker: SQLite allows one writer, so bulk jobs run one at a time
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="collection-job")
+
+# Finished or failed jobs kept for polling; older ones are forgotten
+MAX_FINISHED_JOBS = 100
+
+# Jobs by ID, in submission order
+_jobs: Dict[str, Dict[str, Any]] = {}
+_jobs_lock = threading.Lock()
+
+def _update_job(job_id: str, **fields: Any) -> None:
+    """Update the stored state of a job."""
+    with _jobs_lock:
+        _jobs[job_id].update(fields)
+
+def _evict_finished_jobs() -> None:
+    """Forget the oldest finished or failed jobs beyond MAX_FINISHED_JOBS; needs _jobs_lock."""
+    done = [job_id for job_id, job in _jobs.items() if job["status"] in ("finished", "failed")]
+    for job_id in done[:max(len(done) - MAX_FINISHED_JOBS, 0)]:
+        del _jobs[job_id]
+
+def submit_job(app: Flask, name: str, func: Callable[[], Any]) -> str:
+    """
+    Run a function in the background inside the application context.
+
+    Args:
+        app: The Flask application whose context the job needs
+        name: Short description of the job
+        func: Callable returning a JSON-serializable result
+
+    Returns:
+        The ID used to poll the job with get_job()
+    """
+    job_id = uuid.uuid4().hex
+    with _jobs_lock:
+        _evict_finished_jobs()
+        _jobs[job_id] = {
+            "id": job_id,
+            "name": name,
+            "status": "queued",
+            "result": None,
+            "error": None
+        }
+
+    def run() -> None:
+        _update_job(job_id, status="running")
+        try:
+            with app.app_context():
+                result = func()
+            _update_job(job_id, status="finished", result=result)
+        except Exception as e:
+            logger.error(f"Background job {name} ({job_id}) failed: {str(e)}")
+            _update_job(job_id, status="failed", error=str(e))
+
+    _executor.submit(run)
+    return job_id
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a snapshot of a job's status.
+
+    Args:
+        job_id: ID returned by submit_job()
+
+    Returns:
+        Dictionary with id, name, status, result and error, or None if unknown
+        or already evicted
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
@@ -5,15 +5,99 @@ This module integrates with the text analysis service to extract and store
 information from card oracle text.
 """
 import logging
-from typing import List, Dict, Any, Tuple, Optional
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Dict, Any, Tuple, Optional, Union
 
 from ..database import db
+from ..models.analysis_cache import AnalysisCache
 from ..models.card_info import CardInfo
+from ..models.card_printing import CardPrinting
+from ..models.json_codec import dump_json
 from ..services.text_analysis import analyze_card_text
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Cards written back per UPDATE statement and commit in analyze_all_cards()
+ANALYSIS_BATCH_SIZE = 1000
+
+# Uncached inputs sent to a worker process at a time by analyze_all_cards()
+ANALYSIS_CHUNK_SIZE = 64
+
+def get_scryfall_data(card_info: CardInfo) -> Dict[str, Any]:
+    """
+    Build the additional card data passed to the text analyzer.
+
+    Args:
+        card_info: The card being analyzed
+
+    Returns:
+        Card fields for enriched cards, or an empty dict
+    """
+    scryfall_data = {}
+
+    # Check if card has enriched data from Scryfall
+    if hasattr(card_info, 'printings') and card_info.printings.count() > 0:
+        # Get the first printing to check for Scryfall data
+        printing = card_info.printings.first()
+        if printing and hasattr(printing, 'scryfall_id'):
+            scryfall_data = scryfall_fields(card_info)
+
+    return scryfall_data
+
+def scryfall_fields(card: Any) -> Dict[str, Any]:
+    """
+    Build Scryfall data from card_info fields.
+
+    Args:
+        card: A CardInfo, or a row with the same column attributes
+
+    Returns:
+        Card fields passed to the text analyzer
+    """
+    return {
+        "oracle_text": card.oracle_text,
+        "mana_cost": card.mana_cost,
+        "cmc": card.cmc,
+        "type_line": card.type_line,
+        # Add more fields as they become available in the database
+    }
+
+def analyze_card_info(card_info: CardInfo) -> bool:
+    """
+    Set a card's keywords and extracted data, reusing cached analyses.
+
+    Cards whose oracle text and card data were analyzed before get the cached
+    JSON copied verbatim. Otherwise the text is analyzed and the result is
+    added to the cache in the same session. The caller commits.
+
+    Args:
+        card_info: The card to analyze
+
+    Returns:
+        True if the analysis came from the cache
+    """
+    scryfall_data = get_scryfall_data(card_info)
+    card_info.analyzed_at = db.func.now()
+    input_hash = AnalysisCache.hash_input(card_info.oracle_text, scryfall_data)
+
+    cached = AnalysisCache.lookup(input_hash)
+    if cached:
+        cached.apply_to(card_info)
+        return True
+
+    # Analyze the card text with additional card data
+    analysis_result = analyze_card_text(card_info.oracle_text, scryfall_data)
+
+    # Update the card info record
+    card_info.keywords = analysis_result.get("keywords", [])
+    card_info.extracted_data = analysis_result
+
+    AnalysisCache.store(input_hash, card_info)
+    return False
+
 def analyze_card(card_info_id: int) -> Tuple[Optional[CardInfo], str]:
     """
     Analyze a single card's oracle text and update its record with the extracted data.
@@ -34,32 +118,7 @@ def analyze_card(card_info_id: int) -> Tuple[Optional[CardInfo], str]:
         return card_info, "Card has no oracle text to analyze."
 
     try:
-        # Get Scryfall data if available
-        scryfall_data = {}
-
-        # Check if card has enriched data from Scryfall
-        if hasattr(card_info, 'printings') and card_info.printings.count() > 0:
-            # Get the first printing to check for Scryfall data
-            printing = card_info.printings.first()
-            if printing and hasattr(printing, 'scryfall_id'):
-                # Build Scryfall data from card_info fields
-                scryfall_data = {
-                    "oracle_text": card_info.oracle_text,
-                    "mana_cost": card_info.mana_cost,
-                    "cmc": card_info.cmc,
-                    "type_line": card_info.type_line,
-                    # Add more fields as they become available in the database
-                }
-
-        # Analyze the card text with additional card data
-        analysis_result = analyze_card_text(card_info.oracle_text, scryfall_data)
-
-        # Extract keywords from the analysis result
-        keywords = analysis_result.get("keywords", [])
-
-        # Update the card info record
-        card_info.keywords = keywords
-        card_info.extracted_data = analysis_result
+        analyze_card_info(card_info)
 
         # Save to database
         db.session.commit()
@@ -69,10 +128,72 @@ def analyze_card(card_info_id: int) -> Tuple[Optional[CardInfo], str]:
         logger.error(f"Error analyzing card {card_info_id}: {str(e)}")
         return card_info, f"Error analyzing card: {str(e)}"
 
-def analyze_all_cards() -> Tuple[int, int, List[Dict[str, Any]]]:
+def _analyze_input(item: Tuple[str, Dict[str, Any]]) -> Union[Tuple[str, str], Exception]:
+    """
+    Analyze one (oracle text, Scryfall data) input into its JSON columns.
+
+    Runs in a worker process; a failed analysis yields its exception so the
+    caller can report it for every card with that input.
+    """
+    try:
+        # Serialized as the CardInfo setters do
+        analysis_result = analyze_card_text(*item)
+        return dump_json(analysis_result.get("keywords", [])), dump_json(analysis_result)
+    except Exception as e:
+        return e
+
+def _write_analyses(batch: List[Tuple[int, str]], rows: List[Dict[str, Any]],
+                    cache_rows: List[Dict[str, Any]], errors: List[Dict[str, Any]]) -> int:
+    """
+    Write a batch of analyses with one executemany UPDATE and commit it.
+
+    Args:
+        batch: ID and name of each card in the batch, for error reports
+        rows: card_id, keywords_json and extracted_json for each card
+        cache_rows: New analysis_cache rows for inputs analyzed in this batch
+        errors: List the batch's errors are appended to if the write fails
+
+    Returns:
+        Number of cards saved
+    """
+    table = CardInfo.__table__
+    statement = table.update().where(table.c.id == db.bindparam("card_id")).values(
+        keywords=db.bindparam("keywords_json"),
+        extracted_data=db.bindparam("extracted_json"),
+        analyzed_at=db.func.now()
+    )
+    try:
+        db.session.execute(statement, rows)
+        if cache_rows:
+            db.session.execute(AnalysisCache.__table__.insert().prefix_with("OR IGNORE"), cache_rows)
+        db.session.commit()
+        logger.info(f"Saved analyses for {len(rows)} cards")
+        return len(rows)
+    except Exception as db_err:
+        db.session.rollback()
+        for card_id, card_name in batch:
+            error_msg = f"Database error when saving analysis for card {card_id}: {str(db_err)}"
+            errors.append({
+                "card_id": card_id,
+                "card_name": card_name,
+                "error": error_msg
+            })
+            logger.error(error_msg)
+        return 0
+
+def analyze_all_cards(workers: Optional[int] = None) -> Tuple[int, int, List[Dict[str, Any]]]:
     """
     Analyze all cards' oracle text and update their records with extracted data.
-    Commits changes to the database after each successful card analysis.
+
+    Inputs missing from the analysis cache are analyzed in `workers` processes
+    (defaults to CPU count) when there are enough to give each worker several
+    chunks; the database is only used from this process. Results are written
+    back ANALYSIS_BATCH_SIZE cards at a time as a single UPDATE by primary
+    key, bypassing per-object ORM flushes, and each batch is committed on its
+    own.
+
+    Args:
+        workers: Number of analysis processes
 
     Returns:
         A tuple containing:
@@ -80,67 +201,90 @@ def analyze_all_cards() -> Tuple[int, int, List[Dict[str, Any]]]:
         - Total number of cards processed
         - List of errors that occurred during analysis
     """
-    card_infos = CardInfo.query.all()
-    total_cards = len(card_infos)
+    workers = workers or os.cpu_count() or 1
+    total_cards = db.session.query(db.func.count(CardInfo.id)).scalar()
     successful = 0
     errors = []
 
-    for card_info in card_infos:
-        # Skip cards without oracle text
-        if not card_info.oracle_text:
-            continue
+    # Any printing makes get_scryfall_data() pass the card fields; one query
+    # answers that for every card
+    enriched_ids = set(db.session.scalars(db.select(CardPrinting.card_info_id).distinct()))
 
-        try:
-            # Get Scryfall data if available (same logic as analyze_card)
-            scryfall_data = {}
-
-            # Check if card has enriched data from Scryfall
-            if hasattr(card_info, 'printings') and card_info.printings.count() > 0:
-                # Get the first printing to check for Scryfall data
-                printing = card_info.printings.first()
-                if printing and hasattr(printing, 'scryfall_id'):
-                    # Build Scryfall data from card_info fields
-                    scryfall_data = {
-                        "oracle_text": card_info.oracle_text,
-                        "mana_cost": card_info.mana_cost,
-                        "cmc": card_info.cmc,
-                        "type_line": card_info.type_line,
-                        # Add more fields as they become available in the database
-                    }
-
-            # Analyze the card text with additional card data (enhanced analysis)
-            analysis_result = analyze_card_text(card_info.oracle_text, scryfall_data)
-
-            # Extract keywords from the analysis result
-            keywords = analysis_result.get("keywords", [])
-
-            # Update the card info record
-            card_info.keywords = keywords
-            card_info.extracted_data = analysis_result
-
-            # Commit changes immediately
-            try:
-                db.session.commit()
-                successful += 1
-                logger.info(f"Successfully analyzed card {card_info.id} ({card_info.name})")
-            except Exception as db_err:
-                db.session.rollback()
-                error_msg = f"Database error when saving analysis for card {card_info.id}: {str(db_err)}"
-                errors.append({
-                    "card_id": card_info.id,
-                    "card_name": card_info.name,
-                    "error": error_msg
-                })
-                logger.error(error_msg)
+    # Stream only the columns the analyzer reads, collecting every input
+    # before the first commit closes the cursor
+    rows = db.session.execute(
+        db.select(CardInfo.id, CardInfo.name, CardInfo.oracle_text, CardInfo.mana_cost,
+                  CardInfo.cmc, CardInfo.type_line)
+        .where(CardInfo.oracle_text.isnot(None), CardInfo.oracle_text != "")
+        .order_by(CardInfo.id)
+    ).yield_per(500)
+    inputs = [
+        (row.id, row.name, row.oracle_text, scryfall_fields(row) if row.id in enriched_ids else {})
+        for row in rows
+    ]
+
+    # JSON columns (or the analysis error) by input hash, from the cache or
+    # analyzed during this run
+    analyses: Dict[str, Union[Tuple[Optional[str], str], Exception]] = {}
+    pending: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    card_hashes: List[Union[str, Exception]] = []
 
+    for card_id, card_name, oracle_text, scryfall_data in inputs:
+        try:
+            input_hash = AnalysisCache.hash_input(oracle_text, scryfall_data)
+            if input_hash not in analyses and input_hash not in pending:
+                cached = AnalysisCache.lookup(input_hash)
+                if cached:
+                    analyses[input_hash] = (cached._keywords, cached._extracted_data)
+                else:
+                    pending[input_hash] = (oracle_text, scryfall_data)
+            card_hashes.append(input_hash)
         except Exception as e:
-            # Rollback any pending changes for this card
-            db.session.rollback()
+            card_hashes.append(e)
+
+    # Each spawned worker loads the NLP model, so small runs are analyzed here
+    if workers > 1 and len(pending) >= workers * ANALYSIS_CHUNK_SIZE:
+        with ProcessPoolExecutor(workers, mp_context=get_context("spawn")) as pool:
+            results = pool.map(_analyze_input, pending.values(), chunksize=ANALYSIS_CHUNK_SIZE)
+            analyses.update(zip(pending, results))
+    else:
+        analyses.update((input_hash, _analyze_input(item)) for input_hash, item in pending.items())
+
+    batch: List[Tuple[int, str]] = []
+    rows: List[Dict[str, Any]] = []
+    cache_rows: List[Dict[str, Any]] = []
+
+    for (card_id, card_name, _, _), input_hash in zip(inputs, card_hashes):
+        analysis = analyses[input_hash] if isinstance(input_hash, str) else input_hash
+        if isinstance(analysis, Exception):
             errors.append({
-                "card_id": card_info.id,
-                "card_name": card_info.name,
-                "error": str(e)
+                "card_id": card_id,
+                "card_name": card_name,
+                "error": str(analysis)
+            })
+            logger.error(f"Error analyzing card {card_id} ({card_name}): {str(analysis)}")
+            continue
+
+        # New analyses are cached with the batch of their first card
+        keywords_json, extracted_json = analysis
+        if pending.pop(input_hash, None) is not None:
+            cache_rows.append({
+                "input_hash": input_hash,
+                "keywords": keywords_json,
+                "extracted_data": extracted_json
             })
-            logger.error(f"Error analyzing card {card_info.id} ({card_info.name}): {str(e)}")
+        batch.append((card_id, card_name))
+        rows.append({"card_id": card_id, "keywords_json": keywords_json, "extracted_json": extracted_json})
+
+        if len(rows) >= ANALYSIS_BATCH_SIZE:
+            successful += _write_analyses(batch, rows, cache_rows, errors)
+            batch, rows, cache_rows = [], [], []
+
+    if rows:
+        successful += _write_analyses(batch, rows, cache_rows, errors)
+
+    # Refresh planner statistics now that many rows gained an analysis
+    if successful:
+        db.session.execute(db.text("PRAGMA optimize"))
 
     return successful, total_cards, errors
@@ -7,7 +7,7 @@ from marshmallow import ValidationError
 from ..schemas.card_schemas import CardImportSchema
 from ..models.card_info import CardInfo
 from ..models.card_printing import CardPrinting
-from ..store.card_info_store import get_or_create_card_info
+from ..store.card_info_store import get_or_create_card_info_ids
 
 def process_csv_data(file_stream: IO[bytes]) -> Tuple[str, Optional[List[CardPrinting]], Optional[List[Dict[str, Any]]], int]:
     """
@@ -37,25 +37,31 @@ def process_csv_data(file_stream: IO[bytes]) -> Tuple[str, Optional[List[CardPri
         string_io: io.StringIO = io.StringIO(decoded_content, newline=None)
         csv_reader: csv.DictReader = csv.DictReader(string_io)
 
+        # Validate every row first, so the card names can be resolved together
+        loaded_rows: List[Tuple[int, Dict[str, Any], Dict[str, Any]]] = []
         row_number = 1 # For error reporting
         for row in csv_reader:
             row_number += 1
             try:
                 # Validate and deserialize data
-                loaded_data = schema.load(row)
-
-                # Get or create the CardInfo record
-                card_name = loaded_data.pop('Name')
-                card_info, _ = get_or_create_card_info(card_name)
-
-                # Create the CardPrinting object with the remaining data
-                card_printing = CardPrinting(card_info=card_info, **loaded_data)
-                valid_printings.append(card_printing)
+                loaded_rows.append((row_number, row, schema.load(row)))
             except ValidationError as err:
                 validation_errors.append({"row": row_number, "errors": err.messages, "data": row})
-            except Exception as e: # Catch other unexpected errors during schema loading or CardPrinting creation
+            except Exception as e: # Catch other unexpected errors during schema loading
                 validation_errors.append({"row": row_number, "errors": {"_unexpected": [str(e)]}, "data": row})
 
+        # Get or create every CardInfo record at once
+        name_to_id = get_or_create_card_info_ids(loaded_data['Name'] for _, _, loaded_data in loaded_rows)
+
+        for row_number, row, loaded_data in loaded_rows:
+            try:
+                # Link by ID so the printings insert without waiting on their CardInfo
+                card_info_id = name_to_id[loaded_data.pop('Name')]
+                card_printing = CardPrinting(card_info_id=card_info_id, **loaded_data)
+                valid_printings.append(card_printing)
+            except Exception as e: # Catch other unexpected errors during CardPrinting creation
+                validation_errors.append({"row": row_number, "errors": {"_unexpected": [str(e)]}, "data": row})
+        validation_errors.sort(key=lambda error: error["row"])
 
         if not valid_printings and not validation_errors:
              # This case implies the CSV was empty or only had headers
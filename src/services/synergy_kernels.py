@@ -0,0 +1,409 @@
+"""
+Compiled pair-scoring kernels for collection-wide synergy computation.
+
+The kernels walk the card pair matrix (its upper triangle, or every ordered
+pair) and score each pair from compact per-card arrays (sorted feature
+indices, color bitmasks and mana curve values), reproducing
+calculate_synergy_score()["total_score"] for the pair (card i, card j).
+
+Numba is an optional dependency. When it is installed the kernels are JIT
+compiled and run in parallel across rows; without it they still work but run
+as plain Python, so callers should prefer synergy_matrix.score_matrix() when
+NUMBA_AVAILABLE is False.
+"""
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .synergy_matrix import (
+    UNSHARED_SCORE_LIMIT,
+    SynergyFeatures,
+    color_bitmasks,
+    overlap_bitmasks,
+    unshared_score_limits,
+)
+from .text_analysis import SYNERGY_WEIGHTS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    logger.info("Numba not installed. Synergy kernels will run as plain Python.")
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        def decorator(func):
+            return func
+        return decorator
+
+# Component weights in the order calculate_synergy_score() sums them
+COMPONENT_WEIGHTS = np.array([
+    SYNERGY_WEIGHTS["tribal_score"],
+    SYNERGY_WEIGHTS["archetype_score"],
+    SYNERGY_WEIGHTS["combo_score"],
+    SYNERGY_WEIGHTS["keyword_score"],
+    SYNERGY_WEIGHTS["type_score"],
+    SYNERGY_WEIGHTS["color_score"],
+    SYNERGY_WEIGHTS["mana_curve_score"],
+    SYNERGY_WEIGHTS["format_score"],
+], dtype=np.float64)
+
+# Column order of the combo pattern flags
+MANA_GENERATION, UNTAP_EFFECTS, TUTORING, RECURSION = range(4)
+
+
+def padded_indices(matrix: np.ndarray) -> np.ndarray:
+    """
+    Convert an indicator matrix into per-row sorted column indices.
+
+    Args:
+        matrix: (N, V) indicator matrix
+
+    Returns:
+        (N, W) int32 array where W is the largest row count, padded with -1
+    """
+    present = matrix > 0
+    counts = present.sum(axis=1)
+    width = max(int(counts.max(initial=0)), 1)
+    indices = np.full((matrix.shape[0], width), -1, dtype=np.int32)
+
+    rows, cols = np.nonzero(present)
+    positions = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    indices[rows, positions] = cols
+    return indices
+
+
+@njit(cache=True)
+def _shared_weight(row1, row2, weights):
+    """Sum the weights of indices present in both sorted, -1 padded rows."""
+    total = 0.0
+    a = 0
+    b = 0
+    while a < row1.shape[0] and b < row2.shape[0]:
+        x = row1[a]
+        y = row2[b]
+        if x < 0 or y < 0:
+            break
+        if x == y:
+            total += weights[x]
+            a += 1
+            b += 1
+        elif x < y:
+            a += 1
+        else:
+            b += 1
+    return total
+
+
+@njit(cache=True)
+def _mentioned(row, mentions):
+    """Count indices in a -1 padded row that are flagged in mentions."""
+    count = 0
+    for k in range(row.shape[0]):
+        if row[k] < 0:
+            break
+        count += mentions[row[k]]
+    return count
+
+
+@njit(cache=True)
+def _popcount(value):
+    """Number of set bits in a non-negative integer."""
+    count = 0
+    while value:
+        value &= value - 1
+        count += 1
+    return count
+
+
+@njit(cache=True)
+def _score_pair(i, j, tribes, tribe_weights, tribe_mentions, keywords, keyword_weights,
+                complementary, archetypes, archetype_weights, combos, combo_weights,
+                combo_flags, card_types, card_type_weights, formats, format_weights,
+                colors, identity, cmc, intensity, component_weights):
+    """Total score of card i (as card1) paired with card j (as card2)."""
+    tribal = _shared_weight(tribes[i], tribes[j], tribe_weights)
+    tribal += 2.0 * _mentioned(tribes[i], tribe_mentions[j])
+    tribal += 2.0 * _mentioned(tribes[j], tribe_mentions[i])
+
+    archetype = _shared_weight(archetypes[i], archetypes[j], archetype_weights)
+
+    combo = _shared_weight(combos[i], combos[j], combo_weights)
+    if combo_flags[i, MANA_GENERATION] and combo_flags[j, UNTAP_EFFECTS]:
+        combo += 3.0
+    if combo_flags[i, TUTORING] and combo_flags[j, RECURSION]:
+        combo += 2.0
+
+    keyword = _shared_weight(keywords[i], keywords[j], keyword_weights)
+    for p in range(complementary.shape[1]):
+        if ((complementary[i, p, 0] and complementary[j, p, 1])
+                or (complementary[i, p, 1] and complementary[j, p, 0])):
+            keyword += 1.0
+
+    card_type = _shared_weight(card_types[i], card_types[j], card_type_weights)
+
+    color = 0.0
+    if colors[i] == colors[j] and colors[i] != 0:
+        color += 2.0
+    color += _popcount(colors[i] & colors[j])
+    if (identity[i] & ~identity[j]) == 0 or (identity[j] & ~identity[i]) == 0:
+        color += 1.0
+    if _popcount(colors[i]) > 1 and _popcount(colors[j]) > 1:
+        color += 1.0
+
+    mana_curve = 0.0
+    cmc_diff = abs(cmc[i] - cmc[j])
+    if cmc_diff == 1:
+        mana_curve += 1.0
+    elif cmc_diff == 2:
+        mana_curve += 0.5
+    if abs(intensity[i] - intensity[j]) < 0.3:
+        mana_curve += 0.5
+
+    format_score = _shared_weight(formats[i], formats[j], format_weights)
+
+    return (
+        tribal * component_weights[0]
+        + archetype * component_weights[1]
+        + combo * component_weights[2]
+        + keyword * component_weights[3]
+        + card_type * component_weights[4]
+        + color * component_weights[5]
+        + mana_curve * component_weights[6]
+        + format_score * component_weights[7]
+    )
+
+
+@njit(parallel=True, cache=True)
+def _score_upper_triangle(tribes, tribe_weights, tribe_mentions, keywords, keyword_weights,
+                          complementary, archetypes, archetype_weights, combos,
+                          combo_weights, combo_flags, card_types, card_type_weights,
+                          formats, format_weights, colors, identity, cmc, intensity,
+                          component_weights, masks, limits, threshold, row_start,
+                          row_end, out):
+    """
+    Fill out with the total score of every (i, j) pair with i < j, for rows
+    row_start .. row_end - 1.
+
+    Pairs that share no masked feature and whose score bound is below
+    threshold get that bound instead of their exact score.
+    """
+    n = cmc.shape[0]
+    first = row_start * (2 * n - row_start - 1) // 2
+    for i in prange(row_start, row_end):
+        # Offset of row i in the flattened band
+        base = i * (2 * n - i - 1) // 2 - first
+        for j in range(i + 1, n):
+            if (masks[i] & masks[j]) == 0:
+                bound = UNSHARED_SCORE_LIMIT + min(limits[i], limits[j])
+                if bound < threshold:
+                    out[base + j - i - 1] = bound
+                    continue
+
+            out[base + j - i - 1] = _score_pair(
+                i, j, tribes, tribe_weights, tribe_mentions, keywords, keyword_weights,
+                complementary, archetypes, archetype_weights, combos, combo_weights,
+                combo_flags, card_types, card_type_weights, formats, format_weights,
+                colors, identity, cmc, intensity, component_weights
+            )
+
+
+@njit(parallel=True, cache=True)
+def _score_pairs(tribes, tribe_weights, tribe_mentions, keywords, keyword_weights,
+                 complementary, archetypes, archetype_weights, combos, combo_weights,
+                 combo_flags, card_types, card_type_weights, formats, format_weights,
+                 colors, identity, cmc, intensity, component_weights, masks, limits,
+                 threshold, rows, cols, out):
+    """
+    Fill out[k] with the total score of the pair (rows[k], cols[k]).
+
+    The loop runs over the flat pair list rather than over rows, so threads
+    get equal shares of pairs however uneven the rows are. Pairs are
+    prefiltered against threshold like in _score_upper_triangle().
+    """
+    for k in prange(rows.shape[0]):
+        i = rows[k]
+        j = cols[k]
+        if (masks[i] & masks[j]) == 0:
+            bound = UNSHARED_SCORE_LIMIT + min(limits[i], limits[j])
+            if bound < threshold:
+                out[k] = bound
+                continue
+
+        out[k] = _score_pair(
+            i, j, tribes, tribe_weights, tribe_mentions, keywords, keyword_weights,
+            complementary, archetypes, archetype_weights, combos, combo_weights,
+            combo_flags, card_types, card_type_weights, formats, format_weights,
+            colors, identity, cmc, intensity, component_weights
+        )
+
+
+@njit(parallel=True, cache=True)
+def _score_tile(tribes, tribe_weights, tribe_mentions, keywords, keyword_weights,
+                complementary, archetypes, archetype_weights, combos, combo_weights,
+                combo_flags, card_types, card_type_weights, formats, format_weights,
+                colors, identity, cmc, intensity, component_weights, row_start, row_end,
+                col_start, col_end, out):
+    """Fill out with the total score of every ordered pair in a tile of rows and columns."""
+    for i in prange(row_start, row_end):
+        for j in range(col_start, col_end):
+            out[i - row_start, j - col_start] = _score_pair(
+                i, j, tribes, tribe_weights, tribe_mentions, keywords, keyword_weights,
+                complementary, archetypes, archetype_weights, combos, combo_weights,
+                combo_flags, card_types, card_type_weights, formats, format_weights,
+                colors, identity, cmc, intensity, component_weights
+            )
+
+
+def kernel_arrays(features: SynergyFeatures) -> Tuple[np.ndarray, ...]:
+    """
+    Convert encoded features into the flat typed arrays the kernels take.
+
+    Args:
+        features: Encoded card analyses from build_synergy_features()
+
+    Returns:
+        Tuple of arrays in _score_upper_triangle() argument order: the
+        _score_pair() arrays followed by the prefilter masks and limits
+    """
+    f = features
+    complementary = np.zeros((len(f), len(f.complementary_keywords), 2), dtype=np.uint8)
+    for p, (kw1, kw2) in enumerate(f.complementary_keywords):
+        complementary[:, p, 0] = kw1 > 0
+        complementary[:, p, 1] = kw2 > 0
+
+    combo_flags = np.stack(
+        [f.mana_generation, f.untap_effects, f.tutoring, f.recursion], axis=1
+    ).astype(np.uint8)
+
+    return (
+        padded_indices(f.tribes),
+        np.full(f.tribes.shape[1], 3.0),
+        (f.tribe_mentions > 0).astype(np.int64),
+        padded_indices(f.keywords),
+        f.keyword_weights,
+        complementary,
+        padded_indices(f.archetypes),
+        f.archetype_weights,
+        padded_indices(f.combos),
+        f.combo_weights,
+        combo_flags,
+        padded_indices(f.card_types),
+        f.card_type_weights,
+        padded_indices(f.formats),
+        f.format_weights,
+        color_bitmasks(f.colors),
+        color_bitmasks(f.color_identity),
+        f.cmc,
+        f.mana_intensity,
+        COMPONENT_WEIGHTS,
+        overlap_bitmasks(f),
+        unshared_score_limits(f),
+    )
+
+
+def score_upper_triangle(features: SynergyFeatures, min_score: Optional[float] = None,
+                         row_start: int = 0, row_end: Optional[int] = None,
+                         arrays: Optional[Tuple[np.ndarray, ...]] = None) -> np.ndarray:
+    """
+    Score the unordered card pairs (i, j) with i < j in a band of rows.
+
+    Args:
+        features: Encoded card analyses from build_synergy_features()
+        min_score: If given, pairs that provably score below it are skipped
+            early and reported with an upper bound below min_score
+        row_start: First row of the band
+        row_end: Row after the last row of the band (defaults to all rows)
+        arrays: Precomputed kernel_arrays(features), to reuse across bands
+
+    Returns:
+        Flat float64 array of total scores in np.triu_indices(N, k=1) order
+    """
+    n = len(features)
+    row_end = max(n - 1, 0) if row_end is None else min(row_end, max(n - 1, 0))
+    row_start = min(row_start, row_end)
+    band_size = (
+        row_end * (2 * n - row_end - 1) // 2 - row_start * (2 * n - row_start - 1) // 2
+    )
+    out = np.zeros(band_size, dtype=np.float64)
+    threshold = -np.inf if min_score is None else min_score
+    if band_size:
+        if arrays is None:
+            arrays = kernel_arrays(features)
+        _score_upper_triangle(*arrays, threshold, row_start, row_end, out)
+    return out
+
+
+def score_pairs(features: SynergyFeatures, rows: np.ndarray, cols: np.ndarray,
+                min_score: Optional[float] = None,
+                arrays: Optional[Tuple[np.ndarray, ...]] = None) -> np.ndarray:
+    """
+    Score an arbitrary list of card pairs, such as the pairs not yet stored.
+
+    Args:
+        features: Encoded card analyses from build_synergy_features()
+        rows: card1 row of each pair
+        cols: card2 row of each pair
+        min_score: If given, pairs that provably score below it are skipped
+            early and reported with an upper bound below min_score
+        arrays: Precomputed kernel_arrays(features), to reuse across calls
+
+    Returns:
+        Float64 array with the total score of each pair
+    """
+    out = np.zeros(len(rows), dtype=np.float64)
+    threshold = -np.inf if min_score is None else min_score
+    if len(rows):
+        if arrays is None:
+            arrays = kernel_arrays(features)
+        _score_pairs(*arrays, threshold, np.ascontiguousarray(rows, dtype=np.int64),
+                     np.ascontiguousarray(cols, dtype=np.int64), out)
+    return out
+
+
+def score_tile(features: SynergyFeatures, row_start: int, row_end: int, col_start: int,
+               col_end: int, arrays: Optional[Tuple[np.ndarray, ...]] = None) -> np.ndarray:
+    """
+    Score the ordered pairs in a tile of the score matrix with the compiled kernel.
+
+    Same result as the matching slice of synergy_matrix.score_matrix(),
+    computed pair by pair in parallel instead of with dense matrix products.
+
+    Args:
+        features: Encoded card analyses from build_synergy_features()
+        row_start: First card1 row of the tile
+        row_end: Row after the last card1 row
+        col_start: First card2 column of the tile
+        col_end: Column after the last card2 column
+        arrays: Precomputed kernel_arrays(features), to reuse across tiles
+
+    Returns:
+        (row_end - row_start, col_end - col_start) float64 array of total scores
+    """
+    out = np.zeros((row_end - row_start, col_end - col_start), dtype=np.float64)
+    if out.size:
+        if arrays is None:
+            arrays = kernel_arrays(features)
+        # Drop the prefilter masks and limits; every pair is scored exactly
+        _score_tile(*arrays[:-2], row_start, row_end, col_start, col_end, out)
+    return out
+
+
+def score_all_pairs(features: SynergyFeatures) -> np.ndarray:
+    """
+    Score every ordered pair of cards with the compiled kernel.
+
+    Args:
+        features: Encoded card analyses from build_synergy_features()
+
+    Returns:
+        (N, N) float64 array where [i, j] is card i scored as card1 against j
+    """
+    n = len(features)
+    return score_tile(features, 0, n, 0, n)
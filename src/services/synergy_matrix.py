@@ -0,0 +1,699 @@
+"""
+Vectorized synergy scoring for whole card collections.
+
+calculate_synergy_score() compares two card analyses at a time, which makes
+collection-wide scoring an interpreter-bound loop over N(N-1)/2 pairs. This
+module encodes every analysis once into NumPy indicator matrices (one row per
+card) and computes the total synergy score of every pair with matrix products.
+
+The totals reproduce calculate_synergy_score()["total_score"] for every
+component, including the directional tribal support and combo pattern terms,
+so they can be used to decide which pairs are worth storing. Callers still use
+calculate_synergy_score() for the pairs they keep to get the detailed
+breakdown and match list.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .text_analysis import (
+    ARCHETYPE_WEIGHTS,
+    COMBO_WEIGHTS,
+    COMPLEMENTARY_KEYWORD_PAIRS,
+    DEFAULT_ARCHETYPE_WEIGHT,
+    DEFAULT_COMBO_WEIGHT,
+    DEFAULT_FORMAT_WEIGHT,
+    FORMAT_WEIGHTS,
+    STRONG_KEYWORDS,
+    SYNERGY_WEIGHTS,
+)
+
+# Matrix products sum the same terms in a different order than the per-pair
+# functions, so totals can differ in the last few bits. Thresholds are applied
+# with this slack and survivors re-checked with calculate_synergy_score().
+SCORE_TOLERANCE = 1e-9
+
+# Most a pair can score without sharing any feature covered by
+# overlap_bitmasks(): compatible identity and both-multicolor color points plus
+# the mana curve terms. Shared formats are bounded per card separately.
+UNSHARED_SCORE_LIMIT = (
+    2.0 * SYNERGY_WEIGHTS["color_score"] + 1.5 * SYNERGY_WEIGHTS["mana_curve_score"]
+)
+
+# Bitmasks are stored as int64
+MAX_BITMASK_BITS = 63
+
+# Format scores come from a table of every legality-mask intersection when
+# there are at most this many distinct formats (a 2**16 entry table)
+MAX_TABLE_FORMATS = 16
+
+# Set bits in every byte value, for popcount without np.bitwise_count
+_BYTE_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+# Rows and columns per score tile in top_k_per_row(): a 256 x 256 float64
+# tile and its intermediates stay within a typical L2 cache
+TOP_K_BLOCK_SIZE = 256
+
+# Top-level analysis fields read by calculate_synergy_score()
+SYNERGY_FIELDS = (
+    "creature_types",
+    "keywords",
+    "scryfall_keywords",
+    "colors",
+    "color_identity",
+    "card_types",
+    "artifact_subtypes",
+    "enchantment_subtypes",
+    "legal_formats",
+)
+
+
+@dataclass
+class SynergyFeatures:
+    """Synergy-relevant fields of many card analyses as NumPy arrays."""
+
+    tribes: np.ndarray                 # (N, T) creature types of each card
+    tribe_mentions: np.ndarray         # (N, T) creature types named in each card's text
+    keywords: np.ndarray               # (N, K) keywords including Scryfall keywords
+    keyword_weights: np.ndarray        # (K,)
+    complementary_keywords: List[Tuple[np.ndarray, np.ndarray]]  # (N,) column pairs
+    archetypes: np.ndarray             # (N, A) archetype indicators
+    archetype_weights: np.ndarray      # (A,)
+    combos: np.ndarray                 # (N, C) combo potential indicators
+    combo_weights: np.ndarray          # (C,)
+    mana_generation: np.ndarray        # (N,)
+    untap_effects: np.ndarray          # (N,)
+    tutoring: np.ndarray               # (N,)
+    recursion: np.ndarray              # (N,)
+    card_types: np.ndarray             # (N, Y) card types and artifact/enchantment subtypes
+    card_type_weights: np.ndarray      # (Y,)
+    formats: np.ndarray                # (N, F) legal formats
+    format_weights: np.ndarray         # (F,)
+    colors: np.ndarray                 # (N, L) colors
+    color_identity: np.ndarray         # (N, L) color identity
+    cmc: np.ndarray                    # (N,)
+    mana_intensity: np.ndarray         # (N,)
+
+    def __len__(self) -> int:
+        return self.cmc.shape[0]
+
+    def take(self, indices: np.ndarray) -> "SynergyFeatures":
+        """
+        Select cards by row index, keeping the column layout and weights.
+
+        Args:
+            indices: Row indices to select (may repeat)
+
+        Returns:
+            SynergyFeatures with one row per index
+        """
+        return SynergyFeatures(
+            tribes=self.tribes[indices],
+            tribe_mentions=self.tribe_mentions[indices],
+            keywords=self.keywords[indices],
+            keyword_weights=self.keyword_weights,
+            complementary_keywords=[
+                (kw1[indices], kw2[indices]) for kw1, kw2 in self.complementary_keywords
+            ],
+            archetypes=self.archetypes[indices],
+            archetype_weights=self.archetype_weights,
+            combos=self.combos[indices],
+            combo_weights=self.combo_weights,
+            mana_generation=self.mana_generation[indices],
+            untap_effects=self.untap_effects[indices],
+            tutoring=self.tutoring[indices],
+            recursion=self.recursion[indices],
+            card_types=self.card_types[indices],
+            card_type_weights=self.card_type_weights,
+            formats=self.formats[indices],
+            format_weights=self.format_weights,
+            colors=self.colors[indices],
+            color_identity=self.color_identity[indices],
+            cmc=self.cmc[indices],
+            mana_intensity=self.mana_intensity[indices],
+        )
+
+
+def synergy_fingerprint(analysis: Dict[str, Any]) -> bytes:
+    """
+    Hash the parts of an analysis that calculate_synergy_score() reads.
+
+    Cards with equal fingerprints get identical synergy results against any
+    other card, so pair scores can be shared between them.
+
+    Args:
+        analysis: Card analysis as produced by analyze_card_text()
+
+    Returns:
+        8-byte digest
+    """
+    vectors = analysis.get("synergy_vectors", {})
+    curve = vectors.get("mana_curve", {})
+    relevant = {field: analysis.get(field) for field in SYNERGY_FIELDS}
+    relevant["text"] = " ".join(analysis.get("raw_tokens", [])).lower()
+    relevant["archetype"] = vectors.get("archetype")
+    relevant["combo_potential"] = vectors.get("combo_potential")
+    relevant["cmc"] = curve.get("cmc")
+    relevant["mana_intensiveness"] = curve.get("mana_intensiveness")
+
+    canonical = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).digest()
+
+
+def _one_hot(value_sets: Sequence[Iterable[Any]],
+             weight_of: Callable[[Any], float] = lambda value: 1.0
+             ) -> Tuple[np.ndarray, np.ndarray, Dict[Any, int]]:
+    """
+    Encode one set of values per card as an indicator matrix.
+
+    Args:
+        value_sets: Values present on each card
+        weight_of: Score contributed when a value is shared by two cards
+
+    Returns:
+        Tuple of (indicator matrix, per-column weights, value -> column index)
+    """
+    vocabulary: Dict[Any, int] = {}
+    for values in value_sets:
+        for value in values:
+            vocabulary.setdefault(value, len(vocabulary))
+
+    matrix = np.zeros((len(value_sets), len(vocabulary)), dtype=np.float64)
+    for row, values in enumerate(value_sets):
+        for value in values:
+            matrix[row, vocabulary[value]] = 1.0
+
+    weights = np.array([weight_of(value) for value in vocabulary], dtype=np.float64)
+    return matrix, weights, vocabulary
+
+
+def _column(matrix: np.ndarray, vocabulary: Dict[Any, int], value: Any) -> np.ndarray:
+    """Return the indicator column for a value, or zeros if no card has it."""
+    if value in vocabulary:
+        return matrix[:, vocabulary[value]].copy()
+    return np.zeros(matrix.shape[0], dtype=np.float64)
+
+
+def build_synergy_features(analyses: Sequence[Dict[str, Any]]) -> SynergyFeatures:
+    """
+    Encode card analyses into feature matrices for vectorized scoring.
+
+    Args:
+        analyses: Card analyses as produced by analyze_card_text()
+
+    Returns:
+        SynergyFeatures with one row per analysis, in input order
+    """
+    tribe_sets = [set(a.get("creature_types", [])) for a in analyses]
+    tribes, _, tribe_vocab = _one_hot(tribe_sets)
+
+    # Tribal support is a substring test against the other card's text
+    texts = [" ".join(a.get("raw_tokens", [])).lower() for a in analyses]
+    tribe_mentions = np.zeros_like(tribes)
+    for row, text in enumerate(texts):
+        for creature_type, col in tribe_vocab.items():
+            if creature_type in text:
+                tribe_mentions[row, col] = 1.0
+
+    keyword_sets = [
+        set(a.get("keywords", []) + a.get("scryfall_keywords", [])) for a in analyses
+    ]
+    keywords, keyword_weights, keyword_vocab = _one_hot(
+        keyword_sets, lambda kw: 2.0 if kw in STRONG_KEYWORDS else 1.0
+    )
+    complementary_keywords = [
+        (_column(keywords, keyword_vocab, kw1), _column(keywords, keyword_vocab, kw2))
+        for kw1, kw2 in COMPLEMENTARY_KEYWORD_PAIRS
+    ]
+
+    vectors = [a.get("synergy_vectors", {}) for a in analyses]
+    archetypes, archetype_weights, _ = _one_hot(
+        [set(v.get("archetype", [])) for v in vectors],
+        lambda archetype: ARCHETYPE_WEIGHTS.get(archetype, DEFAULT_ARCHETYPE_WEIGHT),
+    )
+    combos, combo_weights, combo_vocab = _one_hot(
+        [set(v.get("combo_potential", [])) for v in vectors],
+        lambda combo: COMBO_WEIGHTS.get(combo, DEFAULT_COMBO_WEIGHT),
+    )
+
+    # Card types and the two subtype families score independently
+    type_sets = [
+        {("type", t) for t in a.get("card_types", [])}
+        | {("artifact_subtype", t) for t in a.get("artifact_subtypes", [])}
+        | {("enchantment_subtype", t) for t in a.get("enchantment_subtypes", [])}
+        for a in analyses
+    ]
+    card_types, card_type_weights, _ = _one_hot(
+        type_sets, lambda key: 1.0 if key[0] == "type" else 2.0
+    )
+
+    formats, format_weights, _ = _one_hot(
+        [set(a.get("legal_formats", [])) for a in analyses],
+        lambda fmt: FORMAT_WEIGHTS.get(fmt, DEFAULT_FORMAT_WEIGHT),
+    )
+
+    # Colors and identity share one column layout so they can be compared
+    color_sets = [set(a.get("colors", [])) for a in analyses]
+    identity_sets = [set(a.get("color_identity", [])) for a in analyses]
+    all_colors, _, color_vocab = _one_hot(color_sets + identity_sets)
+    colors = all_colors[:len(analyses)]
+    color_identity = all_colors[len(analyses):]
+
+    curves = [v.get("mana_curve", {}) for v in vectors]
+
+    return SynergyFeatures(
+        tribes=tribes,
+        tribe_mentions=tribe_mentions,
+        keywords=keywords,
+        keyword_weights=keyword_weights,
+        complementary_keywords=complementary_keywords,
+        archetypes=archetypes,
+        archetype_weights=archetype_weights,
+        combos=combos,
+        combo_weights=combo_weights,
+        mana_generation=_column(combos, combo_vocab, "mana_generation"),
+        untap_effects=_column(combos, combo_vocab, "untap_effects"),
+        tutoring=_column(combos, combo_vocab, "tutoring"),
+        recursion=_column(combos, combo_vocab, "recursion"),
+        card_types=card_types,
+        card_type_weights=card_type_weights,
+        formats=formats,
+        format_weights=format_weights,
+        colors=colors,
+        color_identity=color_identity,
+        cmc=np.array([c.get("cmc", 0) or 0 for c in curves], dtype=np.float64),
+        mana_intensity=np.array(
+            [c.get("mana_intensiveness", 0) or 0 for c in curves], dtype=np.float64
+        ),
+    )
+
+
+def pack_bitmasks(matrix: np.ndarray) -> np.ndarray:
+    """
+    Pack a (N, V) indicator matrix into one int64 bitmask per row.
+
+    Raises:
+        ValueError: If there are more columns than bits available
+    """
+    if matrix.shape[1] > MAX_BITMASK_BITS:
+        raise ValueError(f"Cannot pack {matrix.shape[1]} values into a bitmask")
+    bits = np.left_shift(np.int64(1), np.arange(matrix.shape[1], dtype=np.int64))
+    return (matrix > 0).astype(np.int64) @ bits
+
+
+def color_bitmasks(matrix: np.ndarray) -> np.ndarray:
+    """Pack a (N, L) color indicator matrix into one int64 bitmask per card."""
+    return pack_bitmasks(matrix)
+
+
+def subset_weight_table(weights: np.ndarray) -> np.ndarray:
+    """
+    Weight sum of every subset of columns, indexed by the subset's bitmask.
+
+    Args:
+        weights: (V,) column weights
+
+    Returns:
+        (2**V,) float64 array
+    """
+    table = np.zeros(1 << len(weights), dtype=np.float64)
+    for bit, weight in enumerate(weights):
+        table[1 << bit:2 << bit] = table[:1 << bit] + weight
+    return table
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """Number of set bits in each element of a non-negative int64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    as_bytes = np.ascontiguousarray(values, dtype=np.int64).view(np.uint8)
+    return _BYTE_POPCOUNT[as_bytes].reshape(*np.shape(values), 8).sum(axis=-1)
+
+
+def _weighted_overlap(first: np.ndarray, second: np.ndarray,
+                      weights: np.ndarray) -> np.ndarray:
+    """Sum of weights of the values shared by each pair of cards."""
+    return (first * weights) @ second.T
+
+
+def score_matrix(features: SynergyFeatures) -> np.ndarray:
+    """
+    Compute the total synergy score for every ordered pair of cards.
+
+    Entry [i, j] equals calculate_synergy_score(analyses[i], analyses[j])
+    ["total_score"] up to SCORE_TOLERANCE. The matrix is not symmetric because
+    some combo patterns only score in one direction.
+
+    Args:
+        features: Encoded card analyses from build_synergy_features()
+
+    Returns:
+        (N, N) float64 array of total scores
+    """
+    return score_block(features, features)
+
+
+def score_block(first: SynergyFeatures, second: SynergyFeatures) -> np.ndarray:
+    """
+    Compute total synergy scores between two groups of cards.
+
+    Both groups must come from the same build_synergy_features() call (for
+    example via SynergyFeatures.take()) so their columns line up.
+
+    Args:
+        first: Cards passed as card1 to calculate_synergy_score()
+        second: Cards passed as card2 to calculate_synergy_score()
+
+    Returns:
+        (len(first), len(second)) float64 array of total scores
+    """
+    a, b = first, second
+
+    # Tribal: shared types, plus each card's types mentioned by the other card
+    tribal = (
+        3.0 * (a.tribes @ b.tribes.T)
+        + 2.0 * (a.tribes @ b.tribe_mentions.T + a.tribe_mentions @ b.tribes.T)
+    )
+
+    # Color: exact match, shared colors, compatible identity, both multicolor,
+    # all on per-card bitmasks with AND and popcount
+    colors_a = color_bitmasks(a.colors)[:, None]
+    colors_b = color_bitmasks(b.colors)[None, :]
+    identity_a = color_bitmasks(a.color_identity)[:, None]
+    identity_b = color_bitmasks(b.color_identity)[None, :]
+    exact_colors = (colors_a == colors_b) & (colors_a != 0)
+    compatible_identity = ((identity_a & ~identity_b) == 0) | ((identity_b & ~identity_a) == 0)
+    multicolor = (popcount(colors_a) > 1) & (popcount(colors_b) > 1)
+    color = (
+        2.0 * exact_colors + popcount(colors_a & colors_b) + compatible_identity + multicolor
+    )
+
+    keyword = _weighted_overlap(a.keywords, b.keywords, a.keyword_weights)
+    for (kw1_a, kw2_a), (kw1_b, kw2_b) in zip(a.complementary_keywords,
+                                              b.complementary_keywords):
+        keyword += (np.outer(kw1_a, kw2_b) + np.outer(kw2_a, kw1_b)) > 0
+
+    archetype = _weighted_overlap(a.archetypes, b.archetypes, a.archetype_weights)
+
+    combo = (
+        _weighted_overlap(a.combos, b.combos, a.combo_weights)
+        + 3.0 * np.outer(a.mana_generation, b.untap_effects)
+        + 2.0 * np.outer(a.tutoring, b.recursion)
+    )
+
+    card_type = _weighted_overlap(a.card_types, b.card_types, a.card_type_weights)
+
+    cmc_diff = np.abs(a.cmc[:, None] - b.cmc[None, :])
+    intensity_diff = np.abs(a.mana_intensity[:, None] - b.mana_intensity[None, :])
+    mana_curve = (
+        np.where(cmc_diff == 1, 1.0, np.where(cmc_diff == 2, 0.5, 0.0))
+        + 0.5 * (intensity_diff < 0.3)
+    )
+
+    # Format: weight of the shared legal formats, looked up by legality bitmask
+    if a.formats.shape[1] <= MAX_TABLE_FORMATS:
+        legal_a = pack_bitmasks(a.formats)[:, None]
+        legal_b = pack_bitmasks(b.formats)[None, :]
+        format_score = subset_weight_table(a.format_weights)[legal_a & legal_b]
+    else:
+        format_score = _weighted_overlap(a.formats, b.formats, a.format_weights)
+
+    return (
+        tribal * SYNERGY_WEIGHTS["tribal_score"]
+        + archetype * SYNERGY_WEIGHTS["archetype_score"]
+        + combo * SYNERGY_WEIGHTS["combo_score"]
+        + keyword * SYNERGY_WEIGHTS["keyword_score"]
+        + card_type * SYNERGY_WEIGHTS["type_score"]
+        + color * SYNERGY_WEIGHTS["color_score"]
+        + mana_curve * SYNERGY_WEIGHTS["mana_curve_score"]
+        + format_score * SYNERGY_WEIGHTS["format_score"]
+    )
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, highest first.
+
+    Selects with np.partition in linear time and only sorts the k winners.
+    Ties are broken by lower index, giving the same order as a stable
+    descending sort of the whole array.
+
+    Args:
+        scores: 1-D array of scores
+        k: Number of indices to return
+
+    Returns:
+        Array of at most k indices into scores
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.intp)
+    if k < n:
+        kth = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - len(above)]
+        indices = np.concatenate([above, ties])
+    else:
+        indices = np.arange(n)
+    return indices[np.lexsort((indices, -scores[indices]))]
+
+
+def top_k_per_row(features: SynergyFeatures, k: int, min_score: float,
+                  groups: Optional[np.ndarray] = None, block_size: int = TOP_K_BLOCK_SIZE,
+                  score_tile: Optional[Callable[[int, int, int, int], np.ndarray]] = None
+                  ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find each card's k best partners without building the full score matrix.
+
+    Scores are computed one block_size x block_size tile at a time and merged
+    into running per-row top-k buffers, so memory stays O(N * k) plus one tile.
+    Ties are broken by lower partner index, as in top_k_indices().
+
+    Args:
+        features: Encoded card analyses from build_synergy_features()
+        k: Number of partners to keep per card
+        min_score: Partners must score at least this (within SCORE_TOLERANCE)
+        groups: Per-card labels; cards with equal labels are never partners
+            (defaults to excluding only the card itself)
+        block_size: Rows and columns per tile
+        score_tile: Callable (row_start, row_end, col_start, col_end) returning
+            that tile of the score matrix (defaults to score_block())
+
+    Returns:
+        Tuple of (partner count of each card, (N, k) partner indices padded
+        with -1, (N, k) partner scores padded with -inf)
+    """
+    n = len(features)
+    if groups is None:
+        groups = np.arange(n)
+    if score_tile is None:
+        def score_tile(row_start: int, row_end: int, col_start: int, col_end: int) -> np.ndarray:
+            return score_block(features.take(slice(row_start, row_end)),
+                               features.take(slice(col_start, col_end)))
+
+    counts = np.zeros(n, dtype=np.int64)
+    best_indices = np.full((n, k), -1, dtype=np.intp)
+    best_scores = np.full((n, k), -np.inf)
+    for row_start in range(0, n, block_size):
+        row_end = min(row_start + block_size, n)
+        for col_start in range(0, n, block_size):
+            col_end = min(col_start + block_size, n)
+            tile = score_tile(row_start, row_end, col_start, col_end)
+            keep = (
+                (tile >= min_score - SCORE_TOLERANCE)
+                & (groups[row_start:row_end, None] != groups[None, col_start:col_end])
+            )
+            counts[row_start:row_end] += keep.sum(axis=1)
+            if k <= 0 or not keep.any():
+                continue
+
+            # Merge the tile into the running buffers, best score then lowest index first
+            candidate_scores = np.concatenate(
+                [best_scores[row_start:row_end], np.where(keep, tile, -np.inf)], axis=1
+            )
+            candidate_indices = np.concatenate([
+                best_indices[row_start:row_end],
+                np.broadcast_to(np.arange(col_start, col_end), tile.shape)
+            ], axis=1)
+            order = np.lexsort((candidate_indices, -candidate_scores), axis=-1)[:, :k]
+            best_scores[row_start:row_end] = np.take_along_axis(candidate_scores, order, axis=1)
+            best_indices[row_start:row_end] = np.take_along_axis(candidate_indices, order, axis=1)
+
+    best_indices[np.isneginf(best_scores)] = -1
+    return counts, best_indices, best_scores
+
+
+def upper_triangle_bands(n: int, pairs_per_band: int) -> Iterator[Tuple[int, int]]:
+    """
+    Split the rows of an n x n upper triangle into bands of similar pair counts.
+
+    Args:
+        n: Number of cards
+        pairs_per_band: Target number of (i, j) pairs with i < j per band
+
+    Yields:
+        (start, end) row ranges covering rows 0 .. n - 2
+    """
+    start = 0
+    while start < n - 1:
+        end, pairs = start, 0
+        while end < n - 1 and (pairs == 0 or pairs + (n - 1 - end) <= pairs_per_band):
+            pairs += n - 1 - end
+            end += 1
+        yield start, end
+        start = end
+
+
+def band_pairs(n: int, start: int, end: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Index arrays of the upper-triangle pairs in rows start .. end - 1.
+
+    The pairs are in the same order as np.triu_indices(n, k=1).
+
+    Returns:
+        Tuple of (row indices, column indices)
+    """
+    band_rows = np.arange(start, end)
+    lengths = n - 1 - band_rows
+    rows = np.repeat(band_rows, lengths)
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    cols = np.arange(len(rows)) - offsets + rows + 1
+    return rows, cols
+
+
+def overlap_bitmasks(features: SynergyFeatures) -> np.ndarray:
+    """
+    Pack every card's scoring features into a 64-bit overlap mask.
+
+    Each feature value (and each cross-card pattern, such as a tribe one card
+    has and the other mentions) maps to one bit, so two cards whose masks do
+    not intersect share nothing that scores beyond UNSHARED_SCORE_LIMIT plus
+    their common formats. Bits are shared between values when there are more
+    than 64, which only makes the test more conservative.
+
+    Args:
+        features: Encoded card analyses from build_synergy_features()
+
+    Returns:
+        (N,) uint64 array of masks
+    """
+    f = features
+    columns = [
+        f.tribes + f.tribe_mentions,
+        f.keywords,
+        np.stack([kw for pair in f.complementary_keywords for kw in pair], axis=1)
+        if f.complementary_keywords else np.zeros((len(f), 0)),
+        f.archetypes,
+        f.combos,
+        np.stack([f.mana_generation + f.untap_effects, f.tutoring + f.recursion], axis=1),
+        f.card_types,
+        f.colors,
+    ]
+    # Complementary keyword pairs share one bit per pair
+    pair_bits = np.repeat(np.arange(len(f.complementary_keywords)), 2)
+
+    masks = np.zeros(len(f), dtype=np.uint64)
+    offset = 0
+    for index, matrix in enumerate(columns):
+        width = matrix.shape[1]
+        positions = pair_bits if index == 2 else np.arange(width)
+        bits = np.left_shift(np.uint64(1), ((offset + positions) % 64).astype(np.uint64))
+        present = matrix > 0
+        for col in range(width):
+            masks[present[:, col]] |= bits[col]
+        offset += int(positions.max(initial=-1)) + 1
+    return masks
+
+
+def unshared_score_limits(features: SynergyFeatures) -> np.ndarray:
+    """
+    Per-card cap on the weighted format score a pair can contribute.
+
+    A pair (i, j) whose overlap masks do not intersect scores at most
+    UNSHARED_SCORE_LIMIT + min(limits[i], limits[j]).
+
+    Args:
+        features: Encoded card analyses from build_synergy_features()
+
+    Returns:
+        (N,) float64 array
+    """
+    return (features.formats @ features.format_weights) * SYNERGY_WEIGHTS["format_score"]
+
+
+def feature_cache_key(*collection_state: Any) -> str:
+    """
+    Digest identifying features built from a collection state.
+
+    The scoring weights are part of the key, since build_synergy_features()
+    stores them in the feature set.
+
+    Args:
+        *collection_state: JSON-serializable values that change whenever the
+            encoded analyses change (e.g. card count, highest ID, last update)
+
+    Returns:
+        Hex SHA-1 digest
+    """
+    payload = json.dumps([
+        list(collection_state),
+        SYNERGY_WEIGHTS,
+        ARCHETYPE_WEIGHTS,
+        COMBO_WEIGHTS,
+        FORMAT_WEIGHTS,
+        STRONG_KEYWORDS,
+        COMPLEMENTARY_KEYWORD_PAIRS,
+        [DEFAULT_ARCHETYPE_WEIGHT, DEFAULT_COMBO_WEIGHT, DEFAULT_FORMAT_WEIGHT],
+    ], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def save_synergy_features(path: str, features: SynergyFeatures, **extra: np.ndarray) -> None:
+    """
+    Write encoded features, plus any extra arrays, to an uncompressed .npz file.
+
+    Args:
+        path: Destination file path
+        features: Encoded card analyses from build_synergy_features()
+        **extra: Additional arrays stored alongside the features
+    """
+    arrays = {
+        field.name: getattr(features, field.name)
+        for field in fields(SynergyFeatures) if field.name != "complementary_keywords"
+    }
+    # (P, 2, N) stack of the complementary keyword column pairs
+    arrays["complementary_keywords"] = np.array(
+        [np.stack(pair) for pair in features.complementary_keywords]
+    ).reshape(len(features.complementary_keywords), 2, len(features))
+    np.savez(path, **arrays, **extra)
+
+
+def load_synergy_features(path: str) -> Optional[Tuple[SynergyFeatures, Dict[str, np.ndarray]]]:
+    """
+    Read features written by save_synergy_features().
+
+    Args:
+        path: Source file path
+
+    Returns:
+        Tuple of (features, extra arrays), or None if the file is missing or
+        does not hold a complete feature set
+    """
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+    except (OSError, ValueError):
+        return None
+
+    names = [field.name for field in fields(SynergyFeatures)]
+    if any(name not in arrays for name in names):
+        return None
+
+    values = {name: arrays.pop(name) for name in names}
+    values["complementary_keywords"] = [
+        (pair[0], pair[1]) for pair in values["complementary_keywords"]
+    ]
+    return SynergyFeatures(**values), arrays
@@ -4,10 +4,12 @@ Text analysis service for Magic: The Gathering card oracle text.
 This module provides functionality to extract keywords, abilities, and other
 relevant information from card oracle text using NLP techniques.
 """
+import heapq
 import re
 import logging
-from typing import Dict, List, Set, Any
+from typing import Dict, List, Optional, Set, Any
 
+import numpy as np
 import spacy
 from spacy.tokens import Doc
 from spacy.language import Language
@@ -170,6 +172,74 @@ ALL_MTG_KEYWORDS = set()
 for category in MTG_KEYWORDS.values():
     ALL_MTG_KEYWORDS.update(category)
 
+# Each category's keywords deduplicated and sorted once, so extraction is a
+# single substring test per keyword that already yields sorted results
+CATEGORY_KEYWORDS = {
+    category: tuple(sorted(set(keywords))) for category, keywords in MTG_KEYWORDS.items()
+}
+
+# Weights applied to each synergy component when computing the total score
+SYNERGY_WEIGHTS = {
+    "tribal_score": 5.0,      # Tribal is very important
+    "archetype_score": 4.0,   # Archetype synergies are crucial
+    "combo_score": 4.0,       # Combo potential is highly valued
+    "keyword_score": 3.0,     # Keywords are important
+    "type_score": 2.0,        # Type synergies matter
+    "color_score": 1.5,       # Color compatibility
+    "mana_curve_score": 1.0,  # Mana curve fit
+    "format_score": 0.5       # Format legality is minor
+}
+
+# Keywords that score double when shared
+STRONG_KEYWORDS = ["flying", "deathtouch", "lifelink", "vigilance", "trample"]
+
+# Keyword pairs that complement each other across two cards
+COMPLEMENTARY_KEYWORD_PAIRS = [
+    ("flying", "reach"),
+    ("first strike", "deathtouch"),
+    ("lifelink", "vigilance"),
+    ("haste", "trample")
+]
+
+# Different archetypes have different synergy strengths
+ARCHETYPE_WEIGHTS = {
+    "graveyard": 4,
+    "artifacts": 3,
+    "spells": 3,
+    "tokens": 3,
+    "tribal": 4,
+    "combo": 5,
+    "aggro": 2,
+    "control": 2
+}
+DEFAULT_ARCHETYPE_WEIGHT = 2
+
+# High-value combo synergies
+COMBO_WEIGHTS = {
+    "infinite_mana": 5,
+    "infinite_tokens": 5,
+    "storm": 4,
+    "tutoring": 3,
+    "recursion": 3,
+    "copy_effects": 3,
+    "untap_effects": 2,
+    "card_draw": 2,
+    "mana_generation": 2
+}
+DEFAULT_COMBO_WEIGHT = 1
+
+# Weight formats by popularity/importance
+FORMAT_WEIGHTS = {
+    "commander": 1.0,
+    "modern": 0.8,
+    "pioneer": 0.7,
+    "standard": 0.9,
+    "legacy": 0.6,
+    "vintage": 0.5,
+    "pauper": 0.4
+}
+DEFAULT_FORMAT_WEIGHT = 0.2
+
 def analyze_card_text(oracle_text: str, card_data: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Analyze card oracle text and card data to extract comprehensive information for synergy detection.
@@ -199,14 +269,15 @@ def analyze_card_text(oracle_text: str, card_data: Dict[str, Any] = None) -> Dic
 
     # Process the text with spaCy if available
     doc = nlp(oracle_text) if oracle_text and nlp else None
+    text_lower = doc.text.lower() if doc else ""
 
     # Extract information from oracle text
     text_analysis = {
-        "keywords": extract_mtg_keywords(doc, "abilities") if doc else [],
-        "actions": extract_mtg_keywords(doc, "actions") if doc else [],
-        "zones": extract_mtg_keywords(doc, "zones") if doc else [],
-        "mana_references": extract_mtg_keywords(doc, "mana_symbols") if doc else [],
-        "counters": extract_mtg_keywords(doc, "counters") if doc else [],
+        "keywords": extract_mtg_keywords(doc, "abilities", text_lower) if doc else [],
+        "actions": extract_mtg_keywords(doc, "actions", text_lower) if doc else [],
+        "zones": extract_mtg_keywords(doc, "zones", text_lower) if doc else [],
+        "mana_references": extract_mtg_keywords(doc, "mana_symbols", text_lower) if doc else [],
+        "counters": extract_mtg_keywords(doc, "counters", text_lower) if doc else [],
         "noun_phrases": extract_noun_phrases(doc) if doc else [],
         "named_entities": extract_named_entities(doc) if doc else [],
         "raw_tokens": [token.text for token in doc if not token.is_punct and not token.is_space] if doc else []
@@ -243,31 +314,25 @@ def _empty_analysis_result() -> Dict[str, Any]:
         "raw_tokens": []
     }
 
-def extract_mtg_keywords(doc: Doc, category: str) -> List[str]:
+def extract_mtg_keywords(doc: Doc, category: str, text_lower: Optional[str] = None) -> List[str]:
     """
     Extract MTG keywords of a specific category from the document.
 
+    A keyword matching a whole token is also a substring of the text, so one
+    pass of substring tests over the lowered text finds every match.
+
     Args:
         doc: spaCy Doc object
         category: Category of keywords to extract from MTG_KEYWORDS
+        text_lower: doc.text lowercased, when the caller already has it
 
     Returns:
         List of found keywords in the text
     """
-    keywords = set()
-    text_lower = doc.text.lower()
+    if text_lower is None:
+        text_lower = doc.text.lower()
 
-    # Direct lookup for multi-word keywords
-    for keyword in MTG_KEYWORDS.get(category, []):
-        if keyword in text_lower:
-            keywords.add(keyword)
-
-    # Token-based lookup for single-word keywords
-    for token in doc:
-        if token.text.lower() in MTG_KEYWORDS.get(category, []):
-            keywords.add(token.text.lower())
-
-    return sorted(list(keywords))
+    return [keyword for keyword in CATEGORY_KEYWORDS.get(category, ()) if keyword in text_lower]
 
 def extract_noun_phrases(doc: Doc) -> List[str]:
     """
@@ -359,14 +424,14 @@ def calculate_synergy_score(card1_analysis: Dict[str, Any], card2_analysis: Dict
 
     # Calculate weighted total score
     synergy_breakdown["total_score"] = (
-        synergy_breakdown["tribal_score"] * 5.0 +      # Tribal is very important
-        synergy_breakdown["archetype_score"] * 4.0 +   # Archetype synergies are crucial
-        synergy_breakdown["combo_score"] * 4.0 +       # Combo potential is highly valued
-        synergy_breakdown["keyword_score"] * 3.0 +     # Keywords are important
-        synergy_breakdown["type_score"] * 2.0 +        # Type synergies matter
-        synergy_breakdown["color_score"] * 1.5 +       # Color compatibility
-        synergy_breakdown["mana_curve_score"] * 1.0 +  # Mana curve fit
-        synergy_breakdown["format_score"] * 0.5        # Format legality is minor
+        synergy_breakdown["tribal_score"] * SYNERGY_WEIGHTS["tribal_score"] +
+        synergy_breakdown["archetype_score"] * SYNERGY_WEIGHTS["archetype_score"] +
+        synergy_breakdown["combo_score"] * SYNERGY_WEIGHTS["combo_score"] +
+        synergy_breakdown["keyword_score"] * SYNERGY_WEIGHTS["keyword_score"] +
+        synergy_breakdown["type_score"] * SYNERGY_WEIGHTS["type_score"] +
+        synergy_breakdown["color_score"] * SYNERGY_WEIGHTS["color_score"] +
+        synergy_breakdown["mana_curve_score"] * SYNERGY_WEIGHTS["mana_curve_score"] +
+        synergy_breakdown["format_score"] * SYNERGY_WEIGHTS["format_score"]
     )
 
     return synergy_breakdown
@@ -446,21 +511,14 @@ def calculate_keyword_synergy(card1: Dict[str, Any], card2: Dict[str, Any]) -> D
 
     for keyword in shared_keywords:
         # Some keywords are more synergistic than others
-        if keyword in ["flying", "deathtouch", "lifelink", "vigilance", "trample"]:
+        if keyword in STRONG_KEYWORDS:
             result["score"] += 2
         else:
             result["score"] += 1
         result["matches"].append(f"keyword:{keyword}")
 
     # Check if cards have complementary keywords
-    complementary_pairs = [
-        ("flying", "reach"),
-        ("first strike", "deathtouch"),
-        ("lifelink", "vigilance"),
-        ("haste", "trample")
-    ]
-
-    for kw1, kw2 in complementary_pairs:
+    for kw1, kw2 in COMPLEMENTARY_KEYWORD_PAIRS:
         if (kw1 in keywords1 and kw2 in keywords2) or (kw2 in keywords1 and kw1 in keywords2):
             result["score"] += 1
             result["matches"].append(f"complementary:{kw1}+{kw2}")
@@ -480,18 +538,7 @@ def calculate_archetype_synergy(card1: Dict[str, Any], card2: Dict[str, Any]) ->
     shared_archetypes = archetypes1.intersection(archetypes2)
 
     for archetype in shared_archetypes:
-        # Different archetypes have different synergy strengths
-        archetype_weights = {
-            "graveyard": 4,
-            "artifacts": 3,
-            "spells": 3,
-            "tokens": 3,
-            "tribal": 4,
-            "combo": 5,
-            "aggro": 2,
-            "control": 2
-        }
-        weight = archetype_weights.get(archetype, 2)
+        weight = ARCHETYPE_WEIGHTS.get(archetype, DEFAULT_ARCHETYPE_WEIGHT)
         result["score"] += weight
         result["matches"].append(f"archetype:{archetype}")
 
@@ -510,19 +557,7 @@ def calculate_combo_synergy(card1: Dict[str, Any], card2: Dict[str, Any]) -> Dic
     shared_combo = combo1.intersection(combo2)
 
     for combo_type in shared_combo:
-        # High-value combo synergies
-        combo_weights = {
-            "infinite_mana": 5,
-            "infinite_tokens": 5,
-            "storm": 4,
-            "tutoring": 3,
-            "recursion": 3,
-            "copy_effects": 3,
-            "untap_effects": 2,
-            "card_draw": 2,
-            "mana_generation": 2
-        }
-        weight = combo_weights.get(combo_type, 1)
+        weight = COMBO_WEIGHTS.get(combo_type, DEFAULT_COMBO_WEIGHT)
         result["score"] += weight
         result["matches"].append(f"combo:{combo_type}")
 
@@ -611,26 +646,15 @@ def calculate_format_synergy(card1: Dict[str, Any], card2: Dict[str, Any]) -> Di
 
     shared_formats = formats1.intersection(formats2)
 
-    # Weight formats by popularity/importance
-    format_weights = {
-        "commander": 1.0,
-        "modern": 0.8,
-        "pioneer": 0.7,
-        "standard": 0.9,
-        "legacy": 0.6,
-        "vintage": 0.5,
-        "pauper": 0.4
-    }
-
     for fmt in shared_formats:
-        weight = format_weights.get(fmt, 0.2)
+        weight = FORMAT_WEIGHTS.get(fmt, DEFAULT_FORMAT_WEIGHT)
         result["score"] += weight
         result["matches"].append(f"format:{fmt}")
 
     return result
 
 def find_synergy_candidates(card_analysis: Dict[str, Any], collection_analyses: List[Dict[str, Any]],
-                          threshold: float = 5.0) -> List[Dict[str, Any]]:
+                          threshold: float = 5.0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Find potential synergies between a card and a collection using comprehensive analysis.
 
@@ -638,11 +662,17 @@ def find_synergy_candidates(card_analysis: Dict[str, Any], collection_analyses:
         card_analysis: Analysis data for the target card
         collection_analyses: List of analysis data for cards in the collection
         threshold: Minimum synergy score to consider a match
+        limit: Keep only this many of the best matches, selected with a
+            bounded heap instead of sorting every match
 
     Returns:
         List of synergy matches sorted by score
     """
+    # Imported here: synergy_matrix builds on this module's weights
+    from .synergy_matrix import SCORE_TOLERANCE, build_synergy_features, score_block
+
     synergies = []
+    others = []
 
     for other_card in collection_analyses:
         # Skip self-comparison - check both the analysis and parent card data
@@ -664,6 +694,20 @@ def find_synergy_candidates(card_analysis: Dict[str, Any], collection_analyses:
             card_analysis.get("id") == other_card.get("id")):
             continue
 
+        others.append(other_card)
+
+    if not others:
+        return synergies
+
+    # Score every pair at once on encoded feature arrays; only cards that can
+    # reach the threshold need the full per-pair breakdown
+    features = build_synergy_features([card_analysis] + others)
+    totals = score_block(features.take(np.array([0])), features.take(np.arange(1, len(features))))[0]
+
+    for other_card, total in zip(others, totals.tolist()):
+        if total < threshold - SCORE_TOLERANCE:
+            continue
+
         synergy_result = calculate_synergy_score(card_analysis, other_card)
 
         if synergy_result["total_score"] >= threshold:
@@ -673,7 +717,9 @@ def find_synergy_candidates(card_analysis: Dict[str, Any], collection_analyses:
                 "score": synergy_result["total_score"]
             })
 
-    # Sort by synergy score (highest first)
+    # Sort by synergy score (highest first); nlargest keeps the same order for ties
+    if limit is not None:
+        return heapq.nlargest(limit, synergies, key=lambda x: x["score"])
     synergies.sort(key=lambda x: x["score"], reverse=True)
 
     return synergies
@@ -796,6 +842,9 @@ def parse_type_line(type_line: str) -> Dict[str, Any]:
 
     return result
 
+# Mana symbols such as {2}, {W} or {G/P}, compiled once for every card parsed
+MANA_SYMBOL_PATTERN = re.compile(r'\{([^}]+)\}')
+
 def parse_mana_cost(mana_cost: str) -> Dict[str, Any]:
     """
     Parse mana cost string to extract detailed mana information.
@@ -827,7 +876,7 @@ def parse_mana_cost(mana_cost: str) -> Dict[str, Any]:
     }
 
     # Find all mana symbols in braces
-    symbols = re.findall(r'\{([^}]+)\}', mana_cost)
+    symbols = MANA_SYMBOL_PATTERN.findall(mana_cost)
 
     for symbol in symbols:
         result["total_symbols"] += 1
@@ -961,6 +1010,17 @@ def generate_synergy_vectors(analysis: Dict[str, Any]) -> Dict[str, Any]:
 
     return vectors
 
+# Indicator tables for archetype and combo detection, built once at import
+# rather than as literal lists on every card
+GRAVEYARD_ACTIONS = frozenset(["mill", "dredge", "reanimate"])
+AGGRO_KEYWORDS = frozenset(["haste", "trample", "double strike", "first strike"])
+CONTROL_ACTIONS = frozenset(["counter", "destroy", "exile"])
+SPELL_KEYWORDS = frozenset(["prowess", "storm"])
+RECURSION_ACTIONS = frozenset(["return", "recur"])
+TOKEN_WORDS = ("token", "populate", "create")
+MANA_WORDS = ("add", "mana", "untap")
+DRAW_WORDS = ("draw", "card")
+
 def detect_archetype_indicators(analysis: Dict[str, Any]) -> List[str]:
     """
     Detect archetype indicators from card analysis.
@@ -979,15 +1039,15 @@ def detect_archetype_indicators(analysis: Dict[str, Any]) -> List[str]:
     oracle_text = " ".join(analysis.get("raw_tokens", [])).lower()
 
     # Graveyard-based archetypes
-    if any(zone in ["graveyard"] for zone in zones) or any(action in ["mill", "dredge", "reanimate"] for action in actions):
+    if "graveyard" in zones or not GRAVEYARD_ACTIONS.isdisjoint(actions):
         archetypes.append("graveyard")
 
     # Aggressive archetypes
-    if any(keyword in ["haste", "trample", "double strike", "first strike"] for keyword in keywords):
+    if not AGGRO_KEYWORDS.isdisjoint(keywords):
         archetypes.append("aggro")
 
     # Control archetypes
-    if any(action in ["counter", "destroy", "exile"] for action in actions):
+    if not CONTROL_ACTIONS.isdisjoint(actions):
         archetypes.append("control")
 
     # Artifact-based archetypes
@@ -999,11 +1059,11 @@ def detect_archetype_indicators(analysis: Dict[str, Any]) -> List[str]:
         archetypes.append("enchantments")
 
     # Spellslinger archetypes
-    if any(keyword in ["prowess", "storm"] for keyword in keywords) or "instant" in oracle_text or "sorcery" in oracle_text:
+    if not SPELL_KEYWORDS.isdisjoint(keywords) or "instant" in oracle_text or "sorcery" in oracle_text:
         archetypes.append("spells")
 
     # Token strategies
-    if any(word in oracle_text for word in ["token", "populate", "create"]):
+    if any(word in oracle_text for word in TOKEN_WORDS):
         archetypes.append("tokens")
 
     # Lifegain strategies
@@ -1037,7 +1097,7 @@ def detect_combo_potential(analysis: Dict[str, Any]) -> List[str]:
     oracle_text = " ".join(analysis.get("raw_tokens", [])).lower()
 
     # Infinite mana potential
-    if any(word in oracle_text for word in ["add", "mana", "untap"]):
+    if any(word in oracle_text for word in MANA_WORDS):
         combo_indicators.append("mana_generation")
 
     # Tutoring effects
@@ -1045,11 +1105,11 @@ def detect_combo_potential(analysis: Dict[str, Any]) -> List[str]:
         combo_indicators.append("tutoring")
 
     # Card draw engines
-    if "draw" in actions or any(word in oracle_text for word in ["draw", "card"]):
+    if "draw" in actions or any(word in oracle_text for word in DRAW_WORDS):
         combo_indicators.append("card_draw")
 
     # Recursion
-    if any(action in ["return", "recur"] for action in actions):
+    if not RECURSION_ACTIONS.isdisjoint(actions):
         combo_indicators.append("recursion")
 
     # Untap effects
@@ -1065,7 +1125,7 @@ def detect_combo_potential(analysis: Dict[str, Any]) -> List[str]:
         combo_indicators.append("storm")
 
     # Infinite token potential
-    if any(word in oracle_text for word in ["token", "populate", "create"]) and "untap" in actions:
+    if any(word in oracle_text for word in TOKEN_WORDS) and "untap" in actions:
         combo_indicators.append("infinite_tokens")
 
     return combo_indicators
@@ -1,7 +1,7 @@
 """
 Store module for CardInfo model operations.
 """
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 import logging
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -10,6 +10,9 @@ from ..models.card_info import CardInfo
 
 logger = logging.getLogger(__name__)
 
+# Names per IN (...) lookup, well under SQLite's bound parameter limit
+NAME_LOOKUP_CHUNK_SIZE = 500
+
 def get_or_create_card_info(name: str) -> Tuple[CardInfo, bool]:
     """
     Get an existing CardInfo by name or create a new one if it doesn't exist.
@@ -40,6 +43,49 @@ def get_or_create_card_info(name: str) -> Tuple[CardInfo, bool]:
         logger.error(f"Error creating CardInfo: {str(e)}")
         raise e
 
+def get_or_create_card_info_ids(names: Iterable[str]) -> Dict[str, int]:
+    """
+    Get the CardInfo ID of every name, creating the missing cards in one insert.
+
+    Existing cards are looked up with chunked IN queries and the missing ones
+    are added with a single executemany, instead of a query and a commit per
+    name as with get_or_create_card_info().
+
+    Args:
+        names: Card names, possibly with repeats
+
+    Returns:
+        Dictionary mapping each distinct name to its CardInfo ID
+    """
+    unique_names = list(dict.fromkeys(names))
+
+    def lookup(chunk_names: List[str]) -> Dict[str, int]:
+        ids: Dict[str, int] = {}
+        for start in range(0, len(chunk_names), NAME_LOOKUP_CHUNK_SIZE):
+            chunk = chunk_names[start:start + NAME_LOOKUP_CHUNK_SIZE]
+            ids.update(db.session.execute(
+                db.select(CardInfo.name, CardInfo.id).where(CardInfo.name.in_(chunk))
+            ).tuples().all())
+        return ids
+
+    name_to_id = lookup(unique_names)
+    missing = [name for name in unique_names if name not in name_to_id]
+    if not missing:
+        return name_to_id
+
+    try:
+        # Core inserts skip the ORM name listener, so name_lc is set here
+        db.session.execute(
+            db.insert(CardInfo), [{"name": name, "name_lc": name.lower()} for name in missing]
+        )
+        name_to_id.update(lookup(missing))
+        db.session.commit()
+        return name_to_id
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Error creating CardInfo: {str(e)}")
+        raise e
+
 def get_all_cards_info() -> List[CardInfo]:
     """
     Retrieves all unique cards.
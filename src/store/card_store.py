@@ -5,12 +5,17 @@ from sqlalchemy.exc import SQLAlchemyError
 from ..database import db
 from ..models.card_printing import CardPrinting
 from ..models.card_info import CardInfo
+from ..models.json_codec import dump_json
 from ..services.scryfall_service import scryfall
 from ..store.card_info_store import get_card_info_by_id, update_card_info
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Printings whose Scryfall data is written per bulk UPDATE and commit in
+# enrich_all_cards(); small enough that little API work is lost on a failure
+ENRICH_BATCH_SIZE = 100
+
 def add_cards_to_collection(printings: List[CardPrinting]) -> None:
     """
     Adds a list of card printings to the database collection.
@@ -171,10 +176,57 @@ def enrich_card_with_scryfall_data(card_id: int) -> Tuple[Optional[CardPrinting]
         logger.error(f"Error enriching card {card_id}: {str(e)}")
         return card_printing, f"Error enriching card: {str(e)}"
 
+def _write_enrichments(batch: List[Tuple[int, str, Dict[str, Any], Dict[str, Any]]],
+                       errors: List[Dict[str, Any]]) -> int:
+    """
+    Write fetched Scryfall data for a batch of printings and commit it.
+
+    Each table gets one bulk UPDATE by primary key. If the batch fails, its
+    printings are written again one at a time, so a bad row only fails its
+    own card as with per-card commits.
+
+    Args:
+        batch: (printing ID, card name, CardPrinting row, CardInfo row) entries
+        errors: List the failed cards' errors are appended to
+
+    Returns:
+        Number of printings saved
+    """
+    def write(entries: List[Tuple[int, str, Dict[str, Any], Dict[str, Any]]]) -> None:
+        db.session.execute(db.update(CardPrinting), [entry[2] for entry in entries])
+        db.session.execute(db.update(CardInfo), [entry[3] for entry in entries])
+        db.session.commit()
+
+    try:
+        write(batch)
+        logger.info(f"Saved Scryfall data for {len(batch)} cards")
+        return len(batch)
+    except SQLAlchemyError:
+        db.session.rollback()
+
+    saved = 0
+    for entry in batch:
+        try:
+            write([entry])
+            saved += 1
+        except SQLAlchemyError as db_err:
+            db.session.rollback()
+            error_msg = f"Database error when saving card {entry[0]}: {str(db_err)}"
+            errors.append({
+                "card_id": entry[0],
+                "card_name": entry[1],
+                "error": error_msg
+            })
+            logger.error(error_msg)
+    return saved
+
 def enrich_all_cards() -> Tuple[int, int, List[Dict[str, Any]]]:
     """
     Enriches all cards in the collection with data from the Scryfall API.
-    Commits changes to the database after each successful card enrichment.
+
+    Fetched data is written ENRICH_BATCH_SIZE printings at a time, as one bulk
+    UPDATE per table and a commit, instead of flushing and committing each
+    card's ORM objects.
 
     Returns:
         A tuple containing:
@@ -182,62 +234,65 @@ def enrich_all_cards() -> Tuple[int, int, List[Dict[str, Any]]]:
         - Total number of cards processed.
         - List of errors that occurred during enrichment.
     """
-    card_printings = CardPrinting.query.all()
-    total_cards = len(card_printings)
+    # Only the columns the Scryfall lookup needs, joined in one query
+    printings = db.session.execute(
+        db.select(CardPrinting.id, CardPrinting.card_info_id, CardPrinting.Edition_Code,
+                  CardPrinting.Card_Number, CardPrinting.scryfall_id, CardInfo.name)
+        .join(CardInfo, CardPrinting.card_info_id == CardInfo.id)
+        .order_by(CardPrinting.id)
+    ).all()
+    total_cards = len(printings)
     successful = 0
     errors = []
+    batch = []
 
-    for card_printing in card_printings:
+    for printing in printings:
         try:
-            card_info = card_printing.card_info
-
             # Convert card to dict for Scryfall service
             card_dict = {
-                'Name': card_info.name,
-                'Edition_Code': card_printing.Edition_Code,
-                'Card_Number': card_printing.Card_Number,
-                'scryfall_id': card_printing.scryfall_id
+                'Name': printing.name,
+                'Edition_Code': printing.Edition_Code,
+                'Card_Number': printing.Card_Number,
+                'scryfall_id': printing.scryfall_id
             }
 
             # Fetch card data from Scryfall
             scryfall_data = scryfall.enrich_card(card_dict)
 
-            # Update card printing with Scryfall data
-            card_printing.scryfall_id = scryfall_data.get('id')
-
-            # Update card info with shared Scryfall data
-            card_info.oracle_text = scryfall_data.get('oracle_text')
-            card_info.mana_cost = scryfall_data.get('mana_cost')
-            card_info.cmc = scryfall_data.get('cmc')
-            card_info.type_line = scryfall_data.get('type_line')
-            card_info.oracle_id = scryfall_data.get('oracle_id')
-
-            # Handle image URIs (using the property setter)
-            card_printing.image_uris = scryfall_data.get('image_uris')
-
-            # Commit changes immediately after each card
-            try:
-                db.session.commit()
-                successful += 1
-                logger.info(f"Successfully enriched card {card_printing.id} ({card_info.name})")
-            except SQLAlchemyError as db_err:
-                db.session.rollback()
-                error_msg = f"Database error when saving card {card_printing.id}: {str(db_err)}"
-                errors.append({
-                    "card_id": card_printing.id,
-                    "card_name": card_info.name,
-                    "error": error_msg
-                })
-                logger.error(error_msg)
+            image_uris = scryfall_data.get('image_uris')
+            batch.append((
+                printing.id,
+                printing.name,
+                # Card printing with Scryfall data, image URIs stored as the setter does
+                {
+                    "id": printing.id,
+                    "scryfall_id": scryfall_data.get('id'),
+                    "_image_uris": dump_json(image_uris) if image_uris is not None else None
+                },
+                # Card info with shared Scryfall data
+                {
+                    "id": printing.card_info_id,
+                    "oracle_text": scryfall_data.get('oracle_text'),
+                    "mana_cost": scryfall_data.get('mana_cost'),
+                    "cmc": scryfall_data.get('cmc'),
+                    "type_line": scryfall_data.get('type_line'),
+                    "oracle_id": scryfall_data.get('oracle_id')
+                }
+            ))
 
         except Exception as e:
-            # Rollback any pending changes for this card
-            db.session.rollback()
             errors.append({
-                "card_id": card_printing.id,
-                "card_name": card_printing.card_info.name,
+                "card_id": printing.id,
+                "card_name": printing.name,
                 "error": str(e)
             })
-            logger.error(f"Error enriching card {card_printing.id} ({card_printing.card_info.name}): {str(e)}")
+            logger.error(f"Error enriching card {printing.id} ({printing.name}): {str(e)}")
+
+        if len(batch) >= ENRICH_BATCH_SIZE:
+            successful += _write_enrichments(batch, errors)
+            batch = []
+
+    if batch:
+        successful += _write_enrichments(batch, errors)
 
     return successful, total_cards, errors
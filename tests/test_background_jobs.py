@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for background collection jobs and their polling route.
+"""
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask
+
+import src.routes.collection_routes as collection_routes
+import src.services.background_jobs as background_jobs
+from src.services.background_jobs import get_job, submit_job
+
+
+def make_client():
+    """A test client for the collection routes, without a database."""
+    app = Flask(__name__)
+    app.register_blueprint(collection_routes.collection_bp)
+    return app, app.test_client()
+
+
+def wait_for_job(job_id, timeout=5.0):
+    """Poll a job until it leaves the queue, returning its last snapshot."""
+    deadline = time.monotonic() + timeout
+    job = get_job(job_id)
+    while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.01)
+        job = get_job(job_id)
+    return job
+
+
+def test_background_analysis_is_polled_by_job_id():
+    """?background=true answers 202 with a job ID whose result can be polled."""
+    _, client = make_client()
+    analyze_all_cards = collection_routes.analyze_all_cards
+    collection_routes.analyze_all_cards = lambda: (1, 2, [{"card_id": 2, "error": "boom"}])
+    try:
+        response = client.post("/collection/analyze-all?background=true")
+        assert response.status_code == 202
+        body = response.get_json()
+        assert body["status"] == "queued"
+
+        wait_for_job(body["job_id"])
+        response = client.get(f"/collection/jobs/{body['job_id']}")
+    finally:
+        collection_routes.analyze_all_cards = analyze_all_cards
+
+    assert response.status_code == 200
+    job = response.get_json()
+    assert job["status"] == "finished"
+    assert job["result"]["success_count"] == 1
+    assert job["result"]["errors"] == [{"card_id": 2, "error": "boom"}]
+    assert client.get("/collection/jobs/unknown").status_code == 404
+
+
+def test_failed_job_reports_its_error():
+    """A job that raises is marked failed with the exception message."""
+    app, _ = make_client()
+
+    def fail():
+        raise RuntimeError("no cards")
+
+    job = wait_for_job(submit_job(app, "fail", fail))
+    assert job["status"] == "failed"
+    assert job["error"] == "no cards"
+
+
+def test_oldest_finished_jobs_are_evicted():
+    """Only the most recent MAX_FINISHED_JOBS finished jobs stay pollable."""
+    app, _ = make_client()
+    max_finished_jobs = background_jobs.MAX_FINISHED_JOBS
+    background_jobs.MAX_FINISHED_JOBS = 2
+    try:
+        job_ids = []
+        for _ in range(4):
+            job_ids.append(submit_job(app, "noop", lambda: None))
+            wait_for_job(job_ids[-1])
+        latest = submit_job(app, "noop", lambda: None)
+    finally:
+        background_jobs.MAX_FINISHED_JOBS = max_finished_jobs
+
+    assert [get_job(job_id) is not None for job_id in job_ids] == [False, False, True, True]
+    assert wait_for_job(latest)["status"] == "finished"
+
+
+if __name__ == "__main__":
+    test_background_analysis_is_polled_by_job_id()
+    test_failed_job_reports_its_error()
+    test_oldest_finished_jobs_are_evicted()
+    print("All background job tests passed!")
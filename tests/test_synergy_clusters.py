@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for synergy cluster detection in the synergy graph explorer.
+"""
+import os
+import random
+import sys
+import time
+
+# Add the project root and scripts directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scripts")))
+
+from explore_synergy_graph import disjoint_cliques, iter_bits
+
+
+def random_graph(node_count, edge_probability, seed=0):
+    """Neighbor bitsets of a seeded random undirected graph."""
+    rng = random.Random(seed)
+    neighbors = [0] * node_count
+    for i in range(node_count):
+        for j in range(i + 1, node_count):
+            if rng.random() < edge_probability:
+                neighbors[i] |= 1 << j
+                neighbors[j] |= 1 << i
+    return neighbors
+
+
+def test_clusters_are_disjoint_cliques():
+    """Every cluster is a clique of at least min_size, and no card is in two."""
+    neighbors = random_graph(120, 0.3)
+
+    covered = 0
+    for clique in disjoint_cliques(neighbors, 3):
+        nodes = list(iter_bits(clique))
+        assert len(nodes) >= 3
+        assert all(neighbors[a] >> b & 1 for a in nodes for b in nodes if a != b)
+        assert covered & clique == 0
+        covered |= clique
+
+
+def test_dense_graph_stays_bounded():
+    """A dense graph yields at most one cluster per min_size cards, quickly."""
+    neighbors = random_graph(400, 0.5)
+
+    start = time.perf_counter()
+    cliques = disjoint_cliques(neighbors, 3)
+    elapsed = time.perf_counter() - start
+
+    assert 0 < len(cliques) <= len(neighbors) // 3
+    assert elapsed < 5.0
+
+
+def test_complete_graph_is_one_cluster():
+    """A complete graph is a single cluster; an edgeless one has none."""
+    everyone = (1 << 10) - 1
+    complete = [everyone & ~(1 << node) for node in range(10)]
+
+    assert disjoint_cliques(complete, 3) == [everyone]
+    assert disjoint_cliques([0] * 10, 3) == []
+
+
+if __name__ == "__main__":
+    test_clusters_are_disjoint_cliques()
+    test_dense_graph_stays_bounded()
+    test_complete_graph_is_one_cluster()
+    print("All synergy cluster tests passed!")
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Tests for vectorized synergy scoring.
+"""
+import os
+import sys
+import tempfile
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from src.services.synergy_kernels import score_all_pairs, score_pairs, score_tile, score_upper_triangle
+from src.services.synergy_matrix import (
+    band_pairs,
+    build_synergy_features,
+    load_synergy_features,
+    save_synergy_features,
+    score_matrix,
+    synergy_fingerprint,
+    top_k_indices,
+    top_k_per_row,
+    upper_triangle_bands,
+)
+from src.services.text_analysis import calculate_synergy_score, find_synergy_candidates
+
+# Hand-written analyses covering every synergy component
+SAMPLE_ANALYSES = [
+    {
+        "creature_types": ["goblin"],
+        "raw_tokens": ["other", "goblin", "creatures", "get", "+1/+1"],
+        "keywords": ["haste"],
+        "scryfall_keywords": [],
+        "colors": ["R"],
+        "color_identity": ["R"],
+        "card_types": ["creature"],
+        "legal_formats": ["commander", "modern", "historic"],
+        "synergy_vectors": {
+            "archetype": ["aggro", "tokens"],
+            "combo_potential": ["mana_generation"],
+            "mana_curve": {"cmc": 2, "mana_intensiveness": 0.5},
+        },
+    },
+    {
+        "creature_types": ["goblin", "warrior"],
+        "raw_tokens": ["untap", "target", "creature"],
+        "keywords": ["trample"],
+        "scryfall_keywords": ["trample"],
+        "colors": ["R", "G"],
+        "color_identity": ["R", "G"],
+        "card_types": ["creature", "artifact"],
+        "artifact_subtypes": ["equipment"],
+        "legal_formats": ["commander", "legacy"],
+        "synergy_vectors": {
+            "archetype": ["aggro"],
+            "combo_potential": ["untap_effects", "recursion"],
+            "mana_curve": {"cmc": 3, "mana_intensiveness": 0.6667},
+        },
+    },
+    {
+        "creature_types": [],
+        "raw_tokens": ["search", "your", "library", "for", "a", "goblin"],
+        "keywords": ["flying", "first strike"],
+        "scryfall_keywords": [],
+        "colors": ["B", "R"],
+        "color_identity": ["B", "R"],
+        "card_types": ["enchantment"],
+        "enchantment_subtypes": ["aura"],
+        "legal_formats": ["modern", "pauper"],
+        "synergy_vectors": {
+            "archetype": ["graveyard", "combo"],
+            "combo_potential": ["tutoring", "card_draw"],
+            "mana_curve": {"cmc": 4, "mana_intensiveness": 0.5},
+        },
+    },
+    {
+        "creature_types": ["elf"],
+        "raw_tokens": ["add", "g"],
+        "keywords": ["reach", "deathtouch"],
+        "scryfall_keywords": ["reach"],
+        "colors": ["G"],
+        "color_identity": ["G"],
+        "card_types": ["creature", "enchantment"],
+        "enchantment_subtypes": ["aura"],
+        "legal_formats": ["commander", "pauper", "brawl"],
+        "synergy_vectors": {
+            "archetype": ["graveyard", "lands"],
+            "combo_potential": ["mana_generation", "recursion"],
+            "mana_curve": {"cmc": 1, "mana_intensiveness": 1.0},
+        },
+    },
+    {},
+]
+
+
+def test_score_matrix_matches_pairwise_scores():
+    """Every matrix entry equals the per-pair total score in both directions."""
+    scores = score_matrix(build_synergy_features(SAMPLE_ANALYSES))
+
+    assert scores.shape == (len(SAMPLE_ANALYSES), len(SAMPLE_ANALYSES))
+    for i, card1 in enumerate(SAMPLE_ANALYSES):
+        for j, card2 in enumerate(SAMPLE_ANALYSES):
+            expected = calculate_synergy_score(card1, card2)["total_score"]
+            assert np.isclose(scores[i, j], expected), (i, j, scores[i, j], expected)
+
+
+def test_score_matrix_keeps_directional_combo_patterns():
+    """Combo patterns only score when the cards are in the pattern's order."""
+    scores = score_matrix(build_synergy_features(SAMPLE_ANALYSES))
+
+    # Card 0 generates mana and card 1 untaps: mana+untap only scores as (0, 1)
+    assert scores[0, 1] != scores[1, 0]
+
+
+def test_kernel_matches_matrix_upper_triangle():
+    """The pair kernel scores the upper triangle exactly like the matrix."""
+    features = build_synergy_features(SAMPLE_ANALYSES)
+    rows, cols = np.triu_indices(len(SAMPLE_ANALYSES), k=1)
+
+    assert np.allclose(score_upper_triangle(features), score_matrix(features)[rows, cols])
+
+
+def test_all_pairs_kernel_matches_matrix():
+    """The ordered-pair kernel reproduces the full matrix, both directions."""
+    features = build_synergy_features(SAMPLE_ANALYSES)
+
+    assert np.allclose(score_all_pairs(features), score_matrix(features))
+
+
+def test_pair_list_kernel_matches_matrix():
+    """Scoring an explicit pair list gives the matrix entries, in either order."""
+    features = build_synergy_features(SAMPLE_ANALYSES)
+    rows, cols = np.triu_indices(len(SAMPLE_ANALYSES), k=1)
+    order = np.arange(len(rows))[::-1]
+    scores = score_matrix(features)
+
+    assert np.allclose(score_pairs(features, rows[order], cols[order]), scores[rows, cols][order])
+    assert np.allclose(score_pairs(features, cols, rows), scores[cols, rows])
+    assert len(score_pairs(features, rows[:0], cols[:0])) == 0
+
+
+def test_synergy_candidates_match_pairwise_scores():
+    """The vectorized prefilter keeps exactly the pairs scoring over the threshold."""
+    cards = [dict(analysis, name=f"card {i}") for i, analysis in enumerate(SAMPLE_ANALYSES)]
+
+    for threshold in (0.0, 5.0, 20.0):
+        found = find_synergy_candidates(cards[0], cards, threshold=threshold)
+        expected = [
+            card["name"] for card in cards[1:]
+            if calculate_synergy_score(cards[0], card)["total_score"] >= threshold
+        ]
+        assert sorted(match["card"]["name"] for match in found) == sorted(expected)
+
+
+def test_kernel_prefilter_keeps_every_pair_above_min_score():
+    """Pairs pruned by the overlap masks never reach the threshold."""
+    features = build_synergy_features(SAMPLE_ANALYSES)
+    rows, cols = np.triu_indices(len(SAMPLE_ANALYSES), k=1)
+    exact = score_matrix(features)[rows, cols]
+
+    for min_score in (1.0, 5.0, 20.0, 60.0):
+        screened = score_upper_triangle(features, min_score=min_score)
+        assert np.array_equal(screened >= min_score, exact >= min_score)
+
+
+def test_row_bands_cover_upper_triangle_in_order():
+    """Concatenated bands reproduce np.triu_indices and the kernel scores."""
+    features = build_synergy_features(SAMPLE_ANALYSES)
+    n = len(SAMPLE_ANALYSES)
+    bands = list(upper_triangle_bands(n, pairs_per_band=3))
+
+    rows = np.concatenate([band_pairs(n, start, end)[0] for start, end in bands])
+    cols = np.concatenate([band_pairs(n, start, end)[1] for start, end in bands])
+    scores = np.concatenate([
+        score_upper_triangle(features, row_start=start, row_end=end)
+        for start, end in bands
+    ])
+
+    expected_rows, expected_cols = np.triu_indices(n, k=1)
+    assert np.array_equal(rows, expected_rows)
+    assert np.array_equal(cols, expected_cols)
+    assert np.allclose(scores, score_upper_triangle(features))
+
+
+def test_fingerprint_ignores_fields_unused_by_scoring():
+    """Cards that differ only in non-scoring fields share a fingerprint."""
+    card = dict(SAMPLE_ANALYSES[0])
+    reprint = dict(card, set_code="m21", rarity="common")
+    retyped = dict(card, creature_types=["elf"])
+
+    assert synergy_fingerprint(card) == synergy_fingerprint(reprint)
+    assert synergy_fingerprint(card) != synergy_fingerprint(retyped)
+
+
+def test_saved_features_score_like_the_originals():
+    """Features read back from the .npz cache give the same scores."""
+    features = build_synergy_features(SAMPLE_ANALYSES)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "features.npz")
+        save_synergy_features(path, features, card_ids=np.arange(len(features)))
+        loaded, extra = load_synergy_features(path)
+
+    assert np.array_equal(extra["card_ids"], np.arange(len(features)))
+    assert np.array_equal(score_matrix(loaded), score_matrix(features))
+    assert load_synergy_features(path) is None
+
+
+def test_top_k_indices_matches_stable_descending_sort():
+    """Top-k selection keeps the order of a stable sort, including ties."""
+    scores = np.array([3.0, 5.0, 1.0, 5.0, 3.0, 0.0, 3.0])
+    expected = sorted(range(len(scores)), key=lambda i: -scores[i])
+
+    for k in range(len(scores) + 2):
+        assert top_k_indices(scores, k).tolist() == expected[:k]
+
+
+def test_tiled_top_k_matches_full_matrix():
+    """Top partners found tile by tile match a top-k over each full row."""
+    features = build_synergy_features(SAMPLE_ANALYSES * 3)
+    scores = score_matrix(features)
+    groups = np.arange(len(features)) % len(SAMPLE_ANALYSES)
+    kernel_tile = lambda *bounds: score_tile(features, *bounds)
+
+    for k, min_score in ((1, 0.0), (3, 5.0), (20, 10.0)):
+        for block_size, tile_scorer in ((2, None), (4, kernel_tile), (256, None)):
+            counts, indices, _ = top_k_per_row(
+                features, k, min_score, groups=groups, block_size=block_size,
+                score_tile=tile_scorer
+            )
+            for i in range(len(features)):
+                candidates = np.flatnonzero((scores[i] >= min_score) & (groups != groups[i]))
+                expected = candidates[top_k_indices(scores[i, candidates], k)]
+                assert counts[i] == len(candidates)
+                assert indices[i][indices[i] >= 0].tolist() == expected.tolist()
+
+
+if __name__ == "__main__":
+    test_score_matrix_matches_pairwise_scores()
+    test_score_matrix_keeps_directional_combo_patterns()
+    test_kernel_matches_matrix_upper_triangle()
+    test_all_pairs_kernel_matches_matrix()
+    test_pair_list_kernel_matches_matrix()
+    test_synergy_candidates_match_pairwise_scores()
+    test_kernel_prefilter_keeps_every_pair_above_min_score()
+    test_row_bands_cover_upper_triangle_in_order()
+    test_fingerprint_ignores_fields_unused_by_scoring()
+    test_saved_features_score_like_the_originals()
+    test_top_k_indices_matches_stable_descending_sort()
+    test_tiled_top_k_matches_full_matrix()
+    print("All synergy matrix tests passed!")